@@ -6,7 +6,34 @@ __license__   = "MIT"
 
 # ------------------------------------------------------------------------------
 #
+# The signature decorators (`radical.utils.signatures`) decide at import time if
+# the decorated methods get wrapped into type checks or not, so the switch needs
+# to be evaluated before any of our modules gets imported.  The checks are off
+# by default: radical.utils only enables them if `RADICAL_DEBUG_SIG` is set, and
+# otherwise the decorators resolve to the undecorated methods.
+# `RADICAL_SAGA_CHECK_SIGNATURES=1` turns the checks on, `0` turns them off even
+# if `RADICAL_DEBUG_SIG` is set.  Some radical.utils versions fail to decorate
+# methods with checks enabled -- in that case the checks stay off.
+#
+import os                       as _os
+import sys                      as _sys
+import radical.utils.signatures as _rus
+
+if 'RADICAL_SAGA_CHECK_SIGNATURES' in _os.environ:
+    _rus.no_check = _os.environ['RADICAL_SAGA_CHECK_SIGNATURES'].lower() \
+                    in ['0', 'false', 'no', 'off']
+
+if not _rus.no_check:
+    try:
+        _rus.takes(int)(lambda x: x)
+    except Exception as _e:
+        _sys.stderr.write('signature checks disabled, not supported by '
+                          'radical.utils: %s\n' % _e)
+        _rus.no_check = True
 
+
+# ------------------------------------------------------------------------------
+#
 from .version    import *
 from .constants  import *
 
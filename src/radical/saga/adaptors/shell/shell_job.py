@@ -7,7 +7,10 @@ __license__   = "MIT"
 ''' shell based job adaptor implementation '''
 
 import re
+import gzip
 import time
+import base64
+import binascii
 import threading as mt
 
 import radical.utils as ru
@@ -19,6 +22,7 @@ from ..cpi             import job as cpi
 from ...               import job as api
 from ...utils.job      import TransferDirectives
 from ...utils          import pty_shell
+from ...utils          import pty_shell_pool
 
 from . import shell_wrapper
 
@@ -27,6 +31,24 @@ from . import shell_wrapper
 #
 _PING_DELAY  = 60.0
 
+# shell_wrapper.sh quits after being idle for 300 seconds -- pooled shells are
+# closed before that happens (unless kept alive by pings)
+_CHANNEL_TTL = 240.0
+
+_FINAL       = [api.DONE, api.FAILED, api.CANCELED]
+
+# `ShellJob.wait()` polls states with an increasing delay between those bounds,
+# and only checks now and then if notifications are enabled
+_WAIT_MIN    =  0.1
+_WAIT_MAX    =  5.0
+_WAIT_NOTIFY = 10.0
+
+# on failure, that many bytes of the job's stderr are added to the job log
+_ERR_TAIL    = 1024
+
+# `container_get_states()` for more jobs than that only asks for state changes
+_BULK_STATES = 100
+
 
 # ------------------------------------------------------------------------------
 #
@@ -122,25 +144,38 @@ class _job_state_monitor(mt.Thread):
             self.logger.error("Exception in job monitoring thread: %s" % e)
             self.logger.error("Cancel job monitoring for %s" % self.rm)
 
+        finally:
+
+            # nobody else uses the monitoring channel -- we close it once we
+            # are done (also when we got stopped by the service's `close()`)
+            try:
+                self.channel.finalize(kill_pty=True)
+            except Exception as e:
+                self.logger.warn("could not close monitoring channel: %s" % e)
+
 
 # ------------------------------------------------------------------------------
 #
-# strip white space from a string, and hex-decode the remaining characters.
-# This must be applied to stdout/stderr data returned from the shell wrapper.
+# decode stdout/stderr data returned from the shell wrapper, which are either
+# hex encoded, base64 encoded, or gzip'ed and base64 encoded (see `cmd_output`
+# in the wrapper).  White space is ignored.  Returns bytes.
 #
-def _decode(data):
+def _decode(data, encoding='hex'):
+
+    try:
+        if encoding == 'hex':
+            return bytes.fromhex(data)
 
-    code = ""
+        data = base64.b64decode(data)
 
-    for c in data:
+        if encoding == 'gzip':
+            data = gzip.decompress(data)
 
-        if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
-                  'a', 'b', 'c', 'd', 'e', 'f']:
-            code += c
-        elif c not in [' ', '\n']:
-            raise rse.BadParameter("Cannot decode '%s' in '%s'" % (c, data))
+        return data
 
-    return bytes.fromhex(code).decode('utf-8')
+    except (binascii.Error, ValueError, OSError, EOFError) as e:
+        raise rse.BadParameter("Cannot decode %s data (%s): %s"
+                              % (encoding, e, data[:100])) from e
 
 
 # ------------------------------------------------------------------------------
@@ -380,7 +415,7 @@ class Adaptor(base.Base):
 
     # --------------------------------------------------------------------------
     #
-    def stage_input(self, shell, lock, jd):
+    def stage_input(self, shell, jd):
 
         if not jd:
             return
@@ -398,13 +433,12 @@ class Adaptor(base.Base):
                     target = remote
                     self._logger.info("stage %s to %s" % (source, target))
 
-                    with lock:
-                        shell.stage_to_remote(source, target)
+                    shell.stage_to_remote(source, target)
 
 
     # --------------------------------------------------------------------------
     #
-    def stage_output(self, shell, lock, jd):
+    def stage_output(self, shell, jd):
 
         if not jd:
             return
@@ -421,8 +455,7 @@ class Adaptor(base.Base):
                     target = local
                     self._logger.info("stage %s to %s" % (source, target))
 
-                    with lock:
-                        shell.stage_from_remote(source, target)
+                    shell.stage_from_remote(source, target)
 
 
 # ------------------------------------------------------------------------------
@@ -439,6 +472,11 @@ class ShellJobService(cpi.Service):
         self.opts = {}
         self.opts['shell'] = None  # default to login shell
 
+        self.channels = None
+        self._ping    = None
+        self._closed  = False
+        self._plock   = mt.Lock()  # protects `self._ping` and `self._closed`
+
 
     # --------------------------------------------------------------------------
     #
@@ -461,6 +499,11 @@ class ShellJobService(cpi.Service):
         self.jobs    = dict()
         self.njobs   = 0
 
+        # job states as of the last `STATES -s` (`_job_get_changed_states`)
+        self._states = dict()
+        self._mark   = None
+        self._slock  = mt.Lock()
+
         # Use `_set_session` method of the base class to set the session object.
         # `_set_session` and `get_session` methods are provided by `CPIBase`.
         self._set_session(session)
@@ -501,14 +544,22 @@ class ShellJobService(cpi.Service):
             #   cmd_state() { touch $DIR/purgeable; ... }
             # When should that be done?
 
-            with self._shell_lock:
-                # cancel scheduled `PING` request
-                self._ping.cancel()
+            # cancel scheduled `PING` request, and make sure that a running
+            # one does not schedule another one
+            with self._plock:
+                self._closed = True
+                if self._ping:
+                    self._ping.cancel()
+
+         #  self.shell.run_sync("PURGE", iomode=None)
+
+            # once the shell pool exists, it owns (and closes) `self.shell`
+            if self.channels:
+                self.channels.close()
+            else:
+                self._close_channel(self.shell)
 
-             #  self.shell.run_sync("PURGE", iomode=None)
-                self.shell.run_async("QUIT")
-                self.shell.finalize(kill_pty=True)
-                self.shell = None
+            self.shell = None
 
         if self.monitor:
             self.monitor.finalize()
@@ -519,26 +570,9 @@ class ShellJobService(cpi.Service):
     #
     def initialize(self):
 
-        # the underlying shell is not always ready to receive new commands,
-        # e.g.,  when running an async command and still collecting output.
-        # The driving code is usually aware of the shell's state - but we want
-        # to send `PING` requests now and then to ensure the shell does not
-        # time out, and the thread triggering that ping is *not* aware of the
-        # shell state.  To avoid interfering with async calls, we lock any
-        # interaction with the shell
-        self._shell_lock = mt.RLock()
-
-        # at regular intervals, run a ping toward the shell wrapper to avoid
-        # timeouts kicking in
-        # FIXME: configurable frequency
-        self._ping = mt.Timer(_PING_DELAY, self._ping_cb)
-        self._ping.start()
-
-
         # very first step: get the remote environment, and expand the config
         # settings
-        with self._shell_lock:
-            ret, out, err = self.shell.run_sync(' env')
+        ret, out, err = self.shell.run_sync(' env')
 
         if ret != 0:
             raise rse.NoSuccess("env query failed(%s):(%s)(%s)"
@@ -557,6 +591,12 @@ class ShellJobService(cpi.Service):
         self.notifications  = cfg.enable_notifications
         self.purge_on_start = cfg.purge_on_star
         self.base_workdir   = ru.expand_env(cfg.base_workdir, env)
+        self.output_enc     = cfg.get('output_encoding', 'gzip')
+        self.state_ttl      = float(cfg.get('state_cache_ttl', 30.0))
+
+        if self.output_enc not in ['hex', 'base64', 'gzip']:
+            raise rse.BadParameter("invalid output encoding '%s'"
+                                  % self.output_enc)
 
 
         # start the shell, find its prompt.  If that is up and running, we can
@@ -568,23 +608,23 @@ class ShellJobService(cpi.Service):
 
         base = self.base_workdir
 
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync(" mkdir -p %s" % base)
-
-        if ret != 0:
-            raise rse.NoSuccess("host setup failed(%s):(%s)" % (ret, out))
-
         # TODO: replace some constants in the script with values from config
         # files, such as 'timeout' or 'purge_on_quit' ...
-        tgt = "%s/wrapper.sh" % base
+        tgt = "%s/%s" % (base, shell_wrapper._WRAPPER_NAME)
 
-        # lets check if we actually need to stage the wrapper script.  We need
-        # an adaptor lock on this one.
+        # create the base dir, and lets check if we actually need to stage the
+        # wrapper script -- both in one round trip.  We need an adaptor lock
+        # on this one.
         with self._adaptor._lock:
 
-            with self._shell_lock:
-                ret, out, _ = self.shell.run_sync(" test -f %s" % tgt)
+            res = self.shell.run_many([" mkdir -p %s" % base,
+                                       " test -f %s"  % tgt])
 
+            ret, out, _ = res[0]
+            if ret != 0:
+                raise rse.NoSuccess("host setup failed(%s):(%s)" % (ret, out))
+
+            ret, out, _ = res[1]
             if ret != 0:
                 # yep, need to stage...
                 src = shell_wrapper._WRAPPER_SCRIPT
@@ -598,8 +638,7 @@ class ShellJobService(cpi.Service):
                 if tgt.startswith("$HOME") or tgt.startswith("${HOME}"):
                     tgt = tgt[tgt.find('/') + 1:]
 
-                with self._shell_lock:
-                    self.shell.write_to_remote(src, tgt)
+                self.shell.write_to_remote(src, tgt)
 
 
         # ----------------------------------------------------------------------
@@ -611,15 +650,52 @@ class ShellJobService(cpi.Service):
         # Thus, when the script times out, the shell dies and the connection
         # drops -- that will free all associated resources, and allows for
         # a clean reconnect.
-        # with self._shell_lock:
-        #     ret, out, _ = self.shell.run_sync(" exec sh %s/wrapper.sh" % base)
+        # ret, out, _ = self.shell.run_sync(" exec sh %s/wrapper.sh" % base)
 
         # Well, actually, we do not use exec, as that does not give us good
         # feedback on failures(the shell just quits) -- so we replace it with
         # this poor-man's version...
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync(" /bin/sh %s/wrapper.sh %s"
-                                             % (base, base))
+        self._bootstrap(self.shell)
+
+        self._logger.debug("got cmd prompt")
+
+        # now do the same for the monitoring shell
+        self._bootstrap(self.channel)
+
+        self._logger.debug("got mon prompt")
+
+        # The underlying shell is not always ready to receive new commands,
+        # e.g., when running an async command and still collecting output.  All
+        # further operations thus lease a shell from a pool for exclusive use.
+        # `self.shell` is the first pooled shell -- more shells (i.e. more
+        # wrapper instances) are created on demand if concurrent operations
+        # would otherwise need to queue up.
+        self.channels = pty_shell_pool.PTYShellPool(
+                                   creator=self._create_channel,
+                                   closer=self._close_channel,
+                                   size=cfg.get('channel_pool_size', 4),
+                                   ttl=_CHANNEL_TTL,
+                                   logger=self._logger)
+        self.channels.add(self.shell)
+
+        # at regular intervals, run a ping toward a shell wrapper to keep at
+        # least one pooled shell alive
+        # FIXME: configurable frequency
+        self._ping = mt.Timer(_PING_DELAY, self._ping_cb)
+        self._ping.start()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _bootstrap(self, shell):
+        '''
+        run the shell wrapper script on the given shell
+        '''
+
+        base = self.base_workdir
+
+        ret, out, _ = shell.run_sync(" /bin/sh %s/%s %s"
+                                    % (base, shell_wrapper._WRAPPER_NAME, base))
 
         # shell_wrapper.sh will report its own PID -- we use that to sync prompt
         # detection, too.
@@ -630,47 +706,57 @@ class ShellJobService(cpi.Service):
         id_match   = id_pattern.search(out)
 
         if not id_match:
-            self.shell.run_async(" exit")
+            shell.run_async(" exit")
             self._logger.error("host bootstrap failed - no pid(%s)" % out)
             raise rse.NoSuccess  ("host bootstrap failed - no pid(%s)" % out)
 
         # we actually don't care much about the PID:-P
-
-        self._logger.debug("got cmd prompt(%s)(%s)" % (ret, out.strip()))
+        self._logger.debug("bootstrapped (%s)(%s)" % (ret, out.strip()))
 
 
-        # ----------------------------------------------------------------------
-        # now do the same for the monitoring shell
-        ret, out, _ = self.channel.run_sync(" /bin/sh %s/wrapper.sh %s"
-                                           % (base, base))
+    # --------------------------------------------------------------------------
+    #
+    def _create_channel(self):
 
-        # shell_wrapper.sh will report its own PID -- we use that to sync prompt
-        # detection, too.
-        if ret != 0:
-            raise rse.NoSuccess("failed to run bootstrap:(%s)(%s)"
-                               % (ret, out))
+        shell = pty_shell.PTYShell(self.rm, self.get_session(),
+                                   self._logger, cfg=self.opts)
+        self._bootstrap(shell)
 
-        id_pattern = re.compile("\s*PID:\s+(\d+)\s*$")
-        id_match   = id_pattern.search(out)
+        return shell
 
-        if not id_match:
-            self.channel.run_async(" exit")
-            self._logger.error("host bootstrap failed - no pid(%s)" % out)
-            raise rse.NoSuccess  ("host bootstrap failed - no pid(%s)" % out)
 
-        # we actually don't care much about the PID:-P
+    # --------------------------------------------------------------------------
+    #
+    def _close_channel(self, shell):
 
-        self._logger.debug("got mon prompt(%s)(%s)" % (ret, out.strip()))
+        shell.run_async("QUIT")
+        shell.finalize(kill_pty=True)
 
 
     # ----------------------------------------------------------------
     #
     def _ping_cb (self) :
 
-        with self._shell_lock:
+        try:
+            # only ping idle shells -- we don't create shells just for the ping
+            with self.channels.lease(create=False) as shell:
+
+                if shell:
+                    _, out, _ = shell.run_sync('PING')
+                    assert('PONG' in out), out
+
+                elif not self.channels.get_stats()['active']:
+                    # no shell left to keep alive
+                    return
+
+        except rse.IncorrectState:
+            # the pool got closed while we were waiting
+            return
+
+        with self._plock:
 
-            _, out, _ = self.shell.run_sync('PING')
-            assert('PONG' in out), out
+            if self._closed:
+                return
 
             self._ping = mt.Timer(_PING_DELAY, self._ping_cb)
             self._ping.start()
@@ -727,76 +813,174 @@ class ShellJobService(cpi.Service):
         runs a job on the wrapper via pty, and returns the job id
         '''
 
-        # stage data, then run job
-        self._adaptor.stage_input(self.shell, self._shell_lock, jd)
+        # use the same shell for staging, and for the complete job submission
+        with self.channels.lease() as shell:
 
-        # create command to run
-        cmd = self._jd2cmd(jd)
-        ret = 1
-        out = ""
+            # stage data, then run job
+            self._adaptor.stage_input(shell, jd)
 
-        run_cmd  = ""
-        use_lrun = False
+            # create command to run
+            cmd = self._jd2cmd(jd)
+            ret = 1
+            out = ""
 
-        # simple one-liners use RUN, otherwise LRUN
-        if "\n" not in cmd:
-            run_cmd = "RUN %s\n" % cmd
-        else:
-            use_lrun = True
-            run_cmd  = "BULK\nLRUN\n%s\nLRUN_EOT\nBULK_RUN\n" % cmd
+            run_cmd  = ""
+            use_lrun = False
+
+            # simple one-liners use RUN, otherwise LRUN
+            if "\n" not in cmd:
+                run_cmd = "RUN %s\n" % cmd
+            else:
+                use_lrun = True
+                run_cmd  = "BULK\nLRUN\n%s\nLRUN_EOT\nBULK_RUN\n" % cmd
 
-        run_cmd = run_cmd.replace("\\", "\\\\\\\\")  # hello MacOS
+            run_cmd = run_cmd.replace("\\", "\\\\\\\\")  # hello MacOS
 
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync(run_cmd)
+            ret, out, _ = shell.run_sync(run_cmd)
+
+            if ret != 0:
+                raise rse.NoSuccess("failed to run Job '%s':(%s)(%s)"
+                                   % (cmd, ret, out))
+
+            lines = [_f for _f in out.split("\n") if _f]
+            self._logger.debug(lines)
+
+            if len(lines) < 2:
+                raise rse.NoSuccess("Failed to run job(%s)" % lines)
+
+          # for i in range(0, len(lines)):
+          #     print("%d: %s" % (i, lines[i]))
+
+            if lines[-2] != "OK":
+                raise rse.NoSuccess("Failed to run Job(%s)" % lines)
+
+            # FIXME: verify format of returned pid(\d+)!
+            pid    = lines[-1].strip()
+            job_id = "[%s]-[%s]" % (self.rm, pid)
+
+            self._logger.debug("started job %s" % job_id)
+
+            self.njobs += 1
+
+            # clean 'BULK COMPLETED message from lrun
+            if use_lrun:
+                ret, out = shell.find_prompt()
+
+                if ret != 0:
+                    raise rse.NoSuccess("failed to run multiline job "
+                                        "'%s':(%s)(%s)" % (run_cmd, ret, out))
+            return job_id
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _job_get_status(self, id):
+        '''
+        get the job state, exit code, start and stop time from the wrapper
+        shell, as dict -- this is what state polling uses.  Values which are not
+        (yet) known are not set.
+        '''
+
+        rm, pid = self._adaptor.parse_id(id)
+
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("STATUS %s\n" % pid)
 
         if ret != 0:
-            raise rse.NoSuccess("failed to run Job '%s':(%s)(%s)"
-                               % (cmd, ret, out))
+            raise rse.NoSuccess("failed to get job status for '%s':(%s)(%s)"
+                          % (id, ret, out))
 
         lines = [_f for _f in out.split("\n") if _f]
-        self._logger.debug(lines)
 
-        if len(lines) < 2:
-            raise rse.NoSuccess("Failed to run job(%s)" % lines)
+        if len(lines) < 2 or lines[0] != "OK":
+            raise rse.NoSuccess("failed to get valid job status for '%s'(%s)"
+                               % (id, lines))
+
+        fields = lines[1].strip().split(':')
+
+        if len(fields) != 5:
+            raise rse.NoSuccess("failed to parse job status for '%s'(%s)"
+                               % (id, lines))
+
+        keys = ['pid', 'state', 'ecode', 'start', 'stop']
 
-      # for i in range(0, len(lines)):
-      #     print("%d: %s" % (i, lines[i]))
+        return {k: v for k, v in zip(keys, fields) if v}
 
-        if lines[-2] != "OK":
-            raise rse.NoSuccess("Failed to run Job(%s)" % lines)
 
-        # FIXME: verify format of returned pid(\d+)!
-        pid    = lines[-1].strip()
-        job_id = "[%s]-[%s]" % (self.rm, pid)
+    # --------------------------------------------------------------------------
+    #
+    def _job_get_states(self, pids=None, since=None):
+        '''
+        get the states of the given jobs (of all jobs if `pids` is `None`) from
+        the wrapper shell in a single round trip, as dict `{pid: state}`.  With
+        `since` (a mark, or `True` for none), the states of all jobs changed
+        since that mark are returned instead, and the new mark is returned as
+        `None` entry.
+        '''
 
-        self._logger.debug("started job %s" % job_id)
+        if   since: cmd = "STATES -s %s" % ('' if since is True else since)
+        elif pids : cmd = "STATES %s"    % ' '.join(pids)
+        else      : cmd = "STATES"
 
-        self.njobs += 1
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("%s\n" % cmd)
 
-        # clean 'BULK COMPLETED message from lrun
-        if use_lrun:
-            with self._shell_lock:
-                ret, out = self.shell.find_prompt()
+        if ret != 0:
+            raise rse.NoSuccess("failed to get job states:(%s)(%s)"
+                               % (ret, out))
 
-            if ret != 0:
-                raise rse.NoSuccess("failed to run multiline job '%s':(%s)(%s)"
-                                   % (run_cmd, ret, out))
-        return job_id
+        lines = [_f.strip() for _f in out.split("\n") if _f.strip()]
+
+        if not lines or lines[0] != "OK" or (since and len(lines) < 2):
+            raise rse.NoSuccess("failed to get valid job states(%s)" % (lines))
+
+        states = dict()
+
+        if since:
+            states[None] = lines.pop(1)
+
+        for line in lines[1:]:
+            pid, _, state = line.rpartition(':')
+            if pid:
+                states[pid] = state
+
+        return states
 
 
     # --------------------------------------------------------------------------
     #
+    def _job_get_changed_states(self):
+        '''
+        merge the state changes since the last call into `self._states`, and
+        return a copy of that (all job states on the first call).
+
+        The mark is a position in the wrapper's job state index -- if the index
+        got compacted meanwhile, the states of all jobs are returned.
+        '''
+
+        with self._slock:
+
+            states     = self._job_get_states(since=self._mark or True)
+            self._mark = states.pop(None)
+
+            self._states.update(states)
+
+            return dict(self._states)
+
+
+    # --------------------------------------------------------------------------
     #
     def _job_get_stats(self, id):
         '''
-        get the job stats from the wrapper shell
+        get the job stats from the wrapper shell, including the tail of the
+        job's stdout and stderr.  This is only used on demand -- state polling
+        uses the leaner `_job_get_status()`.
         '''
 
         rm, pid = self._adaptor.parse_id(id)
 
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync("STATS %s\n" % pid)
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("STATS %s\n" % pid)
 
         if ret != 0:
             raise rse.NoSuccess("failed to get job stats for '%s':(%s)(%s)"
@@ -853,6 +1037,38 @@ class ShellJobService(cpi.Service):
 
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _job_get_output(self, id, stream, offset=0, length=None):
+        '''
+        get (part of) the job's stdout ('out'), stderr ('err') or log ('log')
+        from the wrapper shell, as bytes.  A negative offset counts from the
+        end of the stream, so that `offset=-1024` returns the last 1kB.
+        '''
+
+        rm, pid = self._adaptor.parse_id(id)
+
+        cmd = "OUTPUT %s %s %s %d" % (pid, stream, self.output_enc, offset)
+        if length is not None:
+            cmd += " %d" % length
+
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync(cmd)
+
+        if ret != 0:
+            raise rse.NoSuccess("failed to get job %s for '%s':(%s)(%s)"
+                               % (stream, id, ret, out))
+
+        lines = [_f for _f in out.split("\n") if _f]
+
+        if len(lines) < 2 or lines[0] != "OK":
+            raise rse.NoSuccess("failed to get valid job %s for '%s'(%s)"
+                               % (stream, id, lines))
+
+        # the wrapper reports the encoding it actually used
+        return _decode(''.join(lines[2:]), lines[1].strip())
+
+
     # --------------------------------------------------------------------------
     #
     # TODO: this should also fetch the(final) state, to safe a hop
@@ -864,8 +1080,8 @@ class ShellJobService(cpi.Service):
 
         rm, pid = self._adaptor.parse_id(id)
 
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync("RESULT %s\n" % pid)
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("RESULT %s\n" % pid)
 
         if ret != 0:
             raise rse.NoSuccess ("failed to get exit code for '%s':(%s)(%s)"
@@ -905,8 +1121,8 @@ class ShellJobService(cpi.Service):
 
         rm, pid = self._adaptor.parse_id(id)
 
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync("SUSPEND %s\n" % pid)
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("SUSPEND %s\n" % pid)
 
         if ret != 0:
             raise rse.NoSuccess("failed to suspend job '%s':(%s)(%s)"
@@ -921,8 +1137,8 @@ class ShellJobService(cpi.Service):
 
         rm, pid = self._adaptor.parse_id(id)
 
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync("RESUME %s\n" % pid)
+        with self.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("RESUME %s\n" % pid)
 
         if ret != 0:
             raise rse.NoSuccess("failed to resume job '%s':(%s)(%s)"
@@ -937,8 +1153,8 @@ class ShellJobService(cpi.Service):
 
         rm, pid = self._adaptor.parse_id(id)
 
-        with self._shell_lock:
-            ret, out, err = self.shell.run_sync("CANCEL %s\n" % pid)
+        with self.channels.lease() as shell:
+            ret, out, err = shell.run_sync("CANCEL %s\n" % pid)
 
         if ret != 0:
             raise rse.NoSuccess("failed to cancel job '%s':(%s)(%s)(%s)"
@@ -1020,34 +1236,18 @@ class ShellJobService(cpi.Service):
     @SYNC_CALL
     def list(self):
 
-        # FIXME: this should also fetch job state and metadata, and cache those
-
-        with self._shell_lock:
-            ret, out, _ = self.shell.run_sync("LIST\n")
-
-        if ret != 0:
-            raise rse.NoSuccess("failed to list jobs:(%s)(%s)" % (ret, out))
-
-        lines = [_f for _f in out.split("\n") if _f]
-        self._logger.debug(lines)
-
-        if lines[0] != "OK":
-            raise rse.NoSuccess("failed to list jobs(%s)" % (lines))
-
-        del lines[0]
+        # we get the job states for free -- pass them on to known jobs
+        states  = self._job_get_states()
         job_ids = list()
 
-        for line in lines:
+        for pid, state in states.items():
 
-            try:
-                pid    = line.strip()
-                job_id = "[%s]-[%s]" % (self.rm, pid)
-                job_ids.append(job_id)
+            job_id = "[%s]-[%s]" % (self.rm, pid)
+            job_ids.append(job_id)
 
-            except Exception as e:
-                self._logger.debug("Ignore ill-formatted job id(%s)(%s)"
-                                  % (line, e))
-                continue
+            job = self.jobs.get(job_id)
+            if job and job._adaptor._state not in _FINAL:
+                job._adaptor._set_state(self._adaptor.string_to_state(state))
 
         return job_ids
 
@@ -1093,7 +1293,7 @@ class ShellJobService(cpi.Service):
         # FIXME: this just assumes that all tasks are job creation tasks --
         #        which is not necessarily true...
 
-        self._logger.debug("container run: %s"  %  str(jobs))
+        self._logger.debug("container run: %d jobs", len(jobs))
 
         bulk = "BULK\n"
 
@@ -1101,23 +1301,22 @@ class ShellJobService(cpi.Service):
             cmd   = self._jd2cmd(job.description)
             bulk += "RUN %s\n" % cmd
 
-        # ------------------------------------------------------------
-        # stage input data
-        # FIXME: this is now blocking the run() method.  Ideally, this activity
-        # should be passed to a data manager thread/process/service.
-        for job in jobs:
-            self._adaptor.stage_input(self.shell, self._shell_lock,
-                                      job.description)
-        # ------------------------------------------------------------
-
         bulk += "BULK_RUN\n"
-        with self._shell_lock:
+        with self.channels.lease() as shell:
+
+            # --------------------------------------------------------
+            # stage input data
+            # FIXME: this is now blocking the run() method.  Ideally, this
+            # activity should be passed to a data manager thread/process/service.
+            for job in jobs:
+                self._adaptor.stage_input(shell, job.description)
+            # --------------------------------------------------------
 
-            self.shell.run_async(bulk)
+            shell.run_async(bulk)
 
             for job in jobs:
 
-                ret, out = self.shell.find_prompt()
+                ret, out = shell.find_prompt()
 
                 if ret != 0:
                     job._adaptor._set_state(api.FAILED)
@@ -1152,9 +1351,10 @@ class ShellJobService(cpi.Service):
                 # But, actually, the container sorter should have done that already?
                 # Check!
                 job._adaptor._id = job_id
+                self.jobs[job_id] = job
 
             # we also need to find the output of the bulk op itself
-            ret, out = self.shell.find_prompt()
+            ret, out = shell.find_prompt()
 
             if ret != 0:
                 self._logger.error("failed to run(parts of ) bulk jobs:(%s)(%s)"
@@ -1184,7 +1384,7 @@ class ShellJobService(cpi.Service):
         # FIXME: we ignore the job wait mode(ALL/ANY), and always wait for all
         #        jobs...
 
-        self._logger.debug("container wait: %s"  %  str(jobs))
+        self._logger.debug("container wait: %d jobs", len(jobs))
 
         bulk = "BULK\n"
 
@@ -1204,12 +1404,12 @@ class ShellJobService(cpi.Service):
 
         bulk += "BULK_RUN\n"
 
-        with self._shell_lock:
-            self.shell.run_async(bulk)
+        with self.channels.lease() as shell:
+            shell.run_async(bulk)
 
             for job in jobs:
 
-                ret, out = self.shell.find_prompt()
+                ret, out = shell.find_prompt()
 
                 if ret != 0:
                     job._adaptor._set_state(api.FAILED)
@@ -1232,7 +1432,7 @@ class ShellJobService(cpi.Service):
                     continue
 
             # we also need to find the output of the bulk op itself
-            ret, out = self.shell.find_prompt()
+            ret, out = shell.find_prompt()
 
             if ret != 0:
                 self._logger.error("failed to wait for(part of) bulk job:(%s)(%s)"
@@ -1257,7 +1457,8 @@ class ShellJobService(cpi.Service):
     @SYNC_CALL
     def container_cancel(self, jobs, timeout):
 
-        self._logger.debug("container cancel: %s [%s]"  % (str(jobs), timeout))
+        self._logger.debug("container cancel: %d jobs [%s]",
+                           len(jobs), timeout)
 
         bulk = "BULK\n"
 
@@ -1267,12 +1468,12 @@ class ShellJobService(cpi.Service):
 
         bulk += "BULK_RUN\n"
 
-        with self._shell_lock:
-            self.shell.run_async(bulk)
+        with self.channels.lease() as shell:
+            shell.run_async(bulk)
 
             for job in jobs:
 
-                ret, out = self.shell.find_prompt()
+                ret, out = shell.find_prompt()
 
                 if ret != 0:
                     job._adaptor._set_state(api.FAILED)
@@ -1295,7 +1496,7 @@ class ShellJobService(cpi.Service):
                     continue
 
             # we also need to find the output of the bulk op itself
-            ret, out = self.shell.find_prompt()
+            ret, out = shell.find_prompt()
 
             if ret != 0:
                 self._logger.error("failed to cancel part of bulk job:(%s)(%s)"
@@ -1320,73 +1521,28 @@ class ShellJobService(cpi.Service):
     @SYNC_CALL
     def container_get_states(self, jobs):
 
-        self._logger.debug("container get_state: %s"  %  str(jobs))
-
-        bulk   = "BULK\n"
-        states = []
-
-        for job in jobs:
-
-          # print(job)
-          # job._attributes_dump()
-
-            rm, pid = self._adaptor.parse_id(job.id)
-            bulk   += "STATE %s\n" % pid
-
-        bulk += "BULK_RUN\n"
-
-        with self._shell_lock:
-            self.shell.run_async(bulk)
-
-            for job in jobs:
-
-                ret, out = self.shell.find_prompt()
-
-                if ret != 0:
-                    job._adaptor._set_state(api.FAILED)
-                    job._adaptor._exception = rse.NoSuccess \
-                           ("failed to get job state:(%s)(%s)" % (ret, out))
-                    continue
-
-                lines = [_f for _f in out.split("\n") if _f]
-
-                if len(lines) < 2:
-                    job._adaptor._set_state(api.FAILED)
-                    job._adaptor._exception = rse.NoSuccess \
-                           ("failed to get job state:(%s)(%s)" % (ret, out))
-                    continue
-
-                if lines[-2] != "OK":
-                    job._adaptor._set_state(api.FAILED)
-                    job._adaptor._exception = rse.NoSuccess \
-                           ("failed to get job state:(%s)(%s)" % (ret, out))
-                    continue
+        self._logger.debug("container get_state: %d jobs", len(jobs))
 
-                state = self._adaptor.string_to_state(lines[-1])
+        pids = [self._adaptor.parse_id(job.id)[1] for job in jobs]
 
-                job._adaptor._update_state(state)
-                states.append(state)
+        # for many jobs, only ask for state changes since the last call
+        if len(pids) > _BULK_STATES:
+            known = self._job_get_changed_states()
+            new   = [pid for pid in pids if pid not in known]
+            if new:
+                known.update(self._job_get_states(new))
 
+        else:
+            known = self._job_get_states(pids)
 
-            # we also need to find the output of the bulk op itself
-            ret, out = self.shell.find_prompt()
-
-            if ret != 0:
-                self._logger.error("no state for part of bulk job:(%s)(%s)"
-                                  % (ret, out))
-                return
-
-            lines = [_f for _f in out.split("\n") if _f]
+        states = list()
+        for job, pid in zip(jobs, pids):
 
-            if len(lines) < 2:
-                self._logger.error("Cannot eval status of bulk job:(%s)(%s)"
-                                  % (ret, out))
-                return
+            state = self._adaptor.string_to_state(known.get(pid, 'UNKNOWN'))
 
-            if lines[-2] != "OK":
-                self._logger.error("no state for part of bulk job:(%s)(%s)"
-                                  % (ret, out))
-                return
+            # state updates may need to stage output data
+            job._adaptor._poll_update(state)
+            states.append(state)
 
         return states
 
@@ -1402,6 +1558,9 @@ class ShellJob(cpi.Job):
         _cpi_base = super (ShellJob, self)
         _cpi_base.__init__(api, adaptor)
 
+        # set on final states, to wake up `wait()`
+        self._final_ev = mt.Event()
+
 
     # --------------------------------------------------------------------------
     #
@@ -1428,6 +1587,9 @@ class ShellJob(cpi.Job):
             self._name            = self.jd.name
             self._started         = None
             self._finished        = None
+            self._state_time      = None   # last state change or poll
+            self._final           = False  # final state seen by a poll
+            self._output_staged   = False
 
             self._set_state(api.NEW)
 
@@ -1445,6 +1607,9 @@ class ShellJob(cpi.Job):
             self._name            = None
             self._started         = None
             self._finished        = None
+            self._state_time      = None
+            self._final           = False
+            self._output_staged   = False
 
         else:
             # don't know what to do...
@@ -1469,20 +1634,25 @@ class ShellJob(cpi.Job):
 
         old_state = self._state
 
-        if state == api.DONE and \
-            old_state not in [api.DONE, api.FAILED, api.CANCELED]:
+        # the monitor may have seen `DONE` already -- but it does not stage
+        if state == api.DONE and not self._output_staged:
 
             # stage output data
             # FIXME: _update_state blocks until data are staged.
             #        That should not happen.
-            self._adaptor.stage_output(self.js.shell, self.js._shell_lock,
-                                       self.jd)
+            with self.js.channels.lease() as shell:
+                self._adaptor.stage_output(shell, self.jd)
+
+            self._output_staged = True
 
         # files are staged -- update state, and report to application
         self._state = state
         if self._state != old_state:
             self._api()._attributes_i_set('state', self._state, self._api()._UP)
 
+        if self._state in _FINAL:
+            self._final_ev.set()
+
 
     # --------------------------------------------------------------------------
     #
@@ -1496,7 +1666,11 @@ class ShellJob(cpi.Job):
         if self._id is None:
             return self._state
 
-        stats = self.js._job_get_stats(self._id)
+        if self._state_cached():
+            return self._state
+
+        stats = self.js._job_get_status(self._id)
+        self._state_time = time.time()
 
         if 'start' in stats: self._started  = stats['start']
         if 'stop'  in stats: self._finished = stats['stop']
@@ -1504,11 +1678,10 @@ class ShellJob(cpi.Job):
         if self._started : self._started  = float(self._started)
         if self._finished: self._finished = float(self._finished)
 
-        # no need to re-check final states
-        if self._state == api.DONE      or \
-           self._state == api.FAILED    or \
-           self._state == api.CANCELED    :
-                return self._state
+        # no need to re-check final states (unless they were only reported by
+        # the monitor so far)
+        if self._final or self._state == api.CANCELED:
+            return self._state
 
         if 'state' not in stats:
             raise rse.NoSuccess("failed to get job state for '%s':(%s)"
@@ -1517,22 +1690,97 @@ class ShellJob(cpi.Job):
         if self._exit_code is None and stats.get('ecode'):
             self._exit_code = int(stats['ecode'])
 
-        self._update_state(self._adaptor.string_to_state(stats['state']))
+        self._poll_update(self._adaptor.string_to_state(stats['state']))
 
         return self._state
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _poll_update(self, state):
+        '''
+        update the job state with the result of a state poll.  The monitor may
+        have set a final state already -- the stderr tail of a failed job is
+        logged on the first poll which sees it failed.
+        '''
+
+        if state == api.FAILED and not self._final:
+            self._log_stderr()
+
+        self._update_state(state)
+        self._final = self._state in _FINAL
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _log_stderr(self):
+        '''
+        add the tail of the stderr of a failed job to the job log
+        '''
+
+        try:
+            err = self.js._job_get_output(self._id, 'err', -_ERR_TAIL)
+            self._log.append('stderr: %s' % err.decode('utf-8', 'replace'))
+
+        except Exception as e:
+            self._logger.warning('no stderr for %s: %s' % (self._id, e))
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _notified(self):
+        '''
+        With notifications enabled, the monitor thread keeps the state of the
+        jobs started by this service up to date.
+        '''
+
+        js = self.js
+
+        if not js.notifications:
+            return False
+
+        return self._id in js.jobs and js.monitor.is_alive()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _state_cached(self):
+        '''
+        If the job state is kept up to date by the monitor thread, we don't need
+        to ask the wrapper.  We still poll once the state is older than
+        `state_cache_ttl` (in case notifications get lost), and on final states
+        (to get stats and exit code, and to stage output) -- those are then
+        cached for good.
+        '''
+
+        if self.js.state_ttl <= 0 or not self._notified():
+            return False
+
+        if self._state_time is None:
+            return False
+
+        if self._state in _FINAL:
+            # cache final states only once they have been polled
+            return self._final
+
+        return time.time() - self._state_time < self.js.state_ttl
+
+
     # --------------------------------------------------------------------------
     #
     def _set_state(self, state):
 
         old_state = self._state
+        self._state_time = time.time()
 
         # on state changes, trigger notifications
         if old_state != state:
             self._state  = state
             self._api()._attributes_i_set('state', self._state, self._api()._UP)
 
+        if state in _FINAL:
+            self._final_ev.set()
+
         return self._state
 
 
@@ -1565,8 +1813,11 @@ class ShellJob(cpi.Job):
 
     # --------------------------------------------------------------------------
     #
-    @SYNC_CALL
-    def get_stdout(self):
+    def _get_output(self, stream, offset=0, length=None):
+        '''
+        Return (part of) the job's stdout ('out') or stderr ('err') as bytes --
+        see `ShellJobService._job_get_output()`.
+        '''
 
         state = self.get_state() # refresh stats
 
@@ -1579,22 +1830,15 @@ class ShellJob(cpi.Job):
             raise rse.IncorrectState \
                    ("Job output is only available after the job started")
 
-        rm, pid     = self._adaptor.parse_id(self._id)
-        ret, out, _ = self.js.shell.run_sync("STDOUT %s\n" % pid)
+        return self.js._job_get_output(self._id, stream, offset, length)
 
-        if ret != 0:
-            raise rse.NoSuccess \
-                   ("failed to get job stdout for '%s':(%s)(%s)"
-                     % (self._id, ret, out))
-
-        lines = [_f for _f in out.split("\n") if _f]
 
-        if lines[0] != "OK":
-            raise rse.NoSuccess \
-                   ("failed to get valid job stdout for '%s'(%s)"
-                     % (self._id, lines))
+    # --------------------------------------------------------------------------
+    #
+    @SYNC_CALL
+    def get_stdout(self):
 
-        return _decode('\n'.join(lines[1:]))
+        return self._get_output('out').decode('utf-8', 'replace')
 
 
     # --------------------------------------------------------------------------
@@ -1602,33 +1846,7 @@ class ShellJob(cpi.Job):
     @SYNC_CALL
     def get_stderr(self):
 
-        state = self.get_state() # refresh stats
-
-        if state == api.NEW      or \
-            state == api.PENDING :
-            raise rse.IncorrectState \
-                   ("Job output is only available after the job started")
-
-        if not self._id:
-            raise rse.IncorrectState \
-                   ("Job output is only available after the job started")
-
-        rm, pid     = self._adaptor.parse_id(self._id)
-        ret, out, _ = self.js.shell.run_sync("STDERR %s\n" % pid)
-
-        if ret != 0:
-            raise rse.NoSuccess \
-                   ("failed to get job stderr for '%s':(%s)(%s)"
-                     % (self._id, ret, out))
-
-        lines = [_f for _f in out.split("\n") if _f]
-
-        if lines[0] != "OK":
-            raise rse.NoSuccess \
-                   ("failed to get valid job stderr for '%s'(%s)"
-                     % (self._id, lines))
-
-        return _decode('\n'.join(lines[1:]))
+        return self._get_output('err').decode('utf-8', 'replace')
 
 
     # --------------------------------------------------------------------------
@@ -1646,8 +1864,10 @@ class ShellJob(cpi.Job):
             raise rse.IncorrectState \
                    ("Job output is only available after the job started")
 
-        rm, pid     = self._adaptor.parse_id(self._id)
-        ret, out, _ = self.js.shell.run_sync("LOG %s\n" % pid)
+        rm, pid = self._adaptor.parse_id(self._id)
+
+        with self.js.channels.lease() as shell:
+            ret, out, _ = shell.run_sync("LOG %s\n" % pid)
 
         if ret != 0:
             raise rse.NoSuccess \
@@ -1662,7 +1882,7 @@ class ShellJob(cpi.Job):
                      % (self._id, lines))
 
         ret  = '\n'.join(self._log)  # pre-pend all local log messages
-        ret += _decode('\n'.join(lines[1:]))
+        ret += _decode('\n'.join(lines[1:])).decode('utf-8', 'replace')
 
         return ret
 
@@ -1680,9 +1900,6 @@ class ShellJob(cpi.Job):
 
     # --------------------------------------------------------------------------
     #
-    # TODO: this should also fetch the(final) state, to safe a hop
-    # TODO: implement via notifications
-    #
     @SYNC_CALL
     def wait(self, timeout):
         '''
@@ -1690,30 +1907,39 @@ class ShellJob(cpi.Job):
         other interactions.  In particular, it would practically kill it if the
         Wait waits forever...
 
-        So we implement the wait via a state pull.  The *real* solution is, of
-        course, to implement state notifications, and wait for such
-        a notification to arrive within timeout seconds...
+        So we wait for the job to reach a final state, which is signalled by
+        the monitor thread if notifications are enabled (or by any other thread
+        which finds the job in a final state).  The state is still checked now
+        and then, in case notifications get lost -- that is served from the
+        state cache though (see `get_state()`).  Without notifications we poll
+        the state, with a delay growing from `_WAIT_MIN` to `_WAIT_MAX`.
         '''
 
         time_start = time.time()
-        time_now   = time_start
+        delay      = _WAIT_MIN
 
         while True:
 
             state = self.get_state()
 
-            if state in [api.DONE, api.FAILED, api.CANCELED]:
+            if state in _FINAL:
                 return True
 
-            # avoid busy poll
-            # FIXME: self-tune by checking call latency
-            time.sleep(0.1)
+            if self._notified():
+                wait = _WAIT_NOTIFY
+            else:
+                wait  = delay
+                delay = min(delay * 2, _WAIT_MAX)
 
             # check if we hit timeout
             if timeout >= 0:
-                time_now = time.time()
-                if time_now - time_start > timeout:
+                remaining = timeout - (time.time() - time_start)
+                if remaining <= 0:
                     return False
+                wait = min(wait, remaining)
+
+            self._final_ev.wait(wait)
+
 
     # --------------------------------------------------------------------------
     #
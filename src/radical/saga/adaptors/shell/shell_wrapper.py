@@ -5,8 +5,14 @@ __license__   = "MIT"
 
 
 import os
+import hashlib
 
 # --------------------------------------------------------------------
 # server side job management script
 _WRAPPER_SCRIPT = open (os.path.dirname(__file__) + '/shell_wrapper.sh').read ()
 
+# the script is staged under a versioned name, so that changes to the wrapper
+# protocol are picked up by hosts which have an older version staged already
+_WRAPPER_VERSION = hashlib.sha1 (_WRAPPER_SCRIPT.encode ()).hexdigest ()[:8]
+_WRAPPER_NAME    = 'wrapper.%s.sh' % _WRAPPER_VERSION
+
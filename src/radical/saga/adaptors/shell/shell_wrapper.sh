@@ -72,6 +72,7 @@ then
   BASE=$HOME/.radical/saga/adaptors/shell_job/
 fi
 NOTIFICATIONS="$BASE/notifications"
+INDEX="$BASE/index"
 LOG="$BASE/log"
 
 # this process will terminate when idle for longer than TIMEOUT seconds
@@ -80,6 +81,9 @@ TIMEOUT=300
 # update timestamp function
 TIMESTAMP=0
 
+# compact the job state index once it has that many uncompacted lines
+INDEX_MAX=10000
+
 PURGE_ON_START="%(PURGE_ON_START)s"
 
 # default exit value is 1, for error.  We need to set explicitly to 0 for
@@ -297,6 +301,7 @@ create_monitor () {
 
   MPID=\$\$
   NOTIFICATIONS="$NOTIFICATIONS"
+  INDEX="$INDEX"
 
 # \\echo "monitor starts (\$MPID)" >> $LOG
 
@@ -326,6 +331,7 @@ create_monitor () {
   START=\`\\awk 'BEGIN{srand(); print srand()}'\`
   \\printf "START  : \$START\n" > "\$DIR/stats"
   \\printf "NEW \n"            >> "\$DIR/state"
+  \\printf "\$UPID:NEW\n"       >> "\$INDEX"
 
   # create represents the job.  The 'exec' call will replace
   # the subshell instance with the job executable, leaving the I/O redirections
@@ -341,6 +347,7 @@ create_monitor () {
     export SAGA_UPID="\$UPID"
     \\printf  "`\date` : RUNNING \\n" >> "\$DIR/log"
     \\printf  "RUNNING \\n"           >> "\$DIR/state"
+    \\printf  "\$UPID:RUNNING\\n"    >> "\$INDEX"
     \\printf  "\$UPID:RUNNING: \\n"   >> "\$NOTIFICATIONS"
     \\exec "\$DIR/cmd"  <  "\$DIR/in"  > "\$DIR/out" 2> "\$DIR/err"
   ) 1>/dev/null 2>/dev/null 3</dev/null &
@@ -401,6 +408,9 @@ create_monitor () {
     test   "\$retv" -eq 0  && \\printf "DONE   \\n" >> "\$DIR/state"
     test   "\$retv" -eq 0  || \\printf "FAILED \\n" >> "\$DIR/state"
 
+    test   "\$retv" -eq 0  && \\printf "\$UPID:DONE\\n"   >> "\$INDEX"
+    test   "\$retv" -eq 0  || \\printf "\$UPID:FAILED\\n" >> "\$INDEX"
+
     test   "\$retv" -eq 0  && \\printf "\$UPID:DONE:\$retv   \\n" >> "\$NOTIFICATIONS"
     test   "\$retv" -eq 0  || \\printf "\$UPID:FAILED:\$retv \\n" >> "\$NOTIFICATIONS"
 
@@ -541,6 +551,222 @@ cmd_state () {
 }
 
 
+# --------------------------------------------------------------------
+#
+# inspect job status: print a single line 'id:state:ecode:start:stop', with
+# empty fields for values not (yet) known.  This is used for state polling, so
+# it reads the job's state, stats and exit files in a single awk call.
+#
+cmd_status () {
+  verify_state $1 || return
+
+  DIR="$BASE/$1"
+  EXIT=""
+  test -r "$DIR/exit" && EXIT="$DIR/exit"
+
+  RETVAL=`\awk -v id="$1" '
+    FILENAME ~ /state$/ && / $/ { state = $1 }
+    FILENAME ~ /stats$/ && /^START/ { start = $3 }
+    FILENAME ~ /stats$/ && /^STOP/  { stop  = $3 }
+    FILENAME ~ /exit$/  { ecode = $1 }
+    END {
+      if (state == "") state = "UNKNOWN"
+      print id ":" state ":" ecode ":" start ":" stop
+    }' "$DIR/state" "$DIR/stats" $EXIT 2>/dev/null`
+}
+
+
+# --------------------------------------------------------------------
+#
+# job state index: next to the per-job state files, all state transitions are
+# appended to a single index file as 'id:STATE' lines, so that LIST, PURGE and
+# STATES do not need to scan all job directories.  The index consists of
+#
+#   $INDEX       : appended to by the monitors and by the wrapper
+#   $INDEX.base  : the compacted part, one line per (unpurged) job
+#   $INDEX.tmp   : the appended part while it is being compacted
+#   $INDEX.gen   : generation counter, odd while a compaction is in progress
+#
+# The compaction merges the appended part into the base and drops purged jobs.
+# It is triggered by a PURGE which purged jobs, and once the appended part grows
+# beyond INDEX_MAX lines.  A compaction left unfinished by a dead process is
+# redone by the next reader.  Readers use the generation counter like a seqlock, i.e. they read
+# again if a compaction happened meanwhile.
+#
+index_add () {
+  \printf "$1:$2\n" >> "$INDEX"
+}
+
+index_set_gen () {
+  \printf "$1\n" > "$INDEX.gen.$GID"
+  \mv -f "$INDEX.gen.$GID" "$INDEX.gen"
+}
+
+# read 'id:STATE' lines from stdin, and print the last state of each job which
+# was not purged.  The lines after a '#' line (the appended part of the index)
+# are counted, and the first '$1' of them are skipped.  The count is printed
+# last, as '#<count>'.
+index_scan () {
+  \awk -F: -v skip="${1:-0}" '
+    /^#$/       { cnt = 0; next }
+                { cnt++ }
+    cnt <= skip { next }
+    NF < 2      { next }
+    !($1 in s)  { ids[n++] = $1 }
+                { s[$1] = $2 }
+    END         { for (i = 0; i < n; i++)
+                    if (s[ids[i]] != "PURGED") print ids[i] ":" s[ids[i]]
+                  print "#" cnt + 0 }'
+}
+
+# the index lock is a directory -- it is taken over if the owning process died
+index_lock () {
+  if \mkdir "$INDEX.lock" 2>/dev/null
+  then
+    \printf "$GID `\uname -n`\n" > "$INDEX.lock/owner"
+    return 0
+  fi
+
+  owner=`\cat "$INDEX.lock/owner" 2>/dev/null`
+  if test "${owner#* }" = "`\uname -n`" && ! \kill -0 "${owner%% *}" 2>/dev/null
+  then
+    \rm -rf "$INDEX.lock"
+    \mkdir  "$INDEX.lock" 2>/dev/null || return 1
+    \printf "$GID `\uname -n`\n" > "$INDEX.lock/owner"
+    return 0
+  fi
+
+  return 1
+}
+
+index_compact () {
+  index_lock || return 0
+
+  GEN=`\cat "$INDEX.gen" 2>/dev/null`
+  GEN=$((${GEN:-0} / 2 * 2 + 1))
+  index_set_gen $GEN
+
+  # new lines are appended to a new index from here on.  A left-over tmp file
+  # (from an aborted compaction) is compacted first.
+  test -f "$INDEX.tmp" || \mv -f "$INDEX" "$INDEX.tmp" 2>/dev/null
+
+  # only keep jobs which still have a job directory.  That list is taken
+  # *after* moving the index, so that jobs created meanwhile are kept.
+  \ls -1 "$BASE" > "$INDEX.dirs"
+  \cat "$INDEX.base" "$INDEX.tmp" 2>/dev/null | index_scan \
+    | \awk -F: 'FNR == NR { d[$1] = 1; next } $1 in d' "$INDEX.dirs" - \
+    > "$INDEX.new"
+
+  \mv -f "$INDEX.new" "$INDEX.base"
+  \rm -f "$INDEX.tmp" "$INDEX.dirs"
+  index_set_gen $(($GEN + 1))
+  \rm -rf "$INDEX.lock"
+}
+
+# create the index from the job state files, if there is none yet
+index_init () {
+  test -f "$INDEX.gen" && return
+  \mkdir -p "$BASE" 2>/dev/null
+  index_lock || return
+
+  (\cd "$BASE" && \find . -name state | states_table) > "$INDEX.new"
+  \mv -f "$INDEX.new" "$INDEX.base"
+  index_set_gen 0
+  \rm -rf "$INDEX.lock"
+}
+
+# read the index and set TABLE to the 'id:STATE' lines of all jobs, or of the
+# jobs changed since a given generation ($1) and line count ($2) -- MARK is set
+# to '<generation>.<count>' for the next call.  If the index is not usable, the
+# state files are scanned instead, and MARK is set to 'x'.
+index_read () {
+  TRIES=0
+  while test -f "$INDEX.gen" -a $TRIES -lt 10
+  do
+    TRIES=$(($TRIES + 1))
+    GEN=`\cat "$INDEX.gen" 2>/dev/null`
+    case "$GEN" in
+      ''       ) \sleep 1; continue ;;
+
+      # a compaction is in progress -- if its process died, redo it
+      *[13579] ) index_compact
+                 case "`\cat "$INDEX.gen" 2>/dev/null`" in
+                   *[13579] ) \sleep 1 ;;
+                 esac
+                 continue ;;
+    esac
+
+    if test "$GEN" = "$1"
+    then
+      OUT=`(\printf "#\n"; \cat "$INDEX" 2>/dev/null) | index_scan "$2"`
+    else
+      OUT=`(\cat "$INDEX.base" "$INDEX.tmp" 2>/dev/null; \printf "#\n"; \
+            \cat "$INDEX" 2>/dev/null) | index_scan`
+    fi
+
+    if test "$GEN" = "`\cat "$INDEX.gen" 2>/dev/null`"
+    then
+      TABLE=`\printf "%s\n" "$OUT" | \grep -v '^#'`
+      COUNT=`\printf "%s\n" "$OUT" | \sed -n 's/^#//p'`
+      MARK="$GEN.$COUNT"
+      test "$COUNT" -gt "$INDEX_MAX" && index_compact
+      return
+    fi
+  done
+
+  TABLE=`(\cd "$BASE" && \find . -name state | states_table)`
+  MARK="x"
+}
+
+
+# --------------------------------------------------------------------
+#
+# inspect the states of many jobs at once: print one line 'id:state' per job.
+#
+#   STATES <id> [<id> ...] : states of the given jobs
+#   STATES                 : states of all jobs
+#   STATES -s [<mark>]     : states of all jobs whose state changed since the
+#                            given mark was returned (all jobs if the mark is
+#                            not given or not valid anymore).  The first line
+#                            is a new mark to be used for the next call.
+#
+# The states of all jobs are read from the index.  The states of given jobs are
+# read from their state files by a single awk pass (via xargs, to stay within
+# the command line limits).  Marks are positions in the index.
+#
+states_table () {
+  \xargs \awk '
+    FNR == 1 && id != "" { print id ":" state }
+    FNR == 1 { id = FILENAME; sub(/\/state$/, "", id); sub(/^\.\//, "", id)
+               state = "UNKNOWN" }
+    / $/     { state = $1 }
+    END      { if (id != "") print id ":" state }' 2>/dev/null
+}
+
+cmd_states () {
+  if test "$1" = "-s"
+  then
+    index_read "${2%.*}" "${2##*.}"
+    RETVAL="$MARK\n$TABLE"
+
+  elif test -z "$1"
+  then
+    index_read
+    RETVAL="$TABLE"
+
+  else
+    MISSING=""
+    for id in "$@"
+    do
+      test -r "$BASE/$id/state" || MISSING="$MISSING\n$id:UNKNOWN"
+    done
+    TABLE=`(\cd "$BASE" && for id in "$@"; do test -r "$id/state" \
+                          && \printf "$id/state\n"; done | states_table)`
+    RETVAL="$TABLE$MISSING"
+  fi
+}
+
+
 # --------------------------------------------------------------------
 #
 # retrieve job stats
@@ -562,7 +788,7 @@ cmd_stats () {
   # for obvious reasons.  Oh heck, we always deliver it, that makes parsing
   # simpler -- but we deliver more on errors
   N=10
-  if test "$state" = "FAILED"
+  if test "$STATE" = "FAILED"
   then
     N=100
   fi
@@ -571,8 +797,8 @@ cmd_stats () {
 
   # same procedure for stdout -- this will not be returned to the end user, but
   # is mostly for debugging
-  STDERR=`test -f "$DIR/err" && \tail -n $N "$DIR/err"`
-  RETVAL="$RETVAL\nSTART_STDOUT\n$STDERR\nEND_STDOUT\n"
+  STDOUT=`test -f "$DIR/out" && \tail -n $N "$DIR/out"`
+  RETVAL="$RETVAL\nSTART_STDOUT\n$STDOUT\nEND_STDOUT\n"
 }
 
 
@@ -654,6 +880,7 @@ cmd_suspend () {
   if test "$ECODE" = "0"
   then
     \printf "SUSPENDED \n" >>  "$DIR/state"
+    index_add "$1" SUSPENDED
     \printf "$state \n"    >   "$DIR/state.susp"
     RETVAL="$1 suspended"
   else
@@ -690,6 +917,7 @@ cmd_resume () {
   then
     test -s "$DIR/state.susp" || \printf "RUNNING \n" >  "$DIR/state.susp"
     \cat    "$DIR/state.susp"                         >> "$DIR/state"
+    index_add "$1" `\tr -d ' \n' < "$DIR/state.susp"`
     \rm  -f "$DIR/state.susp"
     RETVAL="$1 resumed"
   else
@@ -732,6 +960,7 @@ cmd_cancel () {
 
   # FIXME: how can we check for success?  ps?
   \printf "CANCELED \n" >> "$DIR/state"
+  index_add "$1" CANCELED
   RETVAL="$1 CANCELED"
 }
 
@@ -786,12 +1015,92 @@ cmd_log () {
 }
 
 
+# --------------------------------------------------------------------
+#
+# find the tools to base64 encode (and gzip) job output -- this is done once,
+# on first use.  If base64 encoding is not available, we fall back to hex.
+#
+probe_encoders () {
+  test -z "$ENCODERS" || return
+
+  ENCODERS="hex"
+  B64=""
+  for c in 'base64' 'openssl base64'
+  do
+    if test "`\printf 'a' | $c 2>/dev/null`" = "YQ=="
+    then
+      B64="$c"
+      ENCODERS="hex base64"
+      break
+    fi
+  done
+
+  if test -n "$B64" && \gzip -c < /dev/null > /dev/null 2>&1
+  then
+    ENCODERS="hex base64 gzip"
+  fi
+}
+
+
+# --------------------------------------------------------------------
+#
+# print (part of) the job's stdout, stderr or log, encoded.  Arguments are the
+# job id, the stream ('out', 'err', 'log'), the requested encoding ('hex',
+# 'base64', 'gzip' for gzip+base64), and optionally the offset (negative for
+# the last bytes) and length of the part to return.  The first line of the
+# result is the encoding actually used.
+#
+output_part () {
+  if test -z "$LEN"
+  then \tail -c +$(($OFF + 1)) "$FILE"
+  else \tail -c +$(($OFF + 1)) "$FILE" | \head -c "$LEN"
+  fi
+}
+
+cmd_output () {
+  verify_dir $1 || return
+
+  case "$2" in
+    out | err | log ) ;;
+    *               ) ERROR="invalid stream '$2'"; return ;;
+  esac
+
+  FILE="$BASE/$1/$2"
+  if ! test -r "$FILE"; then ERROR="pid $1 has no $2"; return 1; fi
+
+  probe_encoders
+  ENC="$3"
+  case " $ENCODERS " in
+    *" $ENC "* ) ;;
+    *          ) ENC="hex" ;;
+  esac
+
+  OFF="${4:-0}"
+  LEN="$5"
+  if test "$OFF" -lt 0
+  then
+    SIZE=`\wc -c < "$FILE"`
+    OFF=$(($SIZE + $OFF))
+    test "$OFF" -lt 0 && OFF=0
+  fi
+
+  case "$ENC" in
+    gzip   ) DATA=`output_part | \gzip -c | $B64` ;;
+    base64 ) DATA=`output_part | $B64` ;;
+    *      ) DATA=`output_part | \od -t x1 -A n | \tr -d ' \n'` ;;
+  esac
+
+  RETVAL="$ENC\n$DATA"
+}
+
+
 # --------------------------------------------------------------------
 #
 # list all job IDs
 #
 cmd_list () {
-  RETVAL=`(\cd "$BASE" ; \ls -C1 -d */ 2>/dev/null) | \cut -f 1 -d '/'`
+  index_read
+  RETVAL=`\printf "%s\n" "$TABLE" | \cut -f 1 -d ':'`
 }
 
 
@@ -808,16 +1117,27 @@ cmd_purge () {
   then
     DIR="$BASE/$1"
     \rm -rf "$DIR" || true
+    test -d "$DIR" || index_add "$1" PURGED
     RETVAL="purged $1"
   else
-    for d in `\grep -l -e 'DONE' -e 'FAILED' -e 'CANCELED' "$BASE"/*/state 2>/dev/null`
+    index_read
+    PURGED=0
+    for id in `\printf "%s\n" "$TABLE" | \grep -e ':DONE$' -e ':FAILED$' \
+                                           -e ':CANCELED$' | \cut -f 1 -d ':'`
     do
-      dir=`dirname "$d"`
-      id=`basename "$dir"`
+      test -d "$BASE/$id" || continue
       \find  "$BASE/$id"      -type f -mtime +1 -print | xargs -n 100 rm -f
-      \rmdir "$BASE/$id"      >/dev/null 2>&1
+      if \rmdir "$BASE/$id"   >/dev/null 2>&1
+      then
+        index_add "$id" PURGED
+        PURGED=$(($PURGED + 1))
+      fi
       \touch "$NOTIFICATIONS"
     done
+
+    # compacting invalidates the marks of 'STATES -s', so only compact if
+    # needed (index_read compacts an index which grew too large)
+    test "$PURGED" -gt 0 && index_compact
     RETVAL="purged finished jobs"
   fi
 }
@@ -845,7 +1165,8 @@ cmd_purge_tmps () {
   \rm -f "$BASE"/idle.*
   \rm -f "$BASE"/quit.*
   \find  "$BASE" -type d -mtime +30 -print | xargs -n 100 \rm -rf || true
-  \find  "$BASE" -type f -mtime +30 -print | xargs -n 100 \rm -f  || true
+  \find  "$BASE" -type f -mtime +30 ! -name 'index*' -print \
+                                      | xargs -n 100 \rm -f  || true
   RETVAL="purged tmp files"
 }
 
@@ -907,9 +1228,15 @@ cmd_help() {
         RESULT  <id>       - show job return value
         RESUME  <id>       - resume job after suspend
         STATE   <id>       - print state of job
+        STATUS  <id>       - print id:state:ecode:start:stop of job
+        STATES  <id> ...   - print id:state of jobs (all if no id given)
+        STATES  -s [mark]  - print new mark, and id:state of all jobs changed
+                             since mark
         STATS   <id>       - print stats of job
         STDERR  <id>       - print stderr of job
         STDOUT  <id>       - print stdout of job
+        OUTPUT  <id> <stream> <enc> [<offset> [<length>]]
+                           - print (part of) stdout/stderr/log of job
         STDIN   <id> <txt> - send txt to stdin of job
         CANCEL  <id>       - cancel job
         SUSPEND <id>       - suspend job
@@ -998,12 +1325,15 @@ listen() {
         CANCEL    ) cmd_cancel  "$ARGS"  ;;
         RESULT    ) cmd_result  "$ARGS"  ;;
         STATE     ) cmd_state   "$ARGS"  ;;
+        STATUS    ) cmd_status  "$ARGS"  ;;
+        STATES    ) cmd_states   $ARGS   ;;
         STATS     ) cmd_stats   "$ARGS"  ;;
         WAIT      ) cmd_wait    "$ARGS"  ;;
         STDIN     ) cmd_stdin   "$ARGS"  ;;
         STDOUT    ) cmd_stdout  "$ARGS"  ;;
         STDERR    ) cmd_stderr  "$ARGS"  ;;
         LOG       ) cmd_log     "$ARGS"  ;;
+        OUTPUT    ) cmd_output   $ARGS   ;;
         LIST      ) cmd_list    "$ARGS"  ;;
         PURGE     ) cmd_purge   "$ARGS"  ;;
         PING      ) cmd_ping    "$ARGS"  ;;
@@ -1068,6 +1398,9 @@ listen() {
 # confirm existence
 \printf "PID: $GID\n"
 
+# make sure the job state index exists
+index_init
+
 # FIXME: this leads to timing issues -- disable for benchmarking
 if test "$PURGE_ON_START" = "True"
 then
@@ -148,6 +148,127 @@ class Callback () :
 
 
 
+# ------------------------------------------------------------------------------
+#
+class _AttributesDict (dict) :
+    """
+    This class is not part of the public attribute API.
+
+    Per-instance view on a compiled attribute schema (see
+    :func:`Attributes._attributes_schema`).  The schema entries are shared
+    between all instances of a class, and are only copied into the instance
+    when they are accessed -- so an instance only pays for the attributes it
+    actually touches.  Entries added after construction (extended attributes,
+    re-registrations) live in the instance only, removed schema entries are
+    remembered in `_removed`.
+    """
+
+    # --------------------------------------------------------------------------
+    #
+    def __init__ (self, schema) :
+
+        dict.__init__ (self)
+
+        self._schema  = schema
+        self._removed = set()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def __missing__ (self, key) :
+
+        if  key in self._removed or key not in self._schema :
+            raise KeyError (key)
+
+        entry = dict (self._schema[key])
+
+        # lists and mutable values must not be shared between instances
+        for name in ['enums', 'checks', 'callbacks'] :
+            if  name in entry :
+                entry[name] = list (entry[name])
+
+        val = entry.get ('value')
+        if  isinstance (val, (list, dict)) :
+            entry['value'] = copy.deepcopy (val)
+            if  entry['default'] is val :
+                entry['default'] = entry['value']
+
+        dict.__setitem__ (self, key, entry)
+        return entry
+
+
+    # --------------------------------------------------------------------------
+    #
+    def __contains__ (self, key) :
+
+        if  dict.__contains__ (self, key) :
+            return True
+
+        return key in self._schema and key not in self._removed
+
+
+    # --------------------------------------------------------------------------
+    #
+    def __setitem__ (self, key, val) :
+
+        self._removed.discard (key)
+        dict.__setitem__ (self, key, val)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def __delitem__ (self, key) :
+
+        if  key not in self :
+            raise KeyError (key)
+
+        if  key in self._schema :
+            self._removed.add (key)
+
+        if  dict.__contains__ (self, key) :
+            dict.__delitem__ (self, key)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def __iter__ (self) :
+
+        for key in self._schema :
+            if  key not in self._removed :
+                yield key
+
+        for key in dict.__iter__ (self) :
+            if  key not in self._schema :
+                yield key
+
+
+    # --------------------------------------------------------------------------
+    #
+    def __len__ (self) :
+
+        n = len(self._schema) - len(self._removed)
+        for key in dict.__iter__ (self) :
+            if  key not in self._schema :
+                n += 1
+        return n
+
+
+    # --------------------------------------------------------------------------
+    #
+    def get (self, key, default=None) :
+
+        if  key in self :
+            return self[key]
+        return default
+
+
+    # --------------------------------------------------------------------------
+    #
+    def keys   (self) : return list(iter(self))
+    def values (self) : return [self[key]        for key in self]
+    def items  (self) : return [(key, self[key]) for key in self]
+
+
 # ------------------------------------------------------------------------------
 #
 class _AttributesBase (object) :
@@ -307,6 +428,14 @@ class Attributes (_AttributesBase, ru.DictMixin) :
     _camel_case_regex_1 = re.compile('(.)([A-Z][a-z]+)')
     _camel_case_regex_2 = re.compile('([a-z0-9])([A-Z])')
 
+    # the conversion results are cached, too -- the set of attribute names is
+    # small and fixed, so the cache remains small
+    _camel_case_cache   = dict()
+
+    # compiled attribute schemas, indexed by their registration function (see
+    # _attributes_schema)
+    _attributes_schemas = dict()
+
 
     # --------------------------------------------------------------------------
     #
@@ -475,7 +604,11 @@ class Attributes (_AttributesBase, ru.DictMixin) :
 
         # iterate over a copy of the callback list, so that remove does not
         # screw up the iteration
-        for cb in list (callbacks) :
+        for idx, cb in enumerate (list (callbacks)) :
+
+            # skip removed callbacks
+            if  cb is None :
+                continue
 
             call = cb
 
@@ -488,9 +621,10 @@ class Attributes (_AttributesBase, ru.DictMixin) :
             finally :
                 d['attributes'][key]['recursion'] = False
 
-            # remove callbacks which return 'False', or raised and exception
+            # remove callbacks which return 'False', or raised and exception.
+            # Do not pop from the list, that would invalidate the ids!
             if  not ret :
-                callbacks.remove (cb)
+                callbacks[idx] = None
 
 
 
@@ -741,8 +875,12 @@ class Attributes (_AttributesBase, ru.DictMixin) :
 
 
         if  force or d['camelcasing'] :
-            temp = Attributes._camel_case_regex_1.sub(r'\1_\2', key)
-            return Attributes._camel_case_regex_2.sub(r'\1_\2', temp).lower()
+            us_key = Attributes._camel_case_cache.get (key)
+            if  us_key is None :
+                temp   = Attributes._camel_case_regex_1.sub(r'\1_\2', key)
+                us_key = Attributes._camel_case_regex_2.sub(r'\1_\2', temp).lower()
+                Attributes._camel_case_cache[key] = us_key
+            return us_key
         else :
             return key
 
@@ -786,6 +924,16 @@ class Attributes (_AttributesBase, ru.DictMixin) :
         # perform flavor and type conversion
         val = self._attributes_t_conversion_flavor (key, val)
 
+        # enum values must be one of the allowed enums (if any are set).  None
+        # is always allowed.
+        if  d['attributes'][key]['type'] == ENUM and val is not None :
+
+            vals = d['attributes'][key]['enums']
+            if  vals and val not in vals :
+                raise se.BadParameter ("incorrect value (%s) for Enum typed "
+                                       "attribute (%s).Allowed values: %s"
+                                       % (str(val), key, str(vals)))
+
         # apply all value checks on the conversion result
         for check in d['attributes'][key]['checks'] :
             ret = check (key, val)
@@ -1504,10 +1652,10 @@ class Attributes (_AttributesBase, ru.DictMixin) :
             self._attributes_t_call_caller (key, id, None)
 
         # id == None: remove all callbacks
-        if not id :
+        if id is None :
             d['attributes'][key]['callbacks'] = []
         else :
-            if len (d['attributes'][key]['callbacks']) < id :
+            if len (d['attributes'][key]['callbacks']) <= id :
                 raise se.BadParameter ("invalid callback cookie for attribute %s"  %  key)
             else :
                 # do not pop from list, that would invalidate the id's!
@@ -1593,33 +1741,7 @@ class Attributes (_AttributesBase, ru.DictMixin) :
         d['attributes'][us_key]['last']         = never   # time of last refresh (never)
         d['attributes'][us_key]['ttl']          = 0.0     # refresh delay (none)
 
-        # for enum types, we add a value checker
-        if typ == ENUM :
-
-            def _enum_check (key, val) :
-                if None == val  :
-                    # None is always allowed
-                    return True
-
-                us_key = self._attributes_t_underscore (key)
-                d      = self._attributes_t_init       (us_key)
-
-                vals   = d['attributes'][us_key]['enums']
-
-                # check if there is anything to check
-                if not vals :
-                    return True
-
-                # value must be one of allowed enums
-                if val in vals :
-                        return True
-
-                # Houston, we got a problem...
-                msg = "incorrect value (%s) for Enum typed attribute (%s)." \
-                      "Allowed values: %s"  %  (str(val), key, str(vals))
-                raise se.BadParameter (msg)
-
-            self._attributes_add_check (key, _enum_check, flow=flow)
+        # enum typed values are checked against 'enums' on conversion
 
 
 
@@ -1691,6 +1813,85 @@ class Attributes (_AttributesBase, ru.DictMixin) :
 
 
 
+    # --------------------------------------------------------------------------
+    #
+    @rus.takes   ('Attributes',
+                  callable,
+                  rus.optional (rus.one_of (_UP, _DOWN)))
+    @rus.returns (rus.nothing)
+    def _attributes_schema (self, register, flow=_DOWN) :
+        """
+        This interface method is not part of the public consumer API, but can
+        safely be called from within derived classes.
+
+        Register a compiled attribute schema.  `register` is a callable which
+        gets an `Attributes` instance passed, and performs the static attribute
+        setup on it, i.e. calls to `_attributes_register`,
+        `_attributes_register_deprecated`, `_attributes_set_enums`,
+        `_attributes_set_ttl`, `_attributes_extensible`,
+        `_attributes_camelcasing` and `_attributes_allow_private`::
+
+            class Transliterator (saga.Attributes) :
+
+                def __init__ (self) :
+                    self._attributes_schema (Transliterator._register)
+                    self._attributes_set_getter ('apple', self._get_apple)
+
+                def _register (self) :
+                    self._attributes_camelcasing (True)
+                    self._attributes_register ('apple', 'Appel', URL, SCALAR, WRITEABLE)
+
+        `register` is only ever called once, on a scratch instance -- the
+        resulting attribute entries are then shared by all instances using the
+        same schema, and are only copied into an instance when first accessed.
+        Anything which depends on the instance (getters, setters, callbacks,
+        checks referring to `self`) thus has to be set up *after* this call.
+
+        The effect is the same as calling `register (self)` directly.
+        """
+
+        schema = Attributes._attributes_schemas.get (register)
+
+        if  schema is None :
+
+            proto = Attributes.__new__ (Attributes)
+            register (proto)
+
+            pd     = proto._attributes_t_init ()
+            schema = {'extensible' : pd['extensible'],
+                      'private'    : pd['private'],
+                      'camelcasing': pd['camelcasing'],
+                      'attributes' : pd['attributes']}
+
+            Attributes._attributes_schemas[register] = schema
+
+        d = self._attributes_t_init ()
+
+        d['extensible']  = schema['extensible']
+        d['private']     = schema['private']
+        d['camelcasing'] = schema['camelcasing']
+
+        if  not d['attributes'] :
+            # nothing registered yet -- share the schema
+            d['attributes'] = _AttributesDict (schema['attributes'])
+
+        else :
+            # merge into the existing attributes, retaining old values as
+            # _attributes_register would
+            view = _AttributesDict (schema['attributes'])
+            for us_key in view :
+
+                entry = view[us_key]
+                if  us_key in d['attributes']   and \
+                    'value' in d['attributes'][us_key] and \
+                    'value' in entry :
+                    entry['value']  = d['attributes'][us_key]['value']
+                    entry['exists'] = True
+
+                d['attributes'][us_key] = entry
+
+
+
     # --------------------------------------------------------------------------
     #
     @rus.takes   ('Attributes',
@@ -1888,9 +2089,21 @@ class Attributes (_AttributesBase, ru.DictMixin) :
         other_d['lister']       = d['lister']
         other_d['caller']       = d['caller']
 
-        other_d['attributes'] = {}
+        if  isinstance (d['attributes'], _AttributesDict) :
+            # share the schema, and only copy what has been touched (and the
+            # private keys, see below)
+            schema = d['attributes']._schema
+            keys   = [key for key in d['attributes']
+                           if  dict.__contains__ (d['attributes'], key)
+                           or  schema[key].get ('private')]
+            other_d['attributes'] = _AttributesDict (schema)
+            other_d['attributes']._removed = set(d['attributes']._removed)
+
+        else :
+            keys   = list(d['attributes'].keys ())
+            other_d['attributes'] = {}
 
-        for key in d['attributes'] :
+        for key in keys :
             other_d['attributes'][key] = {}
             other_d['attributes'][key]['default']      =       d['attributes'][key]['default']
             other_d['attributes'][key]['exists']       =       d['attributes'][key]['exists']
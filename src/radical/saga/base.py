@@ -98,7 +98,7 @@ class Base (SimpleBase) :
         _engine       = engine.Engine ()
         self._adaptor = adaptor
         self._adaptor = _engine.bind_adaptor(self, self._apitype, schema,
-                                             adaptor)
+                                             adaptor, *args, **kwargs)
 
         # Sync creation (normal __init__) will simply call the adaptor's
         # init_instance at this point.  _init_task should *not* be evaluated,
@@ -109,8 +109,13 @@ class Base (SimpleBase) :
         # on CPI level to provide the task instance itself, and point the task's
         # workload to the adaptor level init_instance method.
 
-        self._init_task = self._adaptor.init_instance(adaptor_state, *args,
-                                                      **kwargs)
+        try :
+            self._init_task = self._adaptor.init_instance(adaptor_state, *args,
+                                                          **kwargs)
+        except Exception as e :
+            # let the engine know that this adaptor failed to initialize
+            _engine.record_bind_result(self._adaptor, e)
+            raise
 
         if 'ttype' in kwargs and kwargs['ttype'] :
             # in this case we in in fact need the init_task later on, to return
@@ -120,6 +125,7 @@ class Base (SimpleBase) :
             # in the sync case, we can get rid of the init_task reference, to
             # simplify garbage collection
             self._init_task = None
+            _engine.record_bind_result(self._adaptor)
 
 
     # --------------------------------------------------------------------------
@@ -78,6 +78,17 @@ class Context (sb.Base, sa.Attributes) :
         sb.Base.__init__ (self, ctype.lower(), _adaptor, _adaptor_state, ctype, ttype=None)
 
 
+        # register properties with the attribute interface (see
+        # _register_attributes)
+        self._attributes_schema (Context._register_attributes)
+
+        self.type = ctype
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _register_attributes (self) :
+
         from . import attributes as sa
 
         # set attribute interface propertiesP
@@ -100,8 +111,6 @@ class Context (sb.Base, sa.Attributes) :
         self._attributes_register  (REMOTE_HOST,     None, sa.STRING, sa.SCALAR, sa.WRITEABLE)
         self._attributes_register  (REMOTE_PORT,     None, sa.STRING, sa.VECTOR, sa.WRITEABLE)
 
-        self.type = ctype
-
 
     # --------------------------------------------------------------------------
     #
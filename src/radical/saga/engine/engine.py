@@ -6,11 +6,20 @@ __license__   = "MIT"
 
 """ Provides the SAGA runtime. """
 
+import os
+import glob
+import time
+import hashlib
+
+import threading     as mt
+
 import radical.utils as ru
 
 from ..        import exceptions as rse
 from ..version import *
 
+from .executor import Executor
+
 
 # ------------------------------------------------------------------------------
 #
@@ -119,6 +128,23 @@ class Engine(object, metaclass=ru.Singleton):
               else :
                   # successfully bound to adaptor
                   return
+
+    If the engine config option `lazy_adaptors` is set (see
+    `configs/engine_default.json`, or the `RADICAL_SAGA_LAZY_ADAPTORS`
+    environment variable), the engine will only record the static
+    `_ADAPTOR_INFO` of each adaptor module on startup.  The adaptor itself is
+    instantiated (and sanity checked) on first use, i.e., when an API object
+    is bound to it for the first time.
+
+    If the engine config option `registry_snapshot` (env variable
+    `RADICAL_SAGA_REGISTRY_SNAPSHOT`) points to a file, the adaptor registry
+    is stored in that file after loading the adaptors, and is read from there
+    by later engine instances -- no adaptor module is then imported before
+    it is actually used.  The snapshot is invalidated (and rebuilt) when the
+    radical.saga version or any of its config files change.  It only holds the
+    static `_ADAPTOR_INFO` of the enabled adaptors: whether an adaptor can
+    function in the environment of a process is sanity checked by each process
+    when the adaptor is used first.
     """
 
     # --------------------------------------------------------------------------
@@ -128,6 +154,15 @@ class Engine(object, metaclass=ru.Singleton):
         # Engine manages cpis from adaptors
         self._adaptor_registry = dict()
 
+        # lazily loaded adaptors get activated concurrently on first use
+        self._lock = mt.RLock()
+
+        # remember results of earlier bind attempts (see `bind_adaptor()`)
+        self._bind_cache = dict()
+
+        # thread pool for async tasks, created on first use
+        self._executor = None
+
         # get angine, adaptor and pty configs
         self._cfg      = ru.Config('radical.saga.engine')
         self._pty_cfg  = ru.Config('radical.saga.pty')
@@ -137,8 +172,10 @@ class Engine(object, metaclass=ru.Singleton):
         self._logger = ru.Logger('radical.saga')
         self._logger.info('radical.saga         version: %s' % version_detail)
 
-        # load adaptors
-        self._load_adaptors()
+        # load adaptors -- from the registry snapshot if that is available
+        if not self._load_snapshot():
+            self._load_adaptors()
+            self._save_snapshot()
 
 
     # --------------------------------------------------------------------------
@@ -162,277 +199,499 @@ class Engine(object, metaclass=ru.Singleton):
             self._adaptor_registry = dict()
             self._registry = {'adaptor_registry' : inject_registry}
 
+        self.reset_bind_cache()
+
+        lazy = bool(self._cfg.get('lazy_adaptors'))
+
         # attempt to load all registered modules
         for module_name in self._registry.get('adaptor_registry', []):
+            self._load_adaptor(module_name, lazy=lazy)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _load_adaptor (self, module_name, lazy=False, registry=None):
+        """
+        Import the given adaptor module and register its cpi classes.  If
+        `lazy` is set, the adaptor is not instantiated, but only the static
+        `_ADAPTOR_INFO` of the module is registered -- the adaptor instance is
+        then created by `_activate_adaptor()` on first use.  The cpis are
+        registered in the given `registry` dict, which defaults to the adaptor
+        registry of the engine.
+        """
 
-            self._logger.info ("loading  adaptor %s" % module_name)
+        if registry is None:
+            registry = self._adaptor_registry
 
+        self._logger.info ("loading  adaptor %s" % module_name)
 
-            # first, import the module
-            adaptor_module = None
-            try :
-                adaptor_module = ru.import_module(module_name)
+        # first, import the module
+        adaptor_module = None
+        try :
+            adaptor_module = ru.import_module(module_name)
 
-            except Exception as e:
-                self._logger.warning("skip adaptor %s: import failed (%s)",
-                                     module_name, e, exc_info=True)
-                continue
+        except Exception as e:
+            self._logger.warning("skip adaptor %s: import failed (%s)",
+                                 module_name, e, exc_info=True)
+            return
 
-            # we expect the module to have an 'Adaptor' class
-            # implemented, which, on calling 'register()', returns
-            # a info dict for all implemented adaptor classes.
+        if lazy:
+            # we only look at the static adaptor information for now
             adaptor_instance = None
-            adaptor_info     = None
+            adaptor_info     = getattr(adaptor_module, '_ADAPTOR_INFO', None)
 
-            try:
-                adaptor_instance = adaptor_module.Adaptor ()
-                adaptor_info     = adaptor_instance.register ()
+        else:
+            adaptor_instance, adaptor_info = self._init_adaptor(module_name,
+                                                                adaptor_module)
+            if adaptor_instance is None:
+                return
 
-            except rse.SagaException:
-                self._logger.warning("skip adaptor %s: failed to load",
-                                     module_name, exc_info=True)
-                continue
+        # check if we have a valid adaptor_info
+        if adaptor_info is None :
+            self._logger.warning("skip adaptor %s: invalid adaptor data",
+                                 module_name)
+            return
 
-            except Exception:
-                self._logger.warning("skip adaptor %s: init failed",
-                                     module_name, exc_info=True)
+
+        if  'name'    not in adaptor_info or \
+            'cpis'    not in adaptor_info or \
+            'version' not in adaptor_info or \
+            'schemas' not in adaptor_info    :
+            self._logger.warning("skip adaptor %s: incomplete data",
+                                 module_name)
+            return
+
+
+        adaptor_name    = adaptor_info['name']
+        adaptor_version = adaptor_info['version']
+        adaptor_schemas = adaptor_info['schemas']
+        adaptor_enabled = True  # default
+
+        # disable adaptors in 'alpha' or 'beta' versions -- unless
+        # the 'load_beta_adaptors' config option is set to True
+        if not self._cfg.load_beta_adaptors:
+
+            if 'alpha' in adaptor_version.lower() or \
+               'beta'  in adaptor_version.lower()    :
+
+                self._logger.warning("skip beta adaptor %s (version %s)",
+                                     module_name, adaptor_version)
+                return
+
+
+        # get the 'enabled' option in the adaptor's config
+        # section (radical.saga.cpi.base) ensures that the option exists,
+        # if it is initialized correctly in the adaptor class.
+        adaptor_config  = None
+        adaptor_enabled = False
+
+        try :
+            adaptor_config  = ru.Config('radical.saga.adaptors',
+                                        name=adaptor_name)
+            adaptor_enabled = adaptor_config.get('enabled', True)
+
+        except rse.SagaException:
+            self._logger.warning("skip adaptor %s: init failed",
+                                 module_name, exc_info=True)
+            return
+
+        except Exception as e:
+            self._logger.warning("skip adaptor %s: init error",
+                                 module_name, exc_info=True)
+            return
+
+
+        # only load adaptor if it is not disabled via config files
+        if not adaptor_enabled:
+            self._logger.warning("skip adaptor %s: disabled", module_name)
+            return
+
+
+        # check if the adaptor has anything to register
+        if 0 == len (adaptor_info['cpis']) :
+            self._logger.warning("skip adaptor %s: adaptor has no cpis",
+                                 module_name)
+            return
+
+
+        # we got an enabled adaptor with valid info - yay!  We can
+        # now register all adaptor classes (cpi implementations).
+        for cpi_info in adaptor_info['cpis'] :
+
+            # check cpi information details for completeness
+            if  'type'  not in cpi_info or \
+                'class' not in cpi_info    :
+                self._logger.warning("skip %s cpi: incomplete info detail",
+                                     module_name)
                 continue
 
 
-            # the adaptor must also provide a sanity_check() method, which sould
-            # be used to confirm that the adaptor can function properly in the
-            # current runtime environment (e.g., that all pre-requisites and
-            # system dependencies are met).
-            try:
-                adaptor_instance.sanity_check ()
+            # adaptor classes are registered for specific API types.
+            cpi_type  = cpi_info['type']
+            cpi_cname = cpi_info['class']
+            cpi_class = None
+
+            try :
+                cpi_class = getattr (adaptor_module, cpi_cname)
 
             except Exception:
-                self._logger.warning("skip adaptor %s: test failed",
-                                     module_name, exc_info=True)
+                # this exception likely means that the adaptor does not call
+                # the radical.saga.adaptors.Base initializer (correctly)
+                self._logger.warning("skip adaptor %s: invalid %s",
+                                     module_name, cpi_info['class'],
+                                     exc_info=True)
                 continue
 
+            # make sure the cpi class is a valid cpi for the given type.
+            # We walk through the list of known modules, and try to find
+            # a modules which could have that class.  We do the following
+            # tests:
+            #
+            #   cpi_class: ShellJobService
+            #   cpi_type:  radical.saga.job.Service
+            #   modules:   radical.saga.adaptors.cpi.job
+            #   modules:   radical.saga.adaptors.cpi.job.service
+            #   classes:   radical.saga.adaptors.cpi.job.Service
+            #   classes:   radical.saga.adaptors.cpi.job.service.Service
+            #
+            #   cpi_class: X509Context
+            #   cpi_type:  radical.saga.Context
+            #   modules:   radical.saga.adaptors.cpi.context
+            #   classes:   radical.saga.adaptors.cpi.context.Context
+            #
+            # So, we add a 'adaptors.cpi' after the 'saga' namespace
+            # element, then append the rest of the given namespace.  If that
+            # gives a module which has the requested class, fine -- if not,
+            # we add a lower cased version of the class name as last
+            # namespace element, and check again.
+
+            # ->   radical .  saga .  job .  Service
+            # <- ['radical', 'saga', 'job', 'Service']
+            cpi_type_nselems = cpi_type.split ('.')
+
+            if  len(cpi_type_nselems) < 3 or \
+                len(cpi_type_nselems) > 4    :
+                self._logger.warning("skip adaptor %s invalid cpi %s",
+                                     module_name, cpi_type)
+                continue
 
-            # check if we have a valid adaptor_info
-            if adaptor_info is None :
-                self._logger.warning("skip adaptor %s: invalid adaptor data",
-                                     module_name)
+            if  cpi_type_nselems[0] != 'radical' and \
+                cpi_type_nselems[1] != 'saga'    :
+                self._logger.warning("skip adaptor %s: invalid cpi ns %s",
+                                     module_name, cpi_type, exc_info=True)
                 continue
 
+            # -> ['radical', 'saga',                    'job', 'Service']
+            # <- ['radical', 'saga', 'adaptors', 'cpi', 'job', 'Service']
+            cpi_type_nselems.insert (2, 'adaptors')
+            cpi_type_nselems.insert (3, 'cpi')
+
+         #  # -> ['radical', 'saga', 'adaptors', 'cpi', 'job',  'Service']
+         #  # <- ['radical', 'saga', 'adaptors', 'cpi', 'job'], 'Service'
+         #  cpi_type_cname = cpi_type_nselems.pop ()
+         #
+         #  # -> ['radical', 'saga', 'adaptors', 'cpi', 'job'], 'Service'
+         #  # <-  'radical.saga.adaptors.cpi.job
+         #  # <-  'radical.saga.adaptors.cpi.job.service
+         #  cpi_type_modname_1 = '.'.join (cpi_type_nselems)
+         #  cpi_type_modname_2 = '.'.join (cpi_type_nselems + \
+         #                                 [cpi_type_cname.lower()])
+         #
+         #  # does either module exist?
+         #  cpi_type_modname = None
+         #
+         #  if  cpi_type_modname_1 in sys.modules :
+         #      cpi_type_modname = cpi_type_modname_1
+         #
+         #  if  cpi_type_modname_2 in sys.modules :
+         #      cpi_type_modname = cpi_type_modname_2
+         #
+         #  if  not cpi_type_modname :
+         #      self._logger.warning("skip adaptor %s: unknown cpi %s",
+         #                           module_name, cpi_type, exc_info=True)
+         #      sys.exit()
+         #      continue
+         #
+         #  # so, make sure the given cpi is actually
+         #  # implemented by the adaptor class
+         #  cpi_ok = False
+         #  for name, cpi_obj \
+         #      in inspect.getmembers (sys.modules[cpi_type_modname]):
+         #      if  name == cpi_type_cname      and \
+         #          inspect.isclass (cpi_obj)       :
+         #          if  issubclass (cpi_class, cpi_obj) :
+         #              cpi_ok = True
+         #
+         #  if not cpi_ok :
+         #      self._logger.warning("skip adaptor %s: no cpi %s (%s)",
+         #                           module_name, cpi_class, cpi_type,
+         #                            exc_info=True)
+         #      continue
+
+
+            # finally, register the cpi for all its schemas!
+            registered_schemas = list()
+            for adaptor_schema in adaptor_schemas:
+
+                adaptor_schema = adaptor_schema.lower ()
+
+                # make sure we can register that cpi type
+                if cpi_type not in registry:
+                    registry[cpi_type] = dict()
+
+                # make sure we can register that schema
+                if adaptor_schema not in registry[cpi_type]:
+                    registry[cpi_type][adaptor_schema] = []
+
+                # we register the cpi class, so that we can create
+                # instances as needed, and the adaptor instance,
+                # as that is passed to the cpi class c'tor later
+                # on (the adaptor instance is used to share state
+                # between cpi instances, amongst others)
+                info = {'cpi_cname'        : cpi_cname,
+                        'cpi_class'        : cpi_class,
+                        'adaptor_name'     : adaptor_name,
+                        'adaptor_instance' : adaptor_instance,
+                        'module_name'      : module_name}
+
+                # make sure this tuple was not registered, yet
+                if info in registry[cpi_type][adaptor_schema]:
+                    self._logger.warning("skip adaptor %s: exists %s: %s",
+                                         module_name, cpi_class,
+                                         adaptor_instance, exc_info=True)
+                    continue
 
-            if  'name'    not in adaptor_info or \
-                'cpis'    not in adaptor_info or \
-                'version' not in adaptor_info or \
-                'schemas' not in adaptor_info    :
-                self._logger.warning("skip adaptor %s: incomplete data",
-                                     module_name)
-                continue
+                registry[cpi_type][adaptor_schema].append(info)
+                registered_schemas.append(str("%s://" % adaptor_schema))
+
+            self._logger.info("Register adaptor %s for %s API: %s" %
+                             (module_name, cpi_type, registered_schemas))
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _init_adaptor (self, module_name, adaptor_module):
+        '''
+        Instantiate the adaptor of the given module, obtain its adaptor info,
+        and run its sanity check.  Returns a tuple `(instance, info)`, or
+        `(None, None)` if the adaptor cannot be used.
+        '''
 
+        # we expect the module to have an 'Adaptor' class
+        # implemented, which, on calling 'register()', returns
+        # a info dict for all implemented adaptor classes.
+        adaptor_instance = None
+        adaptor_info     = None
 
-            adaptor_name    = adaptor_info['name']
-            adaptor_version = adaptor_info['version']
-            adaptor_schemas = adaptor_info['schemas']
-            adaptor_enabled = True  # default
+        try:
+            adaptor_instance = adaptor_module.Adaptor ()
+            adaptor_info     = adaptor_instance.register ()
 
-            # disable adaptors in 'alpha' or 'beta' versions -- unless
-            # the 'load_beta_adaptors' config option is set to True
-            if not self._cfg.load_beta_adaptors:
+        except rse.SagaException:
+            self._logger.warning("skip adaptor %s: failed to load",
+                                 module_name, exc_info=True)
+            return None, None
 
-                if 'alpha' in adaptor_version.lower() or \
-                   'beta'  in adaptor_version.lower()    :
+        except Exception:
+            self._logger.warning("skip adaptor %s: init failed",
+                                 module_name, exc_info=True)
+            return None, None
 
-                    self._logger.warning("skip beta adaptor %s (version %s)",
-                                         module_name, adaptor_version)
-                    continue
 
+        # the adaptor must also provide a sanity_check() method, which sould
+        # be used to confirm that the adaptor can function properly in the
+        # current runtime environment (e.g., that all pre-requisites and
+        # system dependencies are met).
+        try:
+            adaptor_instance.sanity_check ()
 
-            # get the 'enabled' option in the adaptor's config
-            # section (radical.saga.cpi.base) ensures that the option exists,
-            # if it is initialized correctly in the adaptor class.
-            adaptor_config  = None
-            adaptor_enabled = False
+        except Exception:
+            self._logger.warning("skip adaptor %s: test failed",
+                                 module_name, exc_info=True)
+            return None, None
 
-            try :
-                adaptor_config  = ru.Config('radical.saga.adaptors',
-                                            name=adaptor_name)
-                adaptor_enabled = adaptor_config.get('enabled', True)
+        return adaptor_instance, adaptor_info
 
-            except rse.SagaException:
-                self._logger.warning("skip adaptor %s: init failed",
-                                     module_name, exc_info=True)
-                continue
 
+    # --------------------------------------------------------------------------
+    #
+    def _activate_adaptor (self, info):
+        '''
+        Make sure that the adaptor of the given registry entry is instantiated.
+        That is a noop unless adaptors are loaded lazily, in which case the
+        adaptor is instantiated and sanity checked on first use.  If that
+        fails, all registry entries of the adaptor are removed, and `False` is
+        returned.
+        '''
+
+        if info['adaptor_instance'] is not None:
+            return True
+
+        with self._lock:
+
+            # some other thread may have been faster
+            if info['adaptor_instance'] is not None:
+                return True
+
+            module_name      = info['module_name']
+            adaptor_instance = None
+
+            self._logger.info ("activate adaptor %s" % module_name)
+
+            try:
+                adaptor_module      = ru.import_module(module_name)
+                adaptor_instance, _ = self._init_adaptor(module_name,
+                                                         adaptor_module)
             except Exception as e:
-                self._logger.warning("skip adaptor %s: init error",
-                                     module_name, exc_info=True)
-                continue
+                self._logger.warning("skip adaptor %s: import failed (%s)",
+                                     module_name, e, exc_info=True)
 
+            # update (or purge) all registry entries for this adaptor
+            for ctype in self._adaptor_registry:
+                for schema in self._adaptor_registry[ctype]:
 
-            # only load adaptor if it is not disabled via config files
-            if not adaptor_enabled:
-                self._logger.warning("skip adaptor %s: disabled", module_name)
-                continue
+                    infos = self._adaptor_registry[ctype][schema]
 
+                    if adaptor_instance is None:
+                        infos[:] = [i for i in infos
+                                      if i['module_name'] != module_name]
+                    else:
+                        for i in infos:
+                            if i['module_name'] == module_name:
+                                i['adaptor_instance'] = adaptor_instance
 
-            # check if the adaptor has anything to register
-            if 0 == len (adaptor_info['cpis']) :
-                self._logger.warning("skip adaptor %s: adaptor has no cpis",
-                                     module_name)
-                continue
+                                # entries loaded from the registry snapshot
+                                # did not resolve the cpi class, yet
+                                if i['cpi_class'] is None:
+                                    i['cpi_class'] = getattr(adaptor_module,
+                                                             i['cpi_cname'])
 
+            return adaptor_instance is not None
 
-            # we got an enabled adaptor with valid info - yay!  We can
-            # now register all adaptor classes (cpi implementations).
-            for cpi_info in adaptor_info['cpis'] :
 
-                # check cpi information details for completeness
-                if  'type'  not in cpi_info or \
-                    'class' not in cpi_info    :
-                    self._logger.warning("skip %s cpi: incomplete info detail",
-                                         module_name)
-                    continue
+    # --------------------------------------------------------------------------
+    #
+    def _get_snapshot_key (self):
+        '''
+        The registry snapshot is only valid for the radical.saga version and the
+        set of config files it was created with.  This returns a key which
+        represents both.
+        '''
 
+        home     = os.environ.get('HOME', '/tmp')
+        home     = os.environ.get('RADICAL_CONFIG_USER_DIR', home)
+        sys_dir  = '%s/configs' % ru.find_module('radical.saga')
+        usr_dir  = '%s/.radical/saga/configs' % home
 
-                # adaptor classes are registered for specific API types.
-                cpi_type  = cpi_info['type']
-                cpi_cname = cpi_info['class']
-                cpi_class = None
+        checksum = hashlib.md5()
+        checksum.update(str(version_detail).encode())
+        checksum.update(str(sorted(self._cfg.items())).encode())
+        checksum.update(str(self._registry.get('adaptor_registry')).encode())
 
-                try :
-                    cpi_class = getattr (adaptor_module, cpi_cname)
+        for fname in sorted(glob.glob('%s/*.json' % sys_dir) +
+                            glob.glob('%s/*.json' % usr_dir)):
+            stat = os.stat(fname)
+            checksum.update(('%s:%s:%s' % (fname, stat.st_size,
+                                           stat.st_mtime)).encode())
 
-                except Exception:
-                    # this exception likely means that the adaptor does not call
-                    # the radical.saga.adaptors.Base initializer (correctly)
-                    self._logger.warning("skip adaptor %s: invalid %s",
-                                         module_name, cpi_info['class'],
-                                         exc_info=True)
-                    continue
+        return checksum.hexdigest()
 
-                # make sure the cpi class is a valid cpi for the given type.
-                # We walk through the list of known modules, and try to find
-                # a modules which could have that class.  We do the following
-                # tests:
-                #
-                #   cpi_class: ShellJobService
-                #   cpi_type:  radical.saga.job.Service
-                #   modules:   radical.saga.adaptors.cpi.job
-                #   modules:   radical.saga.adaptors.cpi.job.service
-                #   classes:   radical.saga.adaptors.cpi.job.Service
-                #   classes:   radical.saga.adaptors.cpi.job.service.Service
-                #
-                #   cpi_class: X509Context
-                #   cpi_type:  radical.saga.Context
-                #   modules:   radical.saga.adaptors.cpi.context
-                #   classes:   radical.saga.adaptors.cpi.context.Context
-                #
-                # So, we add a 'adaptors.cpi' after the 'saga' namespace
-                # element, then append the rest of the given namespace.  If that
-                # gives a module which has the requested class, fine -- if not,
-                # we add a lower cased version of the class name as last
-                # namespace element, and check again.
-
-                # ->   radical .  saga .  job .  Service
-                # <- ['radical', 'saga', 'job', 'Service']
-                cpi_type_nselems = cpi_type.split ('.')
-
-                if  len(cpi_type_nselems) < 3 or \
-                    len(cpi_type_nselems) > 4    :
-                    self._logger.warning("skip adaptor %s invalid cpi %s",
-                                         module_name, cpi_type)
-                    continue
 
-                if  cpi_type_nselems[0] != 'radical' and \
-                    cpi_type_nselems[1] != 'saga'    :
-                    self._logger.warning("skip adaptor %s: invalid cpi ns %s",
-                                         module_name, cpi_type, exc_info=True)
-                    continue
+    # --------------------------------------------------------------------------
+    #
+    def _load_snapshot (self):
+        '''
+        Fill the adaptor registry from the registry snapshot file.  Adaptors
+        registered that way are neither imported nor instantiated -- that
+        happens on first use (see `_activate_adaptor()`).  Returns `False` if
+        no valid snapshot is available.
+        '''
+
+        fname = self._cfg.get('registry_snapshot')
+        if not fname or not os.path.isfile(fname):
+            return False
+
+        try:
+            snapshot = ru.read_json(fname)
+
+            if snapshot.get('key') != self._get_snapshot_key():
+                self._logger.info('registry snapshot %s is outdated', fname)
+                return False
+
+            registry = dict()
+            for entry in snapshot['registry']:
+
+                ctype  = entry['cpi_type']
+                schema = entry['schema']
+
+                if ctype not in registry:
+                    registry[ctype] = dict()
+
+                if schema not in registry[ctype]:
+                    registry[ctype][schema] = list()
 
-                # -> ['radical', 'saga',                    'job', 'Service']
-                # <- ['radical', 'saga', 'adaptors', 'cpi', 'job', 'Service']
-                cpi_type_nselems.insert (2, 'adaptors')
-                cpi_type_nselems.insert (3, 'cpi')
-
-             #  # -> ['radical', 'saga', 'adaptors', 'cpi', 'job',  'Service']
-             #  # <- ['radical', 'saga', 'adaptors', 'cpi', 'job'], 'Service'
-             #  cpi_type_cname = cpi_type_nselems.pop ()
-             #
-             #  # -> ['radical', 'saga', 'adaptors', 'cpi', 'job'], 'Service'
-             #  # <-  'radical.saga.adaptors.cpi.job
-             #  # <-  'radical.saga.adaptors.cpi.job.service
-             #  cpi_type_modname_1 = '.'.join (cpi_type_nselems)
-             #  cpi_type_modname_2 = '.'.join (cpi_type_nselems + \
-             #                                 [cpi_type_cname.lower()])
-             #
-             #  # does either module exist?
-             #  cpi_type_modname = None
-             #
-             #  if  cpi_type_modname_1 in sys.modules :
-             #      cpi_type_modname = cpi_type_modname_1
-             #
-             #  if  cpi_type_modname_2 in sys.modules :
-             #      cpi_type_modname = cpi_type_modname_2
-             #
-             #  if  not cpi_type_modname :
-             #      self._logger.warning("skip adaptor %s: unknown cpi %s",
-             #                           module_name, cpi_type, exc_info=True)
-             #      sys.exit()
-             #      continue
-             #
-             #  # so, make sure the given cpi is actually
-             #  # implemented by the adaptor class
-             #  cpi_ok = False
-             #  for name, cpi_obj \
-             #      in inspect.getmembers (sys.modules[cpi_type_modname]):
-             #      if  name == cpi_type_cname      and \
-             #          inspect.isclass (cpi_obj)       :
-             #          if  issubclass (cpi_class, cpi_obj) :
-             #              cpi_ok = True
-             #
-             #  if not cpi_ok :
-             #      self._logger.warning("skip adaptor %s: no cpi %s (%s)",
-             #                           module_name, cpi_class, cpi_type,
-             #                            exc_info=True)
-             #      continue
-
-
-                # finally, register the cpi for all its schemas!
-                registered_schemas = list()
-                for adaptor_schema in adaptor_schemas:
-
-                    adaptor_schema = adaptor_schema.lower ()
-
-                    # make sure we can register that cpi type
-                    if cpi_type not in self._adaptor_registry:
-                        self._adaptor_registry[cpi_type] = dict()
-
-                    # make sure we can register that schema
-                    if adaptor_schema not in self._adaptor_registry[cpi_type]:
-                        self._adaptor_registry[cpi_type][adaptor_schema] = []
-
-                    # we register the cpi class, so that we can create
-                    # instances as needed, and the adaptor instance,
-                    # as that is passed to the cpi class c'tor later
-                    # on (the adaptor instance is used to share state
-                    # between cpi instances, amongst others)
-                    info = {'cpi_cname'        : cpi_cname,
-                            'cpi_class'        : cpi_class,
-                            'adaptor_name'     : adaptor_name,
-                            'adaptor_instance' : adaptor_instance}
-
-                    # make sure this tuple was not registered, yet
-                    if info in self._adaptor_registry[cpi_type][adaptor_schema]:
-                        self._logger.warning("skip adaptor %s: exists %s: %s",
-                                             module_name, cpi_class,
-                                             adaptor_instance, exc_info=True)
-                        continue
-
-                    self._adaptor_registry[cpi_type] \
-                                          [adaptor_schema].append(info)
-                    registered_schemas.append(str("%s://" % adaptor_schema))
-
-                self._logger.info("Register adaptor %s for %s API: %s" %
-                                 (module_name, cpi_type, registered_schemas))
+                registry[ctype][schema].append(
+                        {'cpi_cname'        : entry['cpi_cname'],
+                         'cpi_class'        : None,
+                         'adaptor_name'     : entry['adaptor_name'],
+                         'adaptor_instance' : None,
+                         'module_name'      : entry['module_name']})
 
+        except Exception:
+            self._logger.warning('ignore registry snapshot %s', fname,
+                                 exc_info=True)
+            return False
+
+        self._adaptor_registry = registry
+        self.reset_bind_cache()
+        self._logger.info('loaded registry snapshot %s', fname)
+
+        return True
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _save_snapshot (self):
+        '''
+        Store the adaptor registry in the registry snapshot file (if one is
+        configured).  The snapshot is shared by processes which may run in
+        different environments, so it is not taken from the current registry
+        (which only holds the adaptors which passed their sanity checks in
+        this process), but from the static adaptor infos of all enabled
+        adaptors.
+        '''
+
+        fname = self._cfg.get('registry_snapshot')
+        if not fname:
+            return
+
+        registry = dict()
+        for module_name in self._registry.get('adaptor_registry', []):
+            self._load_adaptor(module_name, lazy=True, registry=registry)
+
+        entries = list()
+        for ctype in registry:
+            for schema in registry[ctype]:
+                for info in registry[ctype][schema]:
+                    entries.append({'cpi_type'     : ctype,
+                                    'schema'       : schema,
+                                    'cpi_cname'    : info['cpi_cname'],
+                                    'adaptor_name' : info['adaptor_name'],
+                                    'module_name'  : info['module_name']})
+
+        # many processes may attempt to write the same snapshot at the same
+        # time, so we write a private file first and move it into place.
+        try:
+            tmp = '%s.%d' % (fname, os.getpid())
+            ru.rec_makedir(os.path.dirname(os.path.abspath(fname)))
+            ru.write_json({'key'      : self._get_snapshot_key(),
+                           'registry' : entries}, tmp)
+            os.rename(tmp, fname)
+            self._logger.info('saved registry snapshot %s', fname)
+
+        except Exception:
+            self._logger.warning('could not save registry snapshot %s', fname,
+                                 exc_info=True)
 
 
     # --------------------------------------------------------------------------
@@ -472,9 +731,10 @@ class Engine(object, metaclass=ru.Singleton):
 
         for ctype in list(self._adaptor_registry.keys ()) :
             for schema in list(self._adaptor_registry[ctype].keys ()) :
-                for info in self._adaptor_registry[ctype][schema] :
+                for info in list(self._adaptor_registry[ctype][schema]) :
                     if info['adaptor_name'] == adaptor_name:
-                        return info['adaptor_instance']
+                        if self._activate_adaptor(info):
+                            return info['adaptor_instance']
 
         error_msg = "No adaptor named '%s' found" % adaptor_name
         self._logger.error(error_msg)
@@ -508,9 +768,14 @@ class Engine(object, metaclass=ru.Singleton):
 
 
         # cycle through all applicable adaptors, and try to instantiate
-        # a matching one.
-        exception = rse.NoSuccess ("binding adaptor failed", api_instance)
-        for info in self._adaptor_registry[ctype][schema] :
+        # a matching one.  The exception collecting failed attempts is only
+        # created once an attempt actually fails.  Adaptors which bound
+        # successfully before (in the same session) are tried first, adaptors
+        # which failed for a permanent reason before are not tried again.
+        exception     = None
+        key           = (ctype, schema, self._session_key(args, kwargs))
+        infos, failed = self._get_bind_candidates(key)
+        for info in infos :
 
             cpi_cname        = info['cpi_cname']
             cpi_class        = info['cpi_class']
@@ -519,7 +784,8 @@ class Engine(object, metaclass=ru.Singleton):
 
             try :
 
-                # is this adaptor acceptable?
+                # is this adaptor acceptable?  Note that a preferred adaptor
+                # was bound before, so it is never a lazy, inactive one.
                 if  preferred_adaptor is not None     and \
                     preferred_adaptor != adaptor_instance :
 
@@ -528,34 +794,192 @@ class Engine(object, metaclass=ru.Singleton):
                              % (cpi_cname, preferred_adaptor, adaptor_instance))
                     continue
 
+                # did this adaptor fail before for a permanent reason?
+                if (adaptor_name, cpi_cname) in failed :
+                    if not exception:
+                        exception = rse.NoSuccess ("binding adaptor failed",
+                                                   api_instance)
+                    exception._add_exception(failed[(adaptor_name, cpi_cname)])
+                    continue
+
+                # lazily loaded adaptors are instantiated on first use
+                if not self._activate_adaptor(info):
+                    continue
+
+                cpi_class        = info['cpi_class']
+                adaptor_instance = info['adaptor_instance']
+
 
                 # instantiate cpi
                 cpi_instance = cpi_class (api_instance, adaptor_instance)
 
               # self._logger.debug("Successfully bound %s.%s to %s" \
               #                  % (adaptor_name, cpi_cname, api_instance))
+
+                # the bind result is recorded once the api instance knows if
+                # the cpi instance can be initialized (`record_bind_result()`)
+                cpi_instance._bind_info = (key, info)
                 return cpi_instance
 
 
             except rse.SagaException as e :
                 # adaptor class initialization failed - try next one
+                if not exception:
+                    exception = rse.NoSuccess ("binding adaptor failed",
+                                               api_instance)
                 exception._add_exception (e)
+                self._cache_bind_result(key, info, e)
                 self._logger.info("adaptor ctor failed : %s.%s: %s"
                                  % (adaptor_name, cpi_class, str(e)))
                 continue
             except Exception as e :
+                if not exception:
+                    exception = rse.NoSuccess ("binding adaptor failed",
+                                               api_instance)
                 exception._add_exception (rse.NoSuccess (str(e), api_instance))
                 self._logger.info("adaptor ctor failed : %s.%s: %s"
                                  % (adaptor_name, cpi_class, str(e)))
                 continue
 
 
+        if not exception:
+            exception = rse.NoSuccess ("binding adaptor failed", api_instance)
+
         self._logger.error("No adaptor found for '%s' and URL scheme '%s'"
                           % (ctype, schema))
         self._logger.info  ("%s" %  (str(exception)))
         raise exception._get_exception_stack ()
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _session_key (self, args, kwargs) :
+        '''
+        Return the ID of the session among the given API constructor arguments
+        (`None` for the default session).  Bind results are cached per session,
+        as adaptors may fail to initialize depending on its contexts.
+        '''
+
+        from ..session import Session
+
+        for arg in list(args) + list(kwargs.values()) :
+            if isinstance(arg, Session) :
+                return arg._id
+
+        return None
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _get_bind_candidates (self, key) :
+        '''
+        Return the registry entries to try for binding an API object with the
+        given cache key `(type, schema, session)`, and a dict of entries which
+        are known to fail (with the respective exceptions).  The adaptor which
+        last bound successfully is moved to the front of the list.  Results of
+        earlier bind attempts expire after `bind_cache_ttl` seconds.
+        '''
+
+        ctype, schema, _ = key
+
+        infos = list(self._adaptor_registry[ctype][schema])
+        ttl   = float(self._cfg.get('bind_cache_ttl') or 0)
+        entry = self._bind_cache.get(key)
+
+        if not ttl or not entry:
+            return infos, dict()
+
+        now    = time.time()
+        good   = entry['good']
+        failed = {name: e for name, (then, e) in entry['failed'].items()
+                         if now - then < ttl}
+
+        if good and now - good[0] < ttl:
+            for info in infos:
+                if (info['adaptor_name'], info['cpi_cname']) == good[1]:
+                    infos.remove(info)
+                    infos.insert(0, info)
+                    break
+
+        return infos, failed
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _cache_bind_result (self, key, info, exception=None) :
+        '''
+        Record the result of a bind attempt.  Only failures which do not depend
+        on the specific API object (the adaptor does not implement the API
+        type) are recorded as permanent -- `IncorrectURL` and others may well
+        depend on the URL the object is created for.
+        '''
+
+        if not float(self._cfg.get('bind_cache_ttl') or 0):
+            return
+
+        name  = (info['adaptor_name'], info['cpi_cname'])
+        entry = self._bind_cache.setdefault(key, {'good'  : None,
+                                                  'failed': dict()})
+        if exception is None:
+            entry['good'] = (time.time(), name)
+            entry['failed'].pop(name, None)
+
+        elif isinstance(exception, rse.NotImplemented):
+            entry['failed'][name] = (time.time(), exception)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def record_bind_result (self, cpi_instance, exception=None) :
+        '''
+        Record whether a cpi instance returned by `bind_adaptor()` could be
+        initialized (`init_instance()`) or not.  Adaptors which fail to
+        initialize for a permanent reason are skipped on later bind attempts,
+        adaptors which succeed are tried first.
+        '''
+
+        bind_info = getattr(cpi_instance, '_bind_info', None)
+
+        if bind_info:
+            key, info = bind_info
+            self._cache_bind_result(key, info, exception)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def reset_bind_cache (self) :
+        '''
+        Forget about the results of earlier bind attempts, so that all
+        applicable adaptors are tried again, in registry order.
+        '''
+
+        self._bind_cache = dict()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def get_executor (self) :
+        '''
+        Return the thread pool which executes asynchronous tasks and container
+        operations (see `radical.saga.engine.executor`).  The pool is sized
+        according to the `executor_workers` and `executor_queue` config
+        settings.
+        '''
+
+        with self._lock:
+
+            if not self._executor:
+
+                workers = int(self._cfg.get('executor_workers') or 1)
+                qsize   = int(self._cfg.get('executor_queue')   or 0)
+
+                self._executor = Executor(workers=workers, queue_size=qsize)
+                self._logger.debug('executor: %d workers, queue size %d',
+                                   workers, qsize)
+
+        return self._executor
+
+
     # -----------------------------------------------------------------
     #
     def loaded_adaptors (self):
@@ -0,0 +1,301 @@
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+""" Bounded thread pool for asynchronous task execution """
+
+import queue
+import traceback
+
+import threading as mt
+
+from .. import constants as c
+
+
+# ------------------------------------------------------------------------------
+#
+class Future (object) :
+    """
+    A `Future` wraps a callable which gets executed by an `Executor`.  It has
+    the same interface as `radical.utils.Future` (`state`, `result`,
+    `exception`, `traceback`, `wait()`, `join()`, `is_alive()`, `cancel()`),
+    but does not own a thread: `start()` queues it for execution on the
+    executor's worker threads.
+
+    A `wait()` on a future which has not yet been picked up by a worker executes
+    the call right away in the waiting thread -- that way, threads waiting for
+    futures can never starve the pool (and can not deadlock on it).
+    """
+
+    # --------------------------------------------------------------------------
+    #
+    def __init__ (self, executor, call, *args, **kwargs) :
+
+        if  not callable (call) :
+            raise ValueError ("Future requires a callable, not %s" % str(call))
+
+        self._executor  = executor
+        self._call      = call
+        self._args      = args
+        self._kwargs    = kwargs
+
+        self._lock      = mt.Lock ()
+        self._done      = mt.Event ()
+        self._started   = False
+        self._callbacks = list()
+
+        self._state     = c.NEW
+        self._result    = None
+        self._exception = None
+        self._traceback = None
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _claim (self, state=c.RUNNING) :
+        """
+        Atomically move the future out of state NEW -- returns False if some
+        other thread was first.
+        """
+
+        with self._lock :
+
+            if  self._state != c.NEW :
+                return False
+
+            self._state = state
+            return True
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _execute (self) :
+        """
+        Execute the call in the current thread, unless some other thread already
+        did (or is doing) so.
+        """
+
+        if  not self._claim () :
+            return
+
+        try :
+            self._result = self._call (*self._args, **self._kwargs)
+            self._state  = c.DONE
+
+        except Exception as e :
+            self._traceback = traceback.format_exc ()
+            self._exception = e
+            self._state     = c.FAILED
+
+        finally :
+            self._finalize ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _finalize (self) :
+
+        with self._lock :
+            self._done.set ()
+            callbacks = self._callbacks
+            self._callbacks = list()
+
+        for cb in callbacks :
+            cb (self)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def start (self) :
+        """
+        Queue the future for execution.  This blocks while the executor's queue
+        is full.
+        """
+
+        with self._lock :
+            if  self._started :
+                return
+            self._started = True
+
+        self._executor.submit (self)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def run (self) :
+        """
+        Execute the future in the calling thread.
+        """
+
+        self._execute ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def wait (self, timeout=None) :
+        """
+        Wait for the future to reach a final state.  A `timeout` of `None` or
+        a negative value waits forever.  Returns `True` if the future is final.
+        """
+
+        # no worker picked it up yet -- do it ourself
+        self._execute ()
+
+        if  timeout is not None and timeout < 0 :
+            timeout = None
+
+        return self._done.wait (timeout)
+
+    join = wait
+
+
+    # --------------------------------------------------------------------------
+    #
+    def is_alive (self) :
+
+        return not self._done.is_set ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def cancel (self) :
+        """
+        Futures can only be canceled before they started to run -- the call
+        itself is not interrupted.
+        """
+
+        if  self._claim (c.CANCELED) :
+            self._finalize ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def add_callback (self, cb) :
+        """
+        Call `cb (future)` once the future reached a final state (right away if
+        it is final already).  The callback is invoked by the thread which
+        finished the future.
+        """
+
+        with self._lock :
+            if  not self._done.is_set () :
+                self._callbacks.append (cb)
+                return
+
+        cb (self)
+
+
+    # --------------------------------------------------------------------------
+    #
+    @property
+    def state     (self) : return self._state
+
+    @property
+    def result    (self) : return self._result
+
+    @property
+    def exception (self) : return self._exception
+
+    @property
+    def traceback (self) : return self._traceback
+
+
+# ------------------------------------------------------------------------------
+#
+class Executor (object) :
+    """
+    A bounded pool of worker threads which executes `Future` instances.  Worker
+    threads are created on demand, up to `workers`.  At most `queue_size`
+    futures can wait for a worker (`0` for no limit) -- further submissions
+    block until there is room again (back-pressure).  Submissions from worker
+    threads never block, but execute the future inline if the queue is full.
+    """
+
+    # --------------------------------------------------------------------------
+    #
+    def __init__ (self, workers=16, queue_size=1024) :
+
+        if  workers < 1 :
+            raise ValueError ("executor needs at least one worker")
+
+        self._max_workers = workers
+        self._queue       = queue.Queue (maxsize=max(queue_size, 0))
+        self._lock        = mt.Lock ()
+        self._workers     = list()
+        self._idle        = 0
+        self._local       = mt.local ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def run (self, call, *args, **kwargs) :
+        """
+        Shortcut to create and start a `Future` for `call (*args, **kwargs)`.
+        """
+
+        future = Future (self, call, *args, **kwargs)
+        future.start ()
+        return future
+
+
+    # --------------------------------------------------------------------------
+    #
+    def submit (self, future) :
+
+        if  getattr (self._local, 'worker', False) :
+            try :
+                self._queue.put_nowait (future)
+            except queue.Full :
+                future.run ()
+                return
+        else :
+            self._queue.put (future)
+
+        with self._lock :
+            if  self._queue.qsize () > self._idle and \
+                len(self._workers)    < self._max_workers :
+                worker = mt.Thread (target=self._work)
+                worker.daemon = True
+                worker.start ()
+                self._workers.append (worker)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _work (self) :
+
+        self._local.worker = True
+
+        while True :
+
+            with self._lock :
+                self._idle += 1
+
+            future = self._queue.get ()
+
+            with self._lock :
+                self._idle -= 1
+
+            future.run ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    @property
+    def workers (self) :
+
+        return len(self._workers)
+
+
+    # --------------------------------------------------------------------------
+    #
+    @property
+    def pending (self) :
+
+        return self._queue.qsize ()
+
+
+# ------------------------------------------------------------------------------
+
@@ -10,6 +10,7 @@ __license__   = "MIT"
 import sys
 import weakref
 import operator
+import linecache
 import traceback
 
 
@@ -18,6 +19,23 @@ import traceback
 # the saga.exceptions in signatures, thus can *not* have signature checks
 # here...
 
+# ------------------------------------------------------------------------------
+#
+def _capture_stack (frame) :
+    """
+    Return the call stack starting at the given frame as list of (code object,
+    line number) tuples, innermost frame first.  That is much cheaper than
+    `traceback.extract_stack()`, as no source lines are looked up.
+    """
+
+    stack = list()
+    while frame :
+        stack.append ((frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+
+    return stack
+
+
 # ------------------------------------------------------------------------------
 #
 class SagaException (Exception) :
@@ -67,6 +85,7 @@ class SagaException (Exception) :
         Exception.__init__(self, msg)
 
         self._plain_message = msg
+        self._parent        = parent
         self._exceptions    = [self]
         self._top_exception = self
         self._ptype         = type(parent).__name__   # parent exception type
@@ -83,6 +102,17 @@ class SagaException (Exception) :
             self._object    = None
 
 
+        # Exceptions are frequently created without ever being inspected (for
+        # example while trying to bind to several adaptors), so we do not
+        # render message and traceback here.  Instead we capture a light-weight
+        # copy of the call stack (code objects and line numbers, innermost
+        # first, starting at the caller of this c'tor), and render message and
+        # traceback on first use (see `_message` and `_traceback`).
+        self._stack       = _capture_stack (sys._getframe (1))
+        self._exc_trace   = None
+        self._msg_cache   = None
+        self._trace_cache = None
+
         # did we get a parent exception?
         if  parent :
 
@@ -91,53 +121,89 @@ class SagaException (Exception) :
             # parent).  Thus we append the message of the parent to our own
             # message, but keep the parent's traceback (after all, the original
             # exception location is what we are interested in).
-            #
-            if  isinstance (parent, SagaException) :
-                # that all works nicely when parent is our own exception type...
-                self._traceback = parent.traceback
-
-                frame           = traceback.extract_stack ()[- ignore_stack]
-                line            = "%s +%s (%s)  :  %s" % (frame.filename,
-                    frame.lineno, frame.name, frame.line)
-                self._message   = "  %-20s: %s (%s)\n%s" \
-                                % (self._stype, msg, line, parent.msg)
-
-            else:
-                if self._stype != "NoneType" :
-                    # ... but if parent is a native (or any other) exception
-                    # type, we don't have a traceback really -- so we dig it
-                    # out of sys.exc_info.
-                    trace           = sys.exc_info ()[2]
-                    stack           = traceback.extract_tb  (trace)
-                    traceback_list  = traceback.format_list (stack)
-                    self._traceback = "".join (traceback_list)
-
-                    # the message composition is very similar -- we just inject
-                    # the parent exception type inconspicuously somewhere (above
-                    # that was part of 'parent.message' already).
-                    frame          = traceback.extract_stack ()[- ignore_stack]
-                    line           = "%s +%s (%s)  :  %s" % (frame.filename,
-                        frame.lineno, frame.name, frame.line)
-                    self._message  = "  %-20s: %s (%s)\n  %-20s: %s" \
-                                % (self._stype, msg, line, self._ptype, parent)
+            self._frame_idx = ignore_stack - 2
+
+            if  not isinstance (parent, SagaException) :
+                # ... but if parent is a native (or any other) exception
+                # type, we don't have a traceback really -- so we dig it
+                # out of sys.exc_info.
+                self._exc_trace = sys.exc_info ()[2]
 
         else :
 
             # if we don't have a parent, we are a 1st principle exception,
-            # i.e. a reaction to some genuine code error.  Thus we extract the
-            # traceback from exactly where we are in the code (the last stack
-            # frame will be the call to this exception constructor), and we
-            # create the original exception message from 'stype' and 'message'.
-            stack           = traceback.extract_stack ()
-            traceback_list  = traceback.format_list (stack)
-            self._traceback = "".join (traceback_list[:-1])
-            frame           = traceback.extract_stack ()[- ignore_stack -1]
-            line            = "%s +%s (%s)  :  %s" % (frame.filename,
-                frame.lineno, frame.name, frame.line)
-            self._message   = "%s (%s)" % (msg, line)
-
-        # we can't do that earlier as _msg was not set up before
-        self._messages = [self._message]
+            # i.e. a reaction to some genuine code error.  Thus we use the
+            # traceback from exactly where we are in the code, and we create
+            # the original exception message from 'stype' and 'message'.
+            self._frame_idx = ignore_stack - 1
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _get_line (self) :
+        """ render the code location the exception was created at """
+
+        if  self._frame_idx >= len(self._stack) :
+            return ''
+
+        code, lineno = self._stack[self._frame_idx]
+        line = linecache.getline (code.co_filename, lineno).strip ()
+
+        return "%s +%s (%s)  :  %s" % (code.co_filename, lineno,
+                                       code.co_name, line)
+
+
+    # --------------------------------------------------------------------------
+    #
+    @property
+    def _message (self) :
+
+        if  self._msg_cache is None :
+
+            msg    = self._plain_message
+            parent = self._parent
+
+            if  isinstance (parent, SagaException) :
+                self._msg_cache = "  %-20s: %s (%s)\n%s" \
+                                % (self._stype, msg, self._get_line (),
+                                   parent.message)
+
+            elif parent :
+                # the message composition is very similar -- we just inject
+                # the parent exception type inconspicuously somewhere (above
+                # that was part of 'parent.message' already).
+                self._msg_cache = "  %-20s: %s (%s)\n  %-20s: %s" \
+                                % (self._stype, msg, self._get_line (),
+                                   self._ptype, parent)
+
+            else :
+                self._msg_cache = "%s (%s)" % (msg, self._get_line ())
+
+        return self._msg_cache
+
+
+    # --------------------------------------------------------------------------
+    #
+    @property
+    def _traceback (self) :
+
+        if  self._trace_cache is None :
+
+            if  isinstance (self._parent, SagaException) :
+                # the original exception location is what we are interested in
+                self._trace_cache = self._parent.traceback
+
+            elif self._parent :
+                stack = traceback.extract_tb (self._exc_trace)
+                self._trace_cache = "".join (traceback.format_list (stack))
+
+            else :
+                stack = [traceback.FrameSummary (code.co_filename, lineno,
+                                                 code.co_name)
+                         for code, lineno in reversed (self._stack)]
+                self._trace_cache = "".join (traceback.format_list (stack))
+
+        return self._trace_cache
 
 
     # --------------------------------------------------------------------------
@@ -159,14 +225,16 @@ class SagaException (Exception) :
 
         clone = self.__class__ ("")
 
-        clone._parent    = self._parent
-        clone._object    = self._object
-        clone._message   = self._message
-        clone._messages  = self._messages
-        clone._exception = self._exceptions
-        clone._traceback = self._traceback
-        clone._stype     = self._stype
-        clone._ptype     = self._ptype
+        clone._plain_message = self._plain_message
+        clone._parent        = self._parent
+        clone._object        = self._object
+        clone._stack         = self._stack
+        clone._exc_trace     = self._exc_trace
+        clone._frame_idx     = self._frame_idx
+        clone._msg_cache     = self._msg_cache
+        clone._trace_cache   = self._trace_cache
+        clone._stype         = self._stype
+        clone._ptype         = self._ptype
 
         return clone
 
@@ -258,7 +326,6 @@ class SagaException (Exception) :
         """
 
         self._exceptions.append (e)
-        self._messages.append   (e.message)
 
         if e._rank > self._top_exception._rank :
             self._top_exception = e
@@ -283,13 +350,11 @@ class SagaException (Exception) :
         # create a new exception with same type as top_exception
         clone = self._top_exception._clone ()
         clone._exceptions = []
-        clone._messages   = []
 
         # copy all state over
         for e in sorted(self._exceptions, key=operator.attrgetter ('_rank'),
                                           reverse=True):
             clone._exceptions.append (e)
-            clone._messages.append (e._message)
 
         return clone
 
@@ -303,7 +368,7 @@ class SagaException (Exception) :
     # --------------------------------------------------------------------------
     #
     def get_all_messages (self) :
-        return self._messages
+        return [e._message for e in self._exceptions]
 
 
     # --------------------------------------------------------------------------
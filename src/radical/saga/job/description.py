@@ -28,6 +28,20 @@ class Description (sa.Attributes) :
     @rus.returns (rus.nothing)
     def __init__(self):
 
+        # register properties with the attribute interface -- the schema is
+        # compiled once and shared by all job descriptions
+        self._attributes_schema (Description._register_attributes)
+
+        self._env_is_list = False
+
+        self._attributes_set_getter (ENVIRONMENT, self._get_env)
+        self._attributes_set_setter (ENVIRONMENT, self._set_env)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _register_attributes (self) :
+
         # set attribute interface properties
 
         self._attributes_extensible  (True)
@@ -66,11 +80,6 @@ class Description (sa.Attributes) :
 
         self._attributes_set_enums (SPMD_VARIATION,      ['MPI', 'OpenMP', 'MPICH-G'])
 
-        self._env_is_list = False
-
-        self._attributes_set_getter (ENVIRONMENT, self._get_env)
-        self._attributes_set_setter (ENVIRONMENT, self._set_env)
-
 
     # --------------------------------------------------------------------------
     #
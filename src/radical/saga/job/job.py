@@ -95,6 +95,27 @@ class Job (sb.Base, st.Task, sasync.Async) :
         self._base.__init__ (schema, _adaptor, _adaptor_state, ttype=None)
 
 
+        # register properties with the attribute interface (see
+        # _register_attributes)
+        self._attributes_schema     (Job._register_attributes)
+
+        self._attributes_set_getter (STATE,           self.get_state)
+        self._attributes_set_getter (ID,              self.get_id)
+        self._attributes_set_getter (NAME,            self.get_name)
+        self._attributes_set_getter (EXIT_CODE,       self._get_exit_code)
+        self._attributes_set_getter (CREATED,         self._get_created)
+        self._attributes_set_getter (STARTED,         self._get_started)
+        self._attributes_set_getter (FINISHED,        self._get_finished)
+        self._attributes_set_getter (EXECUTION_HOSTS, self._get_execution_hosts)
+        self._attributes_set_getter (SERVICE_URL    , self._get_service_url)
+
+        self._valid = True
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _register_attributes (self) :
+
         # set attribute interface properties
         self._attributes_allow_private (True)
         self._attributes_extensible    (False)
@@ -114,18 +135,6 @@ class Job (sb.Base, st.Task, sasync.Async) :
         self._attributes_set_enums  (STATE, [UNKNOWN, NEW,     PENDING,  RUNNING,
                                              DONE,    FAILED,  CANCELED, SUSPENDED])
 
-        self._attributes_set_getter (STATE,           self.get_state)
-        self._attributes_set_getter (ID,              self.get_id)
-        self._attributes_set_getter (NAME,            self.get_name)
-        self._attributes_set_getter (EXIT_CODE,       self._get_exit_code)
-        self._attributes_set_getter (CREATED,         self._get_created)
-        self._attributes_set_getter (STARTED,         self._get_started)
-        self._attributes_set_getter (FINISHED,        self._get_finished)
-        self._attributes_set_getter (EXECUTION_HOSTS, self._get_execution_hosts)
-        self._attributes_set_getter (SERVICE_URL    , self._get_service_url)
-
-        self._valid = True
-
 
     # --------------------------------------------------------------------------
     #
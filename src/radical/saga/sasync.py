@@ -4,13 +4,149 @@ __copyright__ = "Copyright 2013, The SAGA Project"
 __license__   = "MIT"
 
 
+import asyncio
+import inspect
+
+import threading as mt
+
+from .constants import TASK, NEW, FINAL, STATE
+
+
 # ------------------------------------------------------------------------------
 #
 class Async :
     """
     tagging interface for SAGA classes which implement asynchronous methods.
+
+    All public methods of those classes which accept a `ttype` parameter are
+    also available as asyncio coroutines, with an `_async` suffix::
+
+        js  = saga.job.Service ('fork://localhost')
+        job = await js.create_job_async (jd)
+        await job.run_async  ()
+        await job.wait_async ()
+
+    The coroutines create a task for the call (`ttype=saga.task.TASK`), run it,
+    and complete once that task reaches a final state, returning the task's
+    result or raising its exception.  The event loop is not blocked in the
+    meantime -- the call itself is executed by the engine's thread pool (see
+    `Engine.get_executor`), so many concurrent coroutines do not need a thread
+    each.  Only tasks which are not executed by that pool are waited for in
+    a separate thread.
     """
-    pass
+
+    # --------------------------------------------------------------------------
+    #
+    def __init_subclass__ (cls, **kwargs) :
+
+        super().__init_subclass__ (**kwargs)
+
+        for name, method in list(cls.__dict__.items ()) :
+
+            if  name.startswith ('_')               or \
+                not inspect.isfunction (method)     or \
+                name + '_async' in cls.__dict__ :
+                continue
+
+            try :
+                params = inspect.signature (method).parameters
+            except (TypeError, ValueError) :
+                continue
+
+            if  'ttype' in params :
+                setattr (cls, name + '_async', _make_coroutine (name))
+
+
+# ------------------------------------------------------------------------------
+#
+def _make_coroutine (name) :
+
+    async def coroutine (self, *args, **kwargs) :
+
+        kwargs['ttype'] = TASK
+        task = getattr (self, name) (*args, **kwargs)
+
+        return await wait_task (task)
+
+    coroutine.__name__ = '%s_async' % name
+    coroutine.__doc__  = 'asyncio version of :func:`%s`' % name
+
+    return coroutine
+
+
+# ------------------------------------------------------------------------------
 #
+async def wait_task (task) :
+    """
+    Run the given `saga.Task` (if it did not run, yet), wait for it to reach
+    a final state without blocking the event loop, and return its result (or
+    raise its exception).
+    """
+
+    loop   = asyncio.get_running_loop ()
+    future = loop.create_future ()
+
+    # ------------------------------------------------------------------------
+    def _notify (*args) :
+        if  not future.done () :
+            future.set_result (None)
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def _notify_threadsafe () :
+        try :
+            loop.call_soon_threadsafe (_notify)
+        except RuntimeError :
+            # the loop got closed in the meantime
+            pass
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def _state_cb (obj, key, val) :
+        if  val in FINAL :
+            _notify_threadsafe ()
+            return False
+        return True
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def _wait () :
+        try :
+            task.wait ()
+        finally :
+            _notify_threadsafe ()
+    # ------------------------------------------------------------------------
+
+    if  task.state not in FINAL :
+
+        cb_id = task.add_callback (STATE, _state_cb)
+
+        try :
+            if  task.state == NEW :
+                # starting the task can block (the engine's executor queue may
+                # be full, adaptors may need remote operations), so we don't do
+                # that in the loop's thread
+                await loop.run_in_executor (None, task.run)
+
+            if  task.state not in FINAL :
+
+                if  not getattr (task, '_future', None) :
+                    # other tasks need someone to wait for them -- that may
+                    # take forever, so we don't block one of the engine's
+                    # workers for it, but use a separate thread
+                    waiter = mt.Thread (target=_wait)
+                    waiter.daemon = True
+                    waiter.start ()
+
+                # future backed tasks report their final state when done
+                await future
+
+        finally :
+            # don't leave the callback behind if we got cancelled or failed
+            task.remove_callback (STATE, cb_id)
+
+    return task.get_result ()
+
+
 # ------------------------------------------------------------------------------
 
@@ -280,7 +280,11 @@ class DefaultSession(Session, metaclass=ru.Singleton):
             return
 
         for schema   in _engine._adaptor_registry['radical.saga.Context'] :
-            for info in _engine._adaptor_registry['radical.saga.Context'][schema] :
+            for info in list(_engine._adaptor_registry['radical.saga.Context'][schema]) :
+
+                # make sure lazily loaded context adaptors are instantiated
+                if not _engine._activate_adaptor (info) :
+                    continue
 
                 default_ctxs = []
 
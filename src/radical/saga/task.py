@@ -7,19 +7,29 @@ __license__   = "MIT"
 """ Task interface
 """
 
+import time
+import queue
 import inspect
 
+import threading                 as mt
+
 import radical.utils.signatures  as rus
-import radical.utils             as ru
 
 from  . import base              as sbase
 from  . import exceptions        as se
 from  . import attributes        as satt
+from  . import engine            as seng
+
+from .engine import executor     as sexec
 
 from .  import constants         as c
 
 STATES = [c.UNKNOWN, c.NEW, c.RUNNING, c.DONE, c.FAILED, c.CANCELED]
 
+# poll intervals for container waits on tasks which don't report state changes
+_POLL_MIN = 0.01
+_POLL_MAX = 1.0
+
 
 # ------------------------------------------------------------------------------
 #
@@ -62,8 +72,9 @@ class Task (sbase.SimpleBase, satt.Attributes) :
         for ``ttype=TASK``.
 
         If the ``_method_context`` has *exactly* three elements, names
-        ``_call``, ``args`` and ``kwargs``, then the created task will wrap
-        a :class:`ru.Future` with that ``_call (*_args, **kwargs)``.
+        ``_call``, ``_args`` and ``_kwargs``, then the created task will wrap
+        a future with that ``_call (*_args, **_kwargs)``, which gets executed on
+        the engine's thread pool (see :func:`Engine.get_executor`).
         """
 
         self._base = super  (Task, self)
@@ -75,22 +86,15 @@ class Task (sbase.SimpleBase, satt.Attributes) :
         self._method_type    = _method_type
         self._method_context = _method_context
 
-        # set attribute interface properties
-        self._attributes_extensible    (False)
-        self._attributes_allow_private (True)
-        self._attributes_camelcasing   (True)
-
         # register properties with the attribute interface
-        self._attributes_register  (c.RESULT,    None,      satt.ANY,  satt.SCALAR, satt.READONLY)
+        self._attributes_schema    (Task._register_attributes)
+
         self._attributes_set_getter(c.RESULT,    self.get_result)
         self._attributes_set_setter(c.RESULT,    self._set_result)
 
-        self._attributes_register  (c.EXCEPTION, None,      satt.ANY,  satt.SCALAR, satt.READONLY)
         self._attributes_set_getter(c.EXCEPTION, self.get_exception)
         self._attributes_set_setter(c.EXCEPTION, self._set_exception)
 
-        self._attributes_register  (c.STATE,     c.UNKNOWN, satt.ENUM, satt.SCALAR, satt.READONLY)
-        self._attributes_set_enums (c.STATE,     STATES)
         self._attributes_set_getter(c.STATE,     self.get_state)
         self._attributes_set_setter(c.STATE,     self._set_state)
 
@@ -99,16 +103,21 @@ class Task (sbase.SimpleBase, satt.Attributes) :
         # check if this task is supposed to wrap a callable in a future
         if  '_call'   in self._method_context :
 
-            call   = self._method_context['call']
+            call   = self._method_context['_call']
             args   = self._method_context.get('_args',   list())
             kwargs = self._method_context.get('_kwargs', dict())
 
             # if the called function expects a task handle, provide it.
-            if  '_from_task' in inspect.getargspec (call)[0] and \
+            if  '_from_task' in inspect.signature (call).parameters and \
                 '_from_task' not in kwargs :
                 kwargs['_from_task'] = self
 
-            self._future = ru.Future (call=call, args=args, kwargs=kwargs)
+            self._future = sexec.Future (seng.Engine ().get_executor (),
+                                         call, *args, **kwargs)
+
+            # publish the final state as soon as the future completes (this
+            # notifies state callbacks, and thus waiting containers)
+            self._future.add_callback (self._future_done)
 
 
         # ensure task goes into the correct state
@@ -121,6 +130,22 @@ class Task (sbase.SimpleBase, satt.Attributes) :
             pass
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _register_attributes (self) :
+
+        # set attribute interface properties
+        self._attributes_extensible    (False)
+        self._attributes_allow_private (True)
+        self._attributes_camelcasing   (True)
+
+        # register properties with the attribute interface
+        self._attributes_register  (c.RESULT,    None,      satt.ANY,  satt.SCALAR, satt.READONLY)
+        self._attributes_register  (c.EXCEPTION, None,      satt.ANY,  satt.SCALAR, satt.READONLY)
+        self._attributes_register  (c.STATE,     c.UNKNOWN, satt.ENUM, satt.SCALAR, satt.READONLY)
+        self._attributes_set_enums (c.STATE,     STATES)
+
+
     # --------------------------------------------------------------------------
     #
     def __eq__ (self, other) :
@@ -153,7 +178,7 @@ class Task (sbase.SimpleBase, satt.Attributes) :
     def run      (self) :
 
         if  self._future :
-            self._future.run ()
+            self._future.start ()
 
         else :
             # FIXME: make sure task_run exists.  Should be part of the CPI!
@@ -210,6 +235,13 @@ class Task (sbase.SimpleBase, satt.Attributes) :
                                                               state, force=True)
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _future_done (self, future) :
+
+        self._set_state (future.state)
+
+
     # --------------------------------------------------------------------------
     #
     @rus.takes   ('Task')
@@ -387,8 +419,9 @@ class Container (sbase.SimpleBase, satt.Attributes) :
             # nothing to do
             return None
 
-        buckets = self._get_buckets ()
-        futures = []  # futures running container ops
+        buckets  = self._get_buckets ()
+        futures  = []  # futures running container ops
+        executor = seng.Engine ().get_executor ()
 
         # handle all container
         for b in buckets['bound'] :
@@ -413,13 +446,13 @@ class Container (sbase.SimpleBase, satt.Attributes) :
 
                 else :
                     # hand off to the container function, in a separate task
-                    futures.append (ru.Future.Run (m_handle, tasks))
+                    futures.append (executor.run (m_handle, tasks))
 
 
         # handle tasks not bound to a container
         for task in buckets['unbound'] :
 
-            futures.append (ru.Future.Run (task.run))
+            futures.append (executor.run (task.run))
 
 
         # wait for all futures to finish
@@ -440,108 +473,183 @@ class Container (sbase.SimpleBase, satt.Attributes) :
     @rus.takes   ('Container',
                   rus.one_of   (c.ANY, c.ALL),
                   rus.optional (float))
-    @rus.returns (rus.list_of (Task))
+    @rus.returns (rus.optional (Task))
     def wait (self, mode=c.ALL, timeout=None) :
+        """
+        Wait for ANY or ALL tasks in the container to reach a final state, for
+        at most `timeout` seconds (forever if `timeout` is `None` or negative).
 
-        if timeout is None:
-            timeout = -1.0  # FIXME
+        Tasks signal their final states via state callbacks, and the wait
+        returns as soon as the condition is met -- for `ANY`, the returned task
+        is the first one to finish, for `ALL` it is the last one.  `None` is
+        returned on timeout.
 
-        if not len (self.tasks) :
-            # nothing to do
-            return None
+        Tasks which are not driven by a future get waited for by the adaptor's
+        container (via `container_wait`) or, if there is none, by a single
+        thread per wait which watches all those tasks.  If such tasks do not
+        signal state changes via callbacks, it can take up to `_POLL_MAX`
+        (1 second) until their final state is noticed.
 
-        if mode == c.ALL: return self._wait_all (timeout)
-        else            : return self._wait_any (timeout)
+        Note that this method returns a task (or `None`), not a list of tasks.
+        """
 
+        if timeout is not None and timeout < 0 :
+            timeout = None
 
+        tasks = list(self.tasks)
 
-    # --------------------------------------------------------------------------
-    #
-    @rus.takes   ('Container',
-                  float)
-    @rus.returns (rus.list_of (Task))
-    def _wait_any (self, timeout) :
+        if not tasks :
+            # nothing to do
+            return None
 
+        deadline = None
+        if timeout is not None :
+            deadline = time.time () + timeout
+
+        finished = queue.Queue ()  # (task, exception) tuples
+        stop     = mt.Event    ()  # set when the wait is over
+
+        # ----------------------------------------------------------------------
+        def _state_cb (task, key, val) :
+            # unregister once we are done
+            if  stop.is_set () :
+                return False
+            if  val in c.FINAL :
+                finished.put ((task, None))
+                return False
+            return True
+        # ----------------------------------------------------------------------
+
+        cb_ids = [task.add_callback (c.STATE, _state_cb) for task in tasks]
+
+        # tasks may have finished before we registered
+        for task in tasks :
+            if  task.state in c.FINAL :
+                finished.put ((task, None))
+
+        # tasks which do not wrap a future only change state when someone looks
+        # -- we start drivers for those.  The drivers get their own threads:
+        # running them on the engine's executor could occupy all its workers,
+        # so that the future backed tasks we wait for would never run.
         buckets = self._get_buckets ()
-        futures = []  # futures running container ops
+        drivers = list()
 
-        # handle all tasks bound to containers
         for b in buckets['bound'] :
 
             # handle all methods -- all go to the same 'container_wait' though)
-            tasks = []
+            btasks = []
             for m in buckets['bound'][b] :
-                tasks += buckets['bound'][b][m]
+                btasks += buckets['bound'][b][m]
 
-            futures.append (ru.Future.Run (b.container_wait, tasks, c.ANY,
-                                           timeout))
+            drivers.append ([btasks, b])
 
+        utasks = [task for task in buckets['unbound']
+                       if not getattr (task, '_future', None)]
+        if  utasks :
+            drivers.append ([utasks, None])
 
-        # handle all tasks not bound to containers
-        for task in buckets['unbound'] :
+        for dtasks, container in drivers :
+            driver = mt.Thread (target=self._wait_driver,
+                                args=[dtasks, mode, container, deadline,
+                                      stop, finished])
+            driver.daemon = True
+            driver.start ()
 
-            futures.append (ru.Future.Run (task.wait, timeout))
+        # collect tasks until the wait condition is met or we time out
+        seen = set()
+        ret  = None
 
+        try :
+            while len(seen) < len(tasks) :
 
-        # mode == ANY: we need to watch our futures, and whenever one
-        # returns, and declare success.  Note that we still need to get the
-        # finished task from the 'winner'-future -- we do that via a Queue
-        # object.  Note also that looser futures are not canceled, but left
-        # running (FIXME: consider sending a signal at least)
+                if  mode == c.ANY and seen :
+                    break
 
-        timeout = 0.01  # seconds, heuristic :-/
+                tout = None
+                if  deadline is not None :
+                    tout = deadline - time.time ()
+                    if  tout <= 0 :
+                        break
 
-        for future in futures :
-            future.join (timeout)
+                try :
+                    task, e = finished.get (timeout=tout)
+                except queue.Empty :
+                    break
 
-            if future.state == c.FAILED :
-                raise future.exception
+                if  e :
+                    raise e
+
+                if  id(task) not in seen :
+                    seen.add (id(task))
+                    ret = task
 
-            if not future.is_alive() :
-                # future indeed finished -- dig return value from this
-                # futures queue
-                result = future.result
+        finally :
+            stop.set ()
 
-                # ignore other futures, and simply declare success
-                return result
+            # don't leave callbacks behind on unfinished tasks
+            for task, cb_id in zip (tasks, cb_ids) :
+                task.remove_callback (c.STATE, cb_id)
 
+        if  mode == c.ANY and seen :
+            return ret
+
+        if  mode == c.ALL and len(seen) == len(tasks) :
+            return ret
+
+        # timed out
+        return None
 
 
     # --------------------------------------------------------------------------
     #
-    @rus.takes   ('Container',
-                  float)
-    @rus.returns (rus.list_of (Task))
-    def _wait_all (self, timeout) :
-        # this method should actually be symmetric to _wait_any, and could
-        # almost be mapped to it, but the code below is a kind of optimization
-        # (does not need futures, thus simpler code).
+    def _wait_driver (self, tasks, mode, container, deadline, stop, finished) :
+        # Wait for the given tasks on behalf of `wait()`, and report final
+        # tasks.  For ALL, we wait for one task (or container) after the other.
+        # For ANY, we need to watch all tasks concurrently, and thus poll them.
+        # In both cases, each individual wait is bounded, backing off from
+        # `_POLL_MIN` to `_POLL_MAX` seconds, so that we notice when `stop`
+        # gets set (the wait timed out, or tasks reported their state change
+        # via callbacks).  Note that `_POLL_MAX` thus bounds the latency for
+        # tasks which do not report state changes via callbacks.
+
+        try :
+            poll = _POLL_MIN
+
+            while not stop.is_set () :
+
+                tout = poll
+                if  deadline is not None :
+                    tout = min (tout, deadline - time.time ())
+                    if  tout <= 0 :
+                        break
 
-        buckets = self._get_buckets ()
-        ret     = None
+                if  container :
+                    container.container_wait (tasks, mode, tout)
 
-        # handle all tasks bound to containers
-        for b in buckets['bound'] :
+                elif mode == c.ALL :
+                    for task in tasks :
+                        if  stop.is_set () :
+                            break
+                        if  deadline is not None :
+                            tout = min (poll, max (0.0, deadline - time.time ()))
+                        task.wait (tout)
 
-            # handle all methods -- all go to the same 'container_wait' though)
-            tasks = []
-            for m in buckets['bound'][b] :
-                tasks += buckets['bound'][b][m]
+                else :
+                    stop.wait (tout)
 
-            # TODO: this is semantically not correct: timeout is applied
-            #       n times...
-            b.container_wait (tasks, c.ALL, timeout)
-            ret = tasks[0]
+                active = list()
+                for task in tasks :
+                    if  task.state in c.FINAL : finished.put ((task, None))
+                    else                      : active.append (task)
 
-        # handle all tasks not bound to containers
-        for task in buckets['unbound'] :
-            task.wait ()
-            ret = task
+                if  not active :
+                    break
 
-        # all done - return random task (first from last container, or last
-        # unbound task)
-        # FIXME: that task should be removed from the task container
-        return ret
+                tasks = active
+                poll  = min (poll * 2, _POLL_MAX)
+
+        except Exception as e :
+            finished.put ((None, e))
 
 
     # --------------------------------------------------------------------------
@@ -554,8 +662,9 @@ class Container (sbase.SimpleBase, satt.Attributes) :
         if timeout is None:
             timeout = -1.0  # FIXME
 
-        buckets = self._get_buckets ()
-        futures = []  # futures running container ops
+        buckets  = self._get_buckets ()
+        futures  = []  # futures running container ops
+        executor = seng.Engine ().get_executor ()
 
         # handle all tasks bound to containers
         for b in buckets['bound'] :
@@ -565,13 +674,13 @@ class Container (sbase.SimpleBase, satt.Attributes) :
             for m in buckets['bound'][b] :
                 tasks += buckets['bound'][b][m]
 
-            futures.append (ru.Future.Run (b.container_cancel, tasks, timeout))
+            futures.append (executor.run (b.container_cancel, tasks, timeout))
 
 
         # handle all tasks not bound to containers
         for task in buckets['unbound'] :
 
-            futures.append (ru.Future.Run (task.cancel, timeout))
+            futures.append (executor.run (task.cancel, timeout))
 
 
         for future in futures :
@@ -620,8 +729,9 @@ class Container (sbase.SimpleBase, satt.Attributes) :
     @rus.returns (rus.list_of (rus.one_of (*STATES)))
     def get_states (self) :
 
-        buckets = self._get_buckets ()
-        futures = []  # futures running container ops
+        buckets  = self._get_buckets ()
+        futures  = []  # futures running container ops
+        executor = seng.Engine ().get_executor ()
 
         # handle all tasks bound to containers
         for b in buckets['bound'] :
@@ -631,13 +741,13 @@ class Container (sbase.SimpleBase, satt.Attributes) :
             for m in buckets['bound'][b] :
                 tasks += buckets['bound'][b][m]
 
-            futures.append (ru.Future.Run (b.container_get_states, tasks))
+            futures.append (executor.run (b.container_get_states, tasks))
 
 
         # handle all tasks not bound to containers
         for task in buckets['unbound'] :
 
-            futures.append (ru.Future.Run (task.get_state))
+            futures.append (executor.run (task.get_state))
 
 
         # We still need to get the states from all futures.
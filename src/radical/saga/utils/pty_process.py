@@ -11,9 +11,12 @@ import pty
 import time
 import errno
 import shlex
+import logging
 import select
 import signal
 import termios
+import weakref
+import collections
 import threading as mt
 
 import radical.utils            as ru
@@ -27,6 +30,45 @@ from   .. import exceptions     as se
 _CHUNKSIZE = 1024 * 1024  # default size of each read
 _POLLDELAY = 0.01         # seconds in between read attempts
 _DEBUG_MAX = 600
+_LOOKBACK  = 4 * 1024     # chars re-scanned by find() for matches across reads
+_ESC_MAX   = 256          # max length of an escape sequence split across reads
+_WAIT_MAX  = 1.0          # max time to block in a single read call from find
+_REACTOR   = 0.1          # reactor wakeup interval (to see new registrations)
+
+_ESCAPE    = re.compile (r'\x1b[^m]*m')
+_HIDE      = re.compile (r'[^\n]')
+
+
+# --------------------------------------------------------------------
+#
+def _decode (data) :
+    """
+    Decode UTF-8 bytes, and return a tuple of the decoded text and the trailing
+    bytes of an incomplete multi-byte sequence (which need more data).
+    """
+
+    try :
+        return data.decode ('utf-8'), b''
+
+    except UnicodeDecodeError as e :
+
+        if  e.reason != 'unexpected end of data' or e.end != len(data) :
+            raise
+
+        return data[:e.start].decode ('utf-8'), data[e.start:]
+
+
+# --------------------------------------------------------------------
+#
+def _preview (data) :
+    """
+    Return a short, single-line version of the given (raw) data, for logging.
+    """
+
+    if  len(data) > _DEBUG_MAX :
+        data = data[:30] + b' ... ' + data[-30:]
+
+    return data.decode ('utf-8', 'replace').replace ('\n', '\\n')
 
 
 # --------------------------------------------------------------------
@@ -113,6 +155,10 @@ class PTYProcess (object) :
         self.cfg = ru.Config('radical.saga.session', name=name, cfg=cfg)
         self.cfg = self.cfg.pty
 
+        if  self.cfg is None :
+            # no such config -- use the session defaults
+            self.cfg = ru.Config('radical.saga.session').pty
+
 
         if isinstance (command, str) :
             command = shlex.split (command)
@@ -126,9 +172,22 @@ class PTYProcess (object) :
 
         self.command = command  # list of strings too run()
 
+        # if so configured, a single reactor thread reads from all ptys, and
+        # stores the data in `self.rbuf` (see `_Reactor`).
+        self.reactor = None
+        self.rcond   = mt.Condition ()
+        self.rbuf    = collections.deque ()  # raw data read by the reactor
+        self.reof    = None                  # read error seen by the reactor
+
+        if  self.cfg.get ('reactor') :
+            self.reactor = _Reactor ()
 
-        self.cache   = ""      # data cache
-        self.tail    = ""      # tail of data data cache for error messages
+
+        # the read cache holds raw bytes (with '\r' stripped) -- they only get
+        # decoded when handed out by `read()`
+        self.cache   = collections.deque ()  # data cache (list of chunks)
+        self.cache_len = 0                   # number of bytes in cache
+        self._tail   = b''     # tail of data data cache for error messages
         self.child   = None    # the process as created by subprocess.Popen
         self.ptyio   = None    # the process' io channel, from pty.fork()
 
@@ -162,6 +221,17 @@ class PTYProcess (object) :
                 pass
 
 
+    # ----------------------------------------------------------------------
+    #
+    @property
+    def tail (self) :
+        """
+        The last data handed out by `read()`, for error messages.
+        """
+
+        return self._tail.decode ('utf-8', 'replace')
+
+
     # ----------------------------------------------------------------------
     #
     def flush(self):
@@ -188,10 +258,133 @@ class PTYProcess (object) :
                 self.logger.warn('read error on flush')
             break
 
-        if len(self.cache):
+        if self.cache_len:
             self.logger.warn("flush: [%5d] [%5d] (discard cache: '%s')",
-                             self.parent_out, len(self.cache), self.cache)
-        self.cache = ""
+                             self.parent_out, self.cache_len,
+                             b''.join(self.cache).decode('utf-8', 'replace'))
+        self.cache.clear()
+        self.cache_len = 0
+
+
+    # ----------------------------------------------------------------------
+    #
+    def _cache_put (self, data, front=False) :
+        """
+        Add data to the read cache -- at the end, or, for data which have been
+        handed out but not consumed, at the front.  Text is stored encoded.
+        """
+
+        if not data :
+            return
+
+        if isinstance (data, str) :
+            data = data.encode ('utf-8')
+
+        if front : self.cache.appendleft (data)
+        else     : self.cache.append     (data)
+
+        self.cache_len += len(data)
+
+
+    # ----------------------------------------------------------------------
+    #
+    def _cache_get (self, size=0) :
+        """
+        Remove up to `size` bytes from the front of the read cache (all data if
+        `size` is `0`), and return them decoded.  Only the chunks needed are
+        joined.  A multi-byte sequence at the cut is completed from the cache
+        (so that at least one character is returned), an incomplete sequence at
+        the end of the cache stays in the cache.
+        """
+
+        if not size or size >= self.cache_len :
+            ret = b''.join (self.cache)
+            self.cache.clear ()
+            self.cache_len = 0
+
+        else :
+            parts = list()
+            got   = 0
+            while got < size :
+                chunk = self.cache.popleft ()
+                parts.append (chunk)
+                got  += len(chunk)
+
+            ret = b''.join (parts)
+
+            # don't cut within a multi-byte sequence (continuation bytes are
+            # `0b10xxxxxx`) -- that sequence may continue in the next chunks
+            while True :
+                while size < got and (ret[size] & 0xC0) == 0x80 :
+                    size += 1
+                if size < got or not self.cache or \
+                   (self.cache[0][0] & 0xC0) != 0x80 :
+                    break
+                chunk = self.cache.popleft ()
+                ret  += chunk
+                got  += len(chunk)
+
+            if size < got :
+                self.cache.appendleft (ret[size:])
+            ret = ret[:size]
+
+            self.cache_len -= size
+
+        ret, rest = _decode (ret)
+        if  rest :
+            self.cache.appendleft (rest)
+            self.cache_len += len(rest)
+
+        self._tail = (self._tail + ret[-256:].encode ('utf-8'))[-256:]
+
+        return ret
+
+
+    # ----------------------------------------------------------------------
+    #
+    def _reactor_put (self, data, error=None) :
+        """
+        Called by the reactor thread to pass on data read from the pty, or the
+        error which ended reading.
+        """
+
+        with self.rcond :
+
+            if  data  : self.rbuf.append (data)
+            if  error : self.reof = error
+
+            self.rcond.notify_all ()
+
+
+    # ----------------------------------------------------------------------
+    #
+    def _reactor_get (self, size, wait) :
+        """
+        Wait up to `wait` seconds for data from the reactor thread, and return
+        a list of data chunks, with up to `size` bytes overall.  If no data
+        arrive, an empty list is returned.  Read errors seen by the reactor are
+        raised once all data are consumed.
+        """
+
+        with self.rcond :
+
+            if  not self.rbuf and not self.reof and wait > 0 :
+                self.rcond.wait (wait)
+
+            ret = list()
+            got = 0
+            while self.rbuf and got < size :
+                chunk = self.rbuf.popleft ()
+                if  got + len(chunk) > size :
+                    self.rbuf.appendleft (chunk[size - got:])
+                    chunk = chunk[:size - got]
+                ret.append (chunk)
+                got += len(chunk)
+
+            if  not ret and self.reof :
+                raise self.reof
+
+            return ret
 
 
     # ----------------------------------------------------------------------
@@ -199,8 +392,7 @@ class PTYProcess (object) :
     def _hide_data (self, data, nolog=False) :
 
         if  nolog :
-            import re
-            return re.sub (r'([^\n])', 'X', data)
+            return _HIDE.sub ('X', data)
 
         else :
             return data
@@ -252,6 +444,12 @@ class PTYProcess (object) :
                 self.parent_in  = self.child_fd
                 self.parent_out = self.child_fd
 
+                if  self.reactor :
+                    with self.rcond :
+                        self.rbuf.clear ()
+                        self.reof = None
+                    self.reactor.register (self)
+
 
     # --------------------------------------------------------------------
     #
@@ -318,6 +516,8 @@ class PTYProcess (object) :
 
             try :
                 if  self.parent_out :
+                    if  self.reactor :
+                        self.reactor.unregister (self.parent_out)
                     os.close (self.parent_out)
                     self.parent_out = None
             except OSError :
@@ -558,55 +758,67 @@ class PTYProcess (object) :
         This method will not fill the cache, but will just read whatever data it
         needs (FIXME).
 
-        Note: the returned lines do *not* get '\\\\r' stripped.
+        Note: `size` counts bytes, but the returned data are decoded to
+        a string, and get '\\\\r' stripped.
         """
 
         with self.rlock :
 
+            debug = self.logger.isEnabledFor (logging.DEBUG)
+
             found_eof = False
 
+            # only look into the cache for new data -- an incomplete
+            # multi-byte sequence needs more data anyway
+            fresh     = True
+
             try:
                 # start the timeout timer right now.  Note that even if timeout
                 # is short, and child.poll is slow, we will nevertheless attempt
                 # at least one read...
                 start = time.time ()
-                ret   = ""
 
                 # read until we have enough data, or hit timeout ceiling...
                 while True :
 
                     # first, lets see if we still have data in the cache we
                     # can return
-                    if len (self.cache) :
-
-                        if  not size :
-                            ret        = self.cache
-                            self.cache = ""
-                            self.tail += ret
-                            self.tail  = self.tail[-256:]
-                            return ret
-
-                        # we don't even need all of the cache
-                        elif size <= len (self.cache) :
-                            ret        = self.cache[:size]
-                            self.cache = self.cache[size:]
-                            self.tail += ret
-                            self.tail  = self.tail[-256:]
-                            return ret
+                    if fresh and self.cache_len :
+                        if not size or size <= self.cache_len :
+                            ret = self._cache_get (size)
+                            if ret :
+                                return ret
 
                     # otherwise we need to read some more data, right?  idle
                     # wait 'til the next data chunk arrives, or 'til _POLLDELAY
-                    rlist, _, _ = select.select ([self.parent_out], [], [],
-                                                 _POLLDELAY)
-                    # got some data?
-                    for f in rlist:
-                        # read whatever we still need
-
-                        readsize = _CHUNKSIZE
-                        if  size:
-                            readsize = size - len(ret)
+                    readsize = _CHUNKSIZE
+                    if  size and size > self.cache_len :
+                        readsize = size - self.cache_len
+
+                    if  self.reactor :
+                        # the reactor reads for us -- wait for its data
+                        if   timeout <  0 : wait = _POLLDELAY
+                        elif timeout == 0 : wait = _WAIT_MAX
+                        else              : wait = timeout - time.time () \
+                                                           + start
+                        bufs = self._reactor_get (readsize, wait)
+
+                    else :
+                        rlist, _, _ = select.select ([self.parent_out], [], [],
+                                                     _POLLDELAY)
+                        try :
+                            bufs = [os.read (f, readsize) for f in rlist]
+                        except OSError :
+                            # the child is gone -- hand out what we have
+                            ret = self._cache_get ()
+                            if ret :
+                                return ret
+                            raise
 
-                        buf = os.read (f, readsize)
+                    # got some data?
+                    f     = self.parent_out
+                    fresh = False
+                    for buf in bufs:
 
                         if  len(buf) == 0 and sys.platform == 'darwin' :
                             self.logger.debug ("read : MacOS EOF")
@@ -614,70 +826,44 @@ class PTYProcess (object) :
                             found_eof = True
                             raise se.NoSuccess("unexpected EOF: %s" % self.tail)
 
-                        tmp = buf.decode('utf-8')
-                        self.cache += tmp.replace ('\r', '')
-                        log         = tmp.replace ('\r', '')
-                        log         = log.replace ('\n', '\\n')
-                      # print("buf: --%s--" % buf)
-                      # print("log: --%s--" % log)
-                        if  len(log) > _DEBUG_MAX :
-                            self.logger.debug("read : [%5d] [%5d] (%s ... %s)"
-                                           % (f, len(log), log[:30], log[-30:]))
-                        else :
-                            self.logger.debug ("read : [%5d] [%5d] (%s)"
-                                            % (f, len(log), log))
-                          # for c in log :
-                          #     print('%s' % c)
+                        if  b'\r' in buf :
+                            buf = buf.replace (b'\r', b'')
+                        self._cache_put (buf)
+                        fresh = fresh or bool(buf)
+
+                        if  debug :
+                            self.logger.debug ("read : [%5d] [%5d] (%s)",
+                                               f, len(buf), _preview (buf))
 
 
                     # lets see if we still got any data in the cache we
                     # can return
-                    if len (self.cache) :
-
-                        if  not size :
-                            ret        = self.cache
-                            self.cache = ""
-                            self.tail += ret
-                            self.tail  = self.tail[-256:]
-                            return ret
-
-                        # we don't even need all of the cache
-                        elif size <= len (self.cache) :
-                            ret        = self.cache[:size]
-                            self.cache = self.cache[size:]
-                            self.tail += ret
-                            self.tail  = self.tail[-256:]
-                            return ret
+                    if fresh and self.cache_len :
+                        if not size or size <= self.cache_len :
+                            ret = self._cache_get (size)
+                            if ret :
+                                return ret
+                        fresh = False
 
                     # at this point, we do not have sufficient data -- only
                     # return on timeout
 
                     if  timeout == 0 :
                         # only return if we have data
-                        if len (self.cache) :
-                            ret        = self.cache
-                            self.cache = ""
-                            self.tail += ret
-                            self.tail  = self.tail[-256:]
-                            return ret
+                        if self.cache_len :
+                            ret = self._cache_get ()
+                            if ret :
+                                return ret
 
                     elif timeout < 0 :
                         # return of we have data or not
-                        ret        = self.cache
-                        self.cache = ""
-                        self.tail += ret
-                        self.tail  = self.tail[-256:]
-                        return ret
+                        return self._cache_get ()
 
                     else :  # timeout > 0
                         # return if timeout is reached
                         now = time.time ()
                         if (now - start) > timeout :
-                            ret        = self.cache
-                            self.cache = ""
-                            self.tail += ret
-                            self.tail  = self.tail[-256:]
-                            return ret
+                            return self._cache_get ()
 
 
             except Exception as e :
@@ -710,14 +896,15 @@ class PTYProcess (object) :
         Note that the pattern are interpreted with the re.M (multi-line) and
         re.S (dot matches all) regex flags.
 
-        Performance: the call is doing repeated string regex searches over
-        whatever data it finds.  On complex regexes, and large data, and small
-        read buffers, this method can be expensive.
+        Performance: the call only scans newly arrived data, plus a look-back
+        of `_LOOKBACK` chars for matches which span several reads -- a match
+        which starts further back than that is not found.  The cost of a call
+        is thus linear in the amount of data read.
 
         Note: the returned data get '\\\\r' stripped.
 
-        Note: ansi-escape sequences are also stripped before matching, but are
-        kept in the returned data.
+        Note: ansi-escape sequences are stripped before matching, and are also
+        stripped from the returned data.
         """
 
         if timeout is None:
@@ -725,87 +912,90 @@ class PTYProcess (object) :
 
         timeout = int(timeout)
 
-        def escape (txt) :
-            pat = re.compile(r'\x1b[^m]*m')
-            return pat.sub ('', txt)
-
-        _debug = False
-
         with self.rlock :
 
+            parts   = list()  # escaped data seen so far, in chunks
+            tail    = ''      # look-back: tail of escaped data
+            pending = ''      # unescaped data, maybe an incomplete escape seq
+
             try :
                 start = time.time ()   # startup timestamp
-                ret   = []             # array of read lines
                 patts = []             # compiled patterns
-                data  = self.cache     # initial data to check
-                self.cache = ""
-
-                if  not data :  # empty cache?
-                    data = self.read (timeout=_POLLDELAY)
 
                 # pre-compile the given pattern, to speed up matching
                 for pattern in patterns :
                     patts.append(re.compile (pattern, re.MULTILINE | re.DOTALL))
 
+                # initial data to check: the cache, or whatever comes next
+                data = self.read (timeout=_POLLDELAY)
+
                 # we wait forever -- there are two ways out though: data matches
                 # a pattern, or timeout passes
                 while True :
 
-                    # skip non-lines
-                    if  not data :
-                        data += self.read (timeout=_POLLDELAY)
+                    if  data :
 
-                    if  _debug : print((">>%s<<" % data))
+                        # escape sequences can be split over reads: keep an
+                        # incomplete one pending until more data arrive (it is
+                        # still matched literally in the meantime).
+                        data = pending + data
+                        esc  = data.rfind ('\x1b')
 
-                    escaped = escape (data)
-                    if _debug : print(('data    ==%s==' % ascii(data)))
-                    if _debug : print(('escaped ==%s==' % ascii(escaped)))
+                        if  esc >= 0 and len(data) - esc < _ESC_MAX \
+                                     and 'm' not in data[esc:] :
+                            pending = data[esc:]
+                            data    = data[:esc]
+                        else :
+                            pending = ''
 
-                    # check current data for any matching pattern
-                    for n in range (0, len(patts)) :
+                        data = _ESCAPE.sub ('', data)
+                        parts.append (data)
 
-                      # escaped = data
-                      # escaped = escape (data)
-                      # print('-- 1 --%s--' % data)
-                      # print('-- 2 --%s--' % escaped)
+                        # only search the new data and the look-back -- plus
+                        # one char of context so that '^', '\b' etc. behave as
+                        # on the complete data
+                        window = tail + data + pending
+                        pos    = max(0, len(tail) - _LOOKBACK)
+                        tail   = (tail + data)[-(_LOOKBACK + 1):]
 
-                        match = patts[n].search (escaped)
-                        if _debug : print(("==%s==" % patterns[n]))
-                        if _debug : print(match)
+                        # check current data for any matching pattern
+                        for n in range (0, len(patts)) :
 
-                        if match :
-                            # a pattern matched the current data: return a tuple
-                            # of pattern index and matching data.  The remainder
-                            # of the data is cached.
-                            ret  = escaped[0:match.end()]
-                            self.cache = escaped[match.end():]
+                            match = patts[n].search (window, pos)
 
-                            if _debug:
-                                m = match
-                                e = escaped
-                                print(("~~match!~~ %s" % e[m.start():m.end()]))
-                                print(("~~match!~~ %s" % (len(e))))
-                                print(("~~match!~~ %s" % (str(m.span()))))
-                                print(("~~match!~~ %s" % (ret)))
+                            if match :
+                                # a pattern matched the current data: return
+                                # a tuple of pattern index and matching data.
+                                # The remainder of the data is cached.
+                                escaped = ''.join (parts) + pending
+                                cut     = len(escaped) - len(window) \
+                                        + match.end ()
+                                self._cache_put (escaped[cut:], front=True)
 
-                            return (n, ret.replace('\r', ''))
+                                return (n, escaped[:cut])
 
                     # if a timeout is given, and actually passed, return
                     # a non-match and a copy of the data we looked at
                     if timeout == 0 :
-                        return (None, str(escaped))
+                        return (None, ''.join (parts) + pending)
 
                     if timeout > 0 :
                         now = time.time ()
                         if (now - start) > timeout :
-                            self.cache = escaped
-                            return (None, str(escaped))
+                            escaped = ''.join (parts) + pending
+                            self._cache_put (escaped, front=True)
+                            return (None, escaped)
 
-                    # no match yet, still time -- read more data
-                    data += self.read (timeout=_POLLDELAY)
+                    # no match yet, still time -- read more data.  `read()`
+                    # returns as soon as any data arrive.
+                    wait = _WAIT_MAX
+                    if  timeout > 0 :
+                        wait = min (wait, start + timeout - time.time ())
+                    data = self.read (timeout=max (wait, _POLLDELAY))
 
             except se.NoSuccess as e :
-                raise ptye.translate_exception (e, "(%s)" % data) from e
+                raise ptye.translate_exception (e, "(%s)" % (tail + pending)) \
+                      from e
 
 
     # ----------------------------------------------------------------
@@ -821,19 +1011,17 @@ class PTYProcess (object) :
             if not self.alive (recover=False) :
                 raise ptye.translate_exception(
                         se.NoSuccess("cannot write to dead process (%s) [%5d]"
-                                     % (self.cache[-256:], self.parent_in)))
+                                     % (self.tail, self.parent_in)))
 
             try :
-                log = self._hide_data (data, nolog)
-                log =  log.replace ('\n', '\\n')
-                log =  log.replace ('\r', '')
-                if  len(log) > _DEBUG_MAX :
-                    self.logger.debug ("write: [%5d] [%5d] (%s ... %s)"
-                                    % (self.parent_in, len(data),
-                                       log[:30], log[-30:]))
-                else :
-                    self.logger.debug ("write: [%5d] [%5d] (%s)"
-                                    % (self.parent_in, len(data), log))
+                # only build the log preview if it actually gets logged
+                if  self.logger.isEnabledFor (logging.DEBUG) :
+                    log = self._hide_data (data, nolog)
+                    log = _preview (log.replace ('\r', '').encode ('utf-8'))
+                    self.logger.debug ("write: [%5d] [%5d] (%s)",
+                                       self.parent_in, len(data), log)
+
+                data = data.encode ('utf-8')
 
                 # attempt to write forever -- until we succeeed
                 while data :
@@ -845,13 +1033,13 @@ class PTYProcess (object) :
                     for f in wlist :
 
                         # write will report the number of written bytes
-                        size = os.write(f, str.encode(data))
+                        size = os.write (f, data)
 
                         # otherwise, truncate by written data, and try again
                         data = data[size:]
 
                         if data :
-                            self.logger.info ("write: [%5d] [%5d]" % (f, size))
+                            self.logger.info ("write: [%5d] [%5d]", f, size)
 
 
             except Exception as e:
@@ -860,4 +1048,122 @@ class PTYProcess (object) :
 
 
 # ------------------------------------------------------------------------------
+#
+class _Reactor (object, metaclass=ru.Singleton) :
+    """
+    A single thread which reads data from all registered `PTYProcess` instances
+    as they arrive, and passes them on to the respective process instance,
+    which then wakes up any reader waiting for data.  This avoids that each
+    reader polls its pty in a loop.  The reactor uses `epoll` where available,
+    and `poll` otherwise.
+
+    The reactor is used if the `reactor` option in the `pty` config section is
+    set (`RADICAL_SAGA_PTY_REACTOR=1`).
+    """
+
+    # ----------------------------------------------------------------------
+    #
+    def __init__ (self) :
+
+        # the processes are only weakly referenced, so that dropping the last
+        # reference to a process finalizes it (which unregisters its fd) --
+        # that can happen in the reactor thread, so the lock is reentrant
+        self._lock  = mt.RLock ()
+        self._procs = weakref.WeakValueDictionary ()  # fd: PTYProcess
+
+        if  hasattr (select, 'epoll') :
+            self._poller = select.epoll ()
+            self._scale  = 1.0     # epoll timeouts are in seconds
+            self._flags  = select.EPOLLIN | select.EPOLLERR | select.EPOLLHUP
+        else :
+            self._poller = select.poll ()
+            self._scale  = 1000.0  # poll timeouts are in milliseconds
+            self._flags  = select.POLLIN  | select.POLLERR  | select.POLLHUP
+
+        self._thread = mt.Thread (target=self._run,
+                                  name='radical.saga.pty.reactor')
+        self._thread.daemon = True
+        self._thread.start ()
+
+
+    # ----------------------------------------------------------------------
+    #
+    def register (self, proc) :
+
+        with self._lock :
+            self._procs[proc.parent_out] = proc
+            self._poller.register (proc.parent_out, self._flags)
+
 
+    # ----------------------------------------------------------------------
+    #
+    def unregister (self, fd) :
+        """
+        Stop reading from the given fd.  Once this returns, the reactor does
+        not touch the fd anymore, so it can safely be closed.
+        """
+
+        with self._lock :
+            self._unregister (fd)
+
+
+    # ----------------------------------------------------------------------
+    #
+    def _unregister (self, fd) :
+
+        # the entry of a collected process may be gone already, but its fd
+        # is still polled
+        self._procs.pop (fd, None)
+        try :
+            self._poller.unregister (fd)
+        except (KeyError, ValueError, OSError) :
+            pass
+
+
+    # ----------------------------------------------------------------------
+    #
+    def _run (self) :
+
+        while True :
+
+            try :
+                events = self._poller.poll (_REACTOR * self._scale)
+
+            except Exception as e :
+                ru.Logger ('radical.saga.pty').exception ('reactor: %s' % e)
+                time.sleep (_POLLDELAY)
+                continue
+
+            for fd, _ in events :
+
+                # hold the lock while reading, so that the fd can't be closed
+                # (and reused) in the meantime
+                with self._lock :
+
+                    proc = self._procs.get (fd)
+                    if  not proc :
+                        # the process got collected
+                        self._unregister (fd)
+                        continue
+
+                    error = None
+                    try :
+                        data = os.read (fd, _CHUNKSIZE)
+                        if  not data :
+                            error = OSError (errno.EIO, 'EOF')
+
+                    except OSError as e :
+                        data  = None
+                        error = e
+
+                    if  error :
+                        # no more data to expect
+                        self._unregister (fd)
+
+                    proc._reactor_put (data, error)
+
+                # don't keep finalized processes alive until the next event
+                proc = None
+
+
+# ------------------------------------------------------------------------------
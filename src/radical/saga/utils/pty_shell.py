@@ -8,6 +8,9 @@ import re
 import os
 import sys
 import errno
+import base64
+import logging
+import itertools
 import tempfile
 
 import radical.utils              as ru
@@ -27,6 +30,11 @@ from  ..import exceptions         as rse
 #
 _PTY_TIMEOUT = 2.0
 
+# `_trace` calls are guarded by this flag at each call site, so that the trace
+# messages are not even formatted unless `RADICAL_SAGA_PTY_TRACE` is set
+_TRACE = os.environ.get ('RADICAL_SAGA_PTY_TRACE', '').lower () \
+         not in ['', '0', 'false', 'no', 'off']
+
 
 # ------------------------------------------------------------------------------
 #
@@ -34,7 +42,7 @@ _PTY_TIMEOUT = 2.0
 #
 IGNORE   = 0    # discard stdout / stderr
 MERGED   = 1    # merge stdout and stderr
-SEPARATE = 2    # fetch stdout and stderr individually (one more hop)
+SEPARATE = 2    # fetch stdout and stderr individually
 STDOUT   = 3    # fetch stdout only, discard stderr
 STDERR   = 4    # fetch stderr only, discard stdout
 
@@ -209,6 +217,7 @@ class PTYShell (object) :
         self.cp_slave    = None         # file copy channel
 
         self.initialized = False
+        self._frame_ids  = itertools.count (1)  # run_many markers (atomic)
 
         self.pty_id       = PTYShell._pty_id
         PTYShell._pty_id += 1
@@ -225,6 +234,10 @@ class PTYShell (object) :
         self.prompt_re = re.compile ("^(.*?)%s"    % self.prompt, re.DOTALL)
         self.logger.info ("PTY prompt pattern: %s" % self.prompt)
 
+        # file contents up to that size are streamed through the shell
+        self.stream_max = int(self.cfg.get('stream_max_size', 64 * 1024))
+        self._base64    = None  # remote base64 commands (see `_get_base64`)
+
         # we need a local dir for file staging caches.  At this point we use
         # $HOME, but should make this configurable (FIXME)
         self.base = os.environ['HOME'] + '/.radical/saga/adaptors/shell/'
@@ -247,7 +260,7 @@ class PTYShell (object) :
                                                    interactive=self.interactive)
         self.pty_shell  = self.factory.run_shell  (self.pty_info)
 
-        self._trace ('init : %s' % self.pty_shell.command)
+        if _TRACE : self._trace ('init : %s' % self.pty_shell.command)
 
         self.initialize ()
 
@@ -256,9 +269,8 @@ class PTYShell (object) :
     #
     def _trace (self, msg) :
 
-      # print " === %5d : %s : %s" % (self._pty_id, self.pty_shell, msg)
-      # self.logger.debug(" === %5d : %s : %s", self._pty_id,self.pty_shell,msg)
-        pass
+        self.logger.debug (" === %5d : %s : %s",
+                           self.pty_id, self.pty_shell, msg)
 
 
     # ----------------------------------------------------------------
@@ -628,8 +640,7 @@ class PTYShell (object) :
           * *MERGED:*   both streams will be merged and returned as stdout;
                         stderr will be `None`.  This is the default.
           * *SEPARATE:* stdout and stderr will be captured separately, and
-                        returned individually.  Note that this will require
-                        at least one more network hop!
+                        returned individually.
           * *STDOUT:*   only stdout is captured, stderr will be `None`.
           * *STDERR:*   only stderr is captured, stdout will be `None`.
           * *None:*     do not perform any redirection -- this is effectively
@@ -647,7 +658,7 @@ class PTYShell (object) :
 
         with self.pty_shell.rlock :
 
-            self._trace ("run sync  : %s" % command)
+            if _TRACE : self._trace ("run sync  : %s" % command)
             self.pty_shell.flush ()
 
             # we expect the shell to be in 'ground state' when running
@@ -664,25 +675,37 @@ class PTYShell (object) :
                     raise rse.BadParameter("run_sync can only run foreground jobs"
                                        "('%s')" % command)
 
-                redir = ""
-                _err  = "/tmp/radical.saga.ssh-job.stderr.$$"
-
-                if iomode is None    : redir  =  ""
-                if iomode == IGNORE  : redir  =  " 1>>/dev/null 2>>/dev/null"
-                if iomode == MERGED  : redir  =  " 2>&1"
-                if iomode == SEPARATE: redir  =  " 2>%s" % _err
-                if iomode == STDOUT  : redir  =  " 2>/dev/null"
-                if iomode == STDERR  : redir  =  " 2>&1 1>/dev/null"
-
-                self.logger.debug    ('run_sync: %s%s'   % (command, redir))
-                self.pty_shell.write (          "%s%s\n" % (command, redir))
-
-
                 # If given, switch to new prompt pattern right now...
                 prompt = self.prompt
                 if  new_prompt :
                     prompt = new_prompt
 
+                if  iomode in [SEPARATE, STDERR] :
+
+                    # frame the command's stdout and stderr, so that both are
+                    # returned in a single round trip (see run_many)
+                    marker = self._frame_marker ()
+                    script = self._frame_command (command, iomode, marker)
+
+                    if  self.logger.isEnabledFor (logging.DEBUG) :
+                        self.logger.debug ('run_sync: %s', script.strip ())
+                    self.pty_shell.write (" {\n%s }\n" % script)
+
+                    result = self._frame_result (command, iomode, marker)
+
+                else :
+                    redir = ""
+
+                    if iomode is None    : redir  =  ""
+                    if iomode == IGNORE  : redir  =  " 1>>/dev/null 2>>/dev/null"
+                    if iomode == MERGED  : redir  =  " 2>&1"
+                    if iomode == STDOUT  : redir  =  " 2>/dev/null"
+
+                    self.logger.debug    ('run_sync: %s%s',    command, redir)
+                    self.pty_shell.write (          "%s%s\n" % (command, redir))
+
+                    result = None
+
                 # command has been started - now find prompt again.
                 fret, match = self.pty_shell.find ([prompt], timeout=-1.0)
 
@@ -695,43 +718,204 @@ class PTYShell (object) :
 
                 ret, txt = self._eval_prompt (match, new_prompt)
 
+                if  result :
+                    # exit code and output were framed
+                    return result
+
                 stdout = txt
                 stderr = None
 
-                if  iomode in [SEPARATE, STDERR]:
+                if iomode == IGNORE:
+                    stdout = None
 
-                    self.pty_shell.write(" cat %s\n" % _err)
-                    fret, match = self.pty_shell.find ([self.prompt],
-                                                       timeout=-1.0)  # blocks
-                    if  fret is None :
-                        # not find prompt after blocking?  BAD!  Restart shell
-                        self.finalize (kill_pty=True)
-                        raise rse.IncorrectState (
-                                "run_sync failed, no prompt (%s)" % command)
+                return (ret, stdout, stderr)
 
-                    _ret, _stderr = self._eval_prompt (match)
+            except Exception as e :
+                raise ptye.translate_exception (e) from e
 
-                    if  _ret :
-                        raise rse.IncorrectState(
-                                "run_sync failed, no stderr (%s: %s)"
-                                % (_ret, _stderr))
 
-                    stderr =  _stderr
+    # ----------------------------------------------------------------
+    #
+    def run_many (self, commands, iomode=None) :
+        """
+        Run a list of shell commands, and report exit code, stdout and stderr
+        for each of them (a list of tuples, as returned by :func:`run_sync`, in
+        the order of `commands`).
 
-                if  iomode == STDERR :
-                    # got stderr in branch above
-                    stdout = None
+        :type  commands: list of strings
+        :param commands: shell commands to run.
 
-                elif iomode == IGNORE:
-                    stdout = None
-                    stderr = None
+        :type  iomode:  enum
+        :param iomode:  Defines how stdout and stderr are captured (see
+                        :func:`run_sync`).
+
+        All commands are sent to the shell at once, so that the call costs
+        a single round trip, instead of one round trip per command.  Each
+        command is followed by a unique marker which reports its exit code --
+        the markers are used to split the shell output into the individual
+        command results as that output arrives.
+
+        The commands are run by the shell one after the other, and are subject
+        to the same restrictions as for :func:`run_sync`.  Additionally, they
+        must not read from stdin, must not span multiple lines, and must not
+        change the shell prompt.  A syntax error in any of the commands causes
+        the whole batch to fail.  For non-posix shells, the commands are run
+        via :func:`run_sync`, one by one.
+        """
 
-                return (ret, stdout, stderr)
+        if  not self.posix :
+            return [self.run_sync (command, iomode) for command in commands]
+
+        if  not commands :
+            return list()
+
+        with self.pty_shell.rlock :
+
+            if _TRACE : self._trace ("run many  : %s" % commands)
+            self.pty_shell.flush ()
+
+            # we expect the shell to be in 'ground state' when running
+            # a syncronous command -- thus we can check if the shell is alive
+            # before doing so, and restart if needed
+            if not self.pty_shell.alive (recover=True) :
+                raise rse.IncorrectState ("Can't run command -- shell died:\n%s"
+                                      % self.pty_shell.autopsy ())
+
+            try :
+
+                # the commands are sent as one compound command -- the shell
+                # will then only issue a single prompt once all are done (PS2
+                # is empty, so we also do not get continuation prompts)
+                script  = " {\n"
+                markers = list()
+                for command in commands :
+
+                    command = command.strip ()
+                    if command.endswith ('&') :
+                        raise rse.BadParameter("run_many can only run foreground"
+                                               " jobs ('%s')" % command)
+
+                    marker  = self._frame_marker ()
+                    script += self._frame_command (command, iomode, marker)
+                    markers.append (marker)
+
+                script += " }\n"
+
+                self.logger.debug    ('run_many: %s', commands)
+                self.pty_shell.write (script)
+
+                results = list()
+                for command, marker in zip (commands, markers) :
+                    results.append (self._frame_result (command, iomode,
+                                                        marker))
+
+                # all commands are done - now find prompt again.
+                fret, match = self.pty_shell.find ([self.prompt], timeout=-1.0)
+
+                if  fret is None :
+                    # not find prompt after blocking?  BAD!  Restart the shell
+                    self.finalize (kill_pty=True)
+                    raise rse.IncorrectState (
+                            "run_many failed, no prompt (%s)" % commands)
+
+                return results
 
             except Exception as e :
                 raise ptye.translate_exception (e) from e
 
 
+    # ----------------------------------------------------------------
+    #
+    def _frame_marker (self) :
+        """
+        return a marker which is unique for this shell, to frame the output of
+        a single command
+        """
+
+        # `next()` on a count is atomic, so concurrent callers which don't
+        # hold the pty lock (`write_to_remote`) still get distinct markers
+        return 'SAGA-FRAME-%d-%d' % (self.pty_id, next (self._frame_ids))
+
+
+    # ----------------------------------------------------------------
+    #
+    def _frame_command (self, command, iomode, marker) :
+        """
+        Return the shell code to run `command` so that its output is followed
+        by `marker` and the command's exit code (see :func:`_frame_result`).
+        Stderr, if it is to be captured separately, is stored in a temporary
+        file which is emitted and removed right after the marker, followed by
+        the marker again.
+        """
+
+        redir = ""
+        _err  = "/tmp/radical.saga.stderr.$$.%s" % marker
+
+        if iomode is None    : redir  =  ""
+        if iomode == IGNORE  : redir  =  " 1>>/dev/null 2>>/dev/null"
+        if iomode == MERGED  : redir  =  " 2>&1"
+        if iomode == SEPARATE: redir  =  " 2>%s" % _err
+        if iomode == STDOUT  : redir  =  " 2>/dev/null"
+        if iomode == STDERR  : redir  =  " 2>%s 1>/dev/null" % _err
+
+        ret = "%s%s\n printf '%s:%%d\\n' $?\n" % (command, redir, marker)
+
+        if  iomode in [SEPARATE, STDERR] :
+            ret += " cat %s 2>/dev/null; rm -f %s; printf '%s:E\\n'\n" \
+                 % (_err, _err, marker)
+
+        return ret
+
+
+    # ----------------------------------------------------------------
+    #
+    def _frame_result (self, command, iomode, marker) :
+        """
+        Collect the output of a command sent via :func:`_frame_command`, and
+        return a `(ret, stdout, stderr)` tuple as :func:`run_sync` does.
+        """
+
+        patterns = ['%s:(\\d+)\\n' % re.escape (marker), self.prompt]
+        fret, match = self.pty_shell.find (patterns, timeout=-1.0)
+
+        if  fret is None :
+            # not find marker after blocking?  BAD!  Restart the shell
+            self.finalize (kill_pty=True)
+            raise rse.IncorrectState ("command failed, no marker (%s)"
+                                      % command)
+
+        if  fret != 0 :
+            # we found a prompt instead: the shell did not run the command
+            raise rse.NoSuccess ("command failed (%s): %s" % (command, match))
+
+        idx    = match.rindex (marker)
+        ret    = int(match[idx + len(marker) + 1:])
+        stdout = match[:idx]
+        stderr = None
+
+        if  iomode in [SEPARATE, STDERR] :
+
+            patterns = ['%s:E\\n' % re.escape (marker)]
+            fret, match = self.pty_shell.find (patterns, timeout=-1.0)
+
+            if  fret is None :
+                self.finalize (kill_pty=True)
+                raise rse.IncorrectState ("command failed, no stderr (%s)"
+                                          % command)
+
+            stderr = match[:match.rindex (marker)]
+
+        if  iomode == STDERR :
+            # got stderr in branch above
+            stdout = None
+
+        elif iomode == IGNORE:
+            stdout = None
+            stderr = None
+
+        return (ret, stdout, stderr)
+
+
     # ----------------------------------------------------------------
     #
     def run_async (self, command) :
@@ -750,7 +934,7 @@ class PTYShell (object) :
 
         with self.pty_shell.rlock :
 
-            self._trace ("run async : %s" % command)
+            if _TRACE : self._trace ("run async : %s" % command)
             self.pty_shell.flush ()
 
             # we expect the shell to be in 'ground state' when running an
@@ -804,6 +988,11 @@ class PTYShell (object) :
         on the remote system.  If that file exists, it is overwritten.
         A NoSuccess exception is raised if writing the file was not possible
         (missing permissions, incorrect path, etc.).
+
+        Contents up to `stream_max_size` bytes (see the `pty` config section)
+        are streamed through the shell itself, in a single round trip.  Larger
+        contents are staged via a local temporary file and the shell's file
+        copy channel.
         """
 
         try :
@@ -813,11 +1002,32 @@ class PTYShell (object) :
             # FIXME: make this relative to the shell's pwd?  Needs pwd in
             # prompt, and updating pwd state on every find_prompt.
 
-            # first, write data into a tmp file
+            data = str.encode (src)
+            b64  = None
+
+            if  self.posix and len(data) <= self.stream_max :
+                b64 = self._get_base64 ()
+
+            if  b64 :
+
+                # base64 protects the data from the pty line discipline (line
+                # length limits, control chars), and the quoted here-document
+                # delimiter protects it from shell expansion.  Lines are kept
+                # short for `openssl base64`.
+                enc    = base64.b64encode (data).decode ()
+                lines  = [enc[i:i + 64] for i in range (0, len(enc), 64)]
+                marker = self._frame_marker ()
+                ret, out, _ = self.run_sync (" %s 2>&1 > %s << '%s'\n%s\n%s"
+                        % (b64[1], tgt, marker, '\n'.join (lines), marker))
+                if  ret :
+                    raise rse.NoSuccess ("could not write %s: %s" % (tgt, out))
+
+                return [tgt]
+
+            # otherwise, write data into a tmp file
             fhandle, fname = tempfile.mkstemp(suffix='.tmp',
                                               prefix='rs_pty_staging_')
-            os.write(fhandle, str.encode(src))
-            os.fsync(fhandle)
+            os.write(fhandle, data)
             os.close(fhandle)
 
             ret = self.stage_to_remote (fname, tgt)
@@ -838,6 +1048,10 @@ class PTYShell (object) :
         :param src: path to source file to staged from
                     The src path is not an URL, but expected to be a path
                     relative to the shell's URL.
+
+        The file is streamed through the shell, in a single round trip.  Only
+        if that fails (or the shell is not posix compliant), it is staged via
+        a local temporary file, which also reports errors properly.
         """
 
         try :
@@ -847,13 +1061,24 @@ class PTYShell (object) :
             # FIXME: make this relative to the shell's pwd?  Needs pwd in
             # prompt, and updating pwd state on every find_prompt.
 
-            # first, write data into a tmp file
+            b64 = None
+            if  self.posix :
+                b64 = self._get_base64 ()
+
+            if  b64 :
+
+                # the output direction is not subject to the pty's line
+                # discipline limits, so we don't need to check the size first
+                ret, out, _ = self.run_sync (" %s < %s" % (b64[0], src),
+                                             iomode=STDOUT)
+                if  not ret :
+                    return base64.b64decode (out).decode ()
+
+            # otherwise, write data into a tmp file
             fhandle, fname = tempfile.mkstemp(suffix='.tmp', prefix='rs_pty_staging_')
             _ = self.stage_from_remote (src, fname)
             os.close(fhandle)
 
-            os.system('sync')  # WTF?  Why do I need this?
-
             fhandle2 = open(fname, 'r')
             out      = fhandle2.read()
             fhandle2.close()
@@ -866,6 +1091,34 @@ class PTYShell (object) :
             raise ptye.translate_exception (e) from e
 
 
+    # ----------------------------------------------------------------
+    #
+    def _get_base64 (self) :
+        """
+        Return the remote commands to base64 encode and decode stdin, as tuple,
+        or `None` if there are none.  Decoding is `base64 -d` for GNU
+        coreutils, `base64 -D` on BSD / older MacOS, and `openssl base64 -d` as
+        fallback.  The remote host is probed once, on first use.
+        """
+
+        if  self._base64 is None :
+
+            ret, out, _ = self.run_sync (
+                    " for c in 'base64 -d' 'base64 -D' 'openssl base64 -d'; do "
+                    "test \"$(echo YQ== | $c 2>/dev/null)\" = a "
+                    "&& echo \"B64:$c\" && break; done", iomode=STDOUT)
+
+            self._base64 = False
+            for line in out.split ('\n') :
+                if  line.startswith ('B64:') :
+                    dec = line[4:].strip ()
+                    self._base64 = (dec[:-3], dec)  # strip ' -d' / ' -D'
+
+            self.logger.debug ("base64 commands: %s", self._base64)
+
+        return self._base64
+
+
     # ----------------------------------------------------------------
     #
     def stage_to_remote (self, src, tgt, cp_flags=None) :
@@ -881,7 +1134,7 @@ class PTYShell (object) :
                     relative to the shell's URL.
         """
 
-        self._trace ("stage to  : %s -> %s" % (src, tgt))
+        if _TRACE : self._trace ("stage to  : %s -> %s" % (src, tgt))
 
         # FIXME: make this relative to the shell's pwd?  Needs pwd in
         # prompt, and updating pwd state on every find_prompt.
@@ -908,7 +1161,7 @@ class PTYShell (object) :
                     relative to the current working directory.
         """
 
-        self._trace ("stage from: %s -> %s" % (src, tgt))
+        if _TRACE : self._trace ("stage from: %s -> %s" % (src, tgt))
 
         # FIXME: make this relative to the shell's pwd?  Needs pwd in
         # prompt, and updating pwd state on every find_prompt.
@@ -939,7 +1192,7 @@ class PTYShell (object) :
 
         with self.pty_shell.rlock :
 
-            self._trace ("copy  to  : %s -> %s" % (src, tgt))
+            if _TRACE : self._trace ("copy  to  : %s -> %s" % (src, tgt))
             self.pty_shell.flush ()
 
             info = self.pty_info
@@ -973,8 +1226,9 @@ class PTYShell (object) :
             # some form, such as sftp.  Get the shell cp_slave from cache, and
             # run the actual copy command.
             if  not self.cp_slave :
-                self._trace ("get cp slave")
-                self.cp_slave = self.factory.get_cp_slave (s_cmd, info, posix)
+                if _TRACE : self._trace ("get cp slave")
+                self.cp_slave = self.factory.get_cp_slave (s_cmd, info, posix,
+                                                    lock=self.pty_shell.rlock)
 
             self.cp_slave.flush ()
             if  'sftp' in s_cmd :
@@ -1068,7 +1322,7 @@ class PTYShell (object) :
 
         with self.pty_shell.rlock :
 
-            self._trace ("copy  from: %s -> %s" % (src, tgt))
+            if _TRACE : self._trace ("copy  from: %s -> %s" % (src, tgt))
             self.pty_shell.flush ()
 
             info = self.pty_info
@@ -1096,8 +1350,9 @@ class PTYShell (object) :
                 return list()
 
             if  not self.cp_slave :
-                self._trace ("get cp slave")
-                self.cp_slave = self.factory.get_cp_slave (s_cmd, info, posix)
+                if _TRACE : self._trace ("get cp slave")
+                self.cp_slave = self.factory.get_cp_slave (s_cmd, info, posix,
+                                                    lock=self.pty_shell.rlock)
 
             self.cp_slave.flush ()
             prep = ""
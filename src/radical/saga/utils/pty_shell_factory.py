@@ -8,6 +8,7 @@ import os
 import pwd
 import time
 import getpass
+import weakref
 import threading as mt
 
 import radical.utils           as ru
@@ -52,6 +53,8 @@ _SCHEMAS_GSI = ['gsissh', 'gsiscp', 'gsisftp']
 
 _SCHEMAS = _SCHEMAS_SH + _SCHEMAS_SSH + _SCHEMAS_GSI
 
+_PREWARM_THREADS = 8  # max number of concurrent connection attempts in prewarm
+
 # FIXME: '-o ControlPersist' is only supported for newer ssh versions.  We
 # should add detection, and enable that if available -- for now, just diable it.
 #
@@ -138,6 +141,17 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
     for and used.  'Suitable' means: ssh master for scp and sftp slaves; gsissh
     for gsiscp and gsisftp slaves; and sh master for file slaves
 
+    Masters (and their slaves) are created under a lock which is specific to
+    their registry entry, so that connections to different hosts can be created
+    concurrently (see also :func:`prewarm`).  `self.rlock` only protects the
+    registry itself.
+
+    Once the first master is created, a health monitor thread checks all idle
+    masters and copy slaves every `health_interval` seconds (see the `pty`
+    config section), and reconnects those which died.  Masters for posix shells
+    are also pinged, so that hanging connections are detected, too.  The
+    connection states are available via :func:`get_health`.
+
     """
 
 
@@ -148,6 +162,11 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
         self.logger     = ru.Logger('radical.saga.pty')
         self.rlock      = mt.RLock()
         self.registry   = dict()
+        self.locks      = dict()  # one lock per registry entry
+        self.health     = dict()  # connection state per registry entry
+        self.cp_slaves  = weakref.WeakKeyDictionary ()  # cp_slave: info, posix
+        self.monitor    = None    # health monitor thread
+        self.pings      = 0       # ping counter
 
         name = None
         if isinstance(cfg, str):
@@ -157,38 +176,44 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
         self.cfg = ru.Config('radical.saga.session', name=name, cfg=cfg)
         self.cfg = self.cfg.pty
 
+        self.health_interval = float(self.cfg.get('health_interval', 30.0))
+
 
     # --------------------------------------------------------------------------
     #
     def initialize (self, url, session=None, prompt=None, logger=None, cfg=None,
             posix=True, interactive=True) :
 
-        with self.rlock :
+        # make sure we have a valid url type
+        url = Url (url)
 
-            # make sure we have a valid url type
-            url = Url (url)
+        if  not prompt :
+            prompt = "^(.*[\$#%>\]])\s*$"
 
-            if  not prompt :
-                prompt = "^(.*[\$#%>\]])\s*$"
+        if  not logger :
+            logger = self.logger
 
-            if  not logger :
-                logger = self.logger
+        if  not cfg :
+            cfg = self.cfg
 
 
-            # collect all information we have/need about the requested master
-            # connection
-            info = self._create_master_entry (url, session, prompt, logger, cfg,
-                    posix, interactive)
+        # collect all information we have/need about the requested master
+        # connection
+        info = self._create_master_entry (url, session, prompt, logger, cfg,
+                posix, interactive)
 
-            # we got master info - register the master, and create the instance!
-            type_s = str(info['shell_type'])
-            user_s = str(info['user'])
-            host_s = str(info['host_str'])
+        # we got master info - register the master, and create the instance!
+        host_s, user_s, type_s = self._get_key (info)
+
+        # masters for other hosts can be created while we hold this lock
+        with self._get_lock (host_s, user_s, type_s) :
+
+            with self.rlock :
+                master = self.registry.get (host_s, {}).get (user_s, {}) \
+                                                       .get (type_s)
 
             # Now, if we don't have that master, yet, we need to instantiate it
-            if host_s not in self.registry                 : self.registry[host_s] = {}
-            if user_s not in self.registry[host_s]         : self.registry[host_s][user_s] = {}
-            if type_s not in self.registry[host_s][user_s] :
+            if  not master :
 
                 # new master: create an instance, and register it
                 m_cmd = info['scripts'][info['shell_type']]['master'] % info
@@ -206,13 +231,18 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
                 self._initialize_pty(info['pty'], info)
 
                 # master was created - register it
-                self.registry[host_s][user_s][type_s] = info
+                with self.rlock :
+                    self.registry.setdefault (host_s, {}) \
+                                 .setdefault (user_s, {})[type_s] = info
+                    self._set_health ((host_s, user_s, type_s), 'connected')
+
+                self._start_monitor ()
 
 
             else :
                 # we already have a master: make sure it is alive, and restart
                 # as needed
-                info = self.registry[host_s][user_s][type_s]
+                info = master
 
                 if  not info['pty'].alive (recover=True) :
                     raise rse.IncorrectState._log (logger,
@@ -221,6 +251,87 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
             return info
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _get_key (self, info) :
+        """
+        return the registry key for the given master info
+        """
+
+        return (str(info['host_str']), str(info['user']),
+                str(info['shell_type']))
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _get_lock (self, host_s, user_s, type_s) :
+        """
+        return the lock which guards creation and recovery of the master for
+        the given registry entry, and the creation of its slaves
+        """
+
+        with self.rlock :
+
+            key = (host_s, user_s, type_s)
+            if  key not in self.locks :
+                self.locks[key] = mt.RLock ()
+
+            return self.locks[key]
+
+
+    # --------------------------------------------------------------------------
+    #
+    def prewarm (self, urls, session=None, logger=None, cfg=None,
+            posix=True, interactive=True) :
+        """
+        Create master connections for all given URLs, concurrently (with up to
+        `_PREWARM_THREADS` threads).  Masters which exist already are checked
+        (and revived if needed).  Unlike
+        :func:`initialize`, this call does not raise on connection errors, but
+        returns a dict which maps each URL (as string) to `None` if the master
+        is up, or to the exception raised while creating it.
+        """
+
+        if  not logger :
+            logger = self.logger
+
+        ret     = dict()
+        threads = list()
+        todo    = list(urls)
+        lock    = mt.Lock ()
+
+        # ----------------------------------------------------------------------
+        def _prewarm () :
+
+            while True :
+
+                with lock :
+                    if  not todo :
+                        return
+                    url = todo.pop (0)
+
+                try :
+                    self.initialize (url, session, logger=logger, cfg=cfg,
+                                     posix=posix, interactive=interactive)
+                    ret[str(url)] = None
+
+                except Exception as e :
+                    logger.warning ("prewarm failed for %s: %s" % (url, e))
+                    ret[str(url)] = e
+        # ----------------------------------------------------------------------
+
+        for _ in range (min (len(todo), _PREWARM_THREADS)) :
+            thread = mt.Thread (target=_prewarm)
+            thread.daemon = True
+            thread.start ()
+            threads.append (thread)
+
+        for thread in threads :
+            thread.join ()
+
+        return ret
+
+
     # --------------------------------------------------------------------------
     #
     def _initialize_pty (self, pty_shell, info, posix=None) :
@@ -228,7 +339,7 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
         # posix: only for posix shells we use prompt triggers.  sftp for example
         # does not deal well with triggers (no printf).
 
-        with self.rlock :
+        with pty_shell.rlock :
 
             # import pprint
             # pprint.pprint(info)
@@ -305,6 +416,7 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
                         if  not retry_trigger :
                             # just waiting for the *right* trigger or prompt,
                             # don't need new ones...
+                            n, match = pty_shell.find (prompt_patterns, delay)
                             continue
 
                         if posix:
@@ -429,18 +541,27 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
 
     # --------------------------------------------------------------------------
     #
-    def get_cp_slave (self, s_cmd, info, posix=None) :
+    def get_cp_slave (self, s_cmd, info, posix=None, lock=None) :
+        """
+        Create a new copy channel.  `lock` should be held by the caller while
+        it uses the channel -- the health monitor leaves the channel alone
+        while that lock is held.
+        """
 
-        with self.rlock :
+        if posix is None:
+            posix = info.get('copy_is_posix')
 
-            if posix is None:
-                posix = info.get('copy_is_posix')
+        with self._get_lock (*self._get_key (info)) :
 
           # print('> -- new cp  shell to %s' % s_cmd)
 
             cp_slave = supp.PTYProcess (s_cmd, self.cfg, info['logger'])
             self._initialize_pty (cp_slave, info, posix)
 
+            # keep the cp slave under watch of the health monitor
+            with self.rlock :
+                self.cp_slaves[cp_slave] = (info, posix, lock)
+
             return cp_slave
 
 
@@ -453,7 +574,7 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
         is created.  If needed, the existing master connection is revived.
         """
 
-        with self.rlock :
+        with self._get_lock (*self._get_key (info)) :
 
             s_cmd = info['scripts'][info['shell_type']]['shell'] % info
 
@@ -466,6 +587,183 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
             return sh_slave
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _set_health (self, key, state, error=None, reconnect=False) :
+
+        with self.rlock :
+
+            health = self.health.setdefault (key, {'state'      : None,
+                                                   'reconnects' : 0,
+                                                   'checked'    : None,
+                                                   'error'      : None})
+            health['state']   = state
+            health['error']   = error
+            health['checked'] = time.time ()
+
+            if  reconnect :
+                health['reconnects'] += 1
+
+
+    # --------------------------------------------------------------------------
+    #
+    def get_health (self) :
+        """
+        Return the state of all master connections, as a dict of the form::
+
+            {host: {user: {shell_type: {'state'      : 'connected',
+                                        'reconnects' : 0,
+                                        'checked'    : 1234567890.0,
+                                        'error'      : None}}}}
+
+        `state` is either `connected`, or `disconnected` if the connection died
+        and could not be re-established (`error` then holds the reason).
+        `checked` is the time of the last health check.
+        """
+
+        with self.rlock :
+
+            ret = dict()
+            for (host_s, user_s, type_s), health in self.health.items () :
+                ret.setdefault (host_s, {}) \
+                   .setdefault (user_s, {})[type_s] = dict(health)
+
+            return ret
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _start_monitor (self) :
+
+        with self.rlock :
+
+            if  self.monitor or self.health_interval <= 0 :
+                return
+
+            self.monitor = mt.Thread (target=self._monitor_loop,
+                                      name='radical.saga.pty.health')
+            self.monitor.daemon = True
+            self.monitor.start ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _monitor_loop (self) :
+
+        while True :
+
+            time.sleep (self.health_interval)
+
+            try :
+                self.check_health ()
+
+            except Exception as e :
+                self.logger.exception ("health check failed: %s" % e)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def check_health (self) :
+        """
+        Check all master connections and copy slaves, and re-establish those
+        which died.  Connections which are in use are skipped -- whoever uses
+        them will notice failures anyway.  This is called periodically by the
+        health monitor thread, but can also be called directly.
+        """
+
+        with self.rlock :
+            masters = [((host_s, user_s, type_s), info)
+                       for host_s in self.registry
+                       for user_s in self.registry[host_s]
+                       for type_s, info in self.registry[host_s][user_s].items()]
+            slaves  = list(self.cp_slaves.items ())
+
+        for key, info in masters :
+
+            lock = self._get_lock (*key)
+            if  not lock.acquire (blocking=False) :
+                continue
+
+            try :
+                ok, reconnect = self._check_pty (info['pty'], info,
+                                                 ping=info['posix'])
+                if  ok is not None :
+                    self._set_health (key, 'connected', reconnect=reconnect)
+
+            except Exception as e :
+                info['logger'].warning ("lost connection to %s: %s"
+                                       % (info['host_str'], e))
+                self._set_health (key, 'disconnected', error=str(e))
+
+            finally :
+                lock.release ()
+
+        for cp_slave, (info, posix, lock) in slaves :
+
+            # the slave's owner uses it between `write()` and `find()` calls,
+            # which don't hold the slave's own lock -- so we also need the
+            # owner's lock, and skip the slave if that is held.
+            if  lock and not lock.acquire (blocking=False) :
+                continue
+
+            try :
+                self._check_pty (cp_slave, info, posix=posix)
+
+            except Exception as e :
+                info['logger'].warning ("lost copy channel to %s: %s"
+                                       % (info['host_str'], e))
+
+            finally :
+                if  lock :
+                    lock.release ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _check_pty (self, pty_shell, info, posix=None, ping=False) :
+        """
+        Check if the given pty is alive (and, if `ping` is set, responsive), and
+        reconnect it otherwise.  Returns a tuple `(ok, reconnected)`, where `ok`
+        is `None` if the pty is in use and was not checked.  Raises if the
+        reconnect fails.
+        """
+
+        if  not pty_shell.rlock.acquire (blocking=False) :
+            return None, False
+
+        try :
+            if  pty_shell.alive (recover=False) :
+
+                if  not ping :
+                    return True, False
+
+                # the connection may hang w/o the process dying -- make sure
+                # the shell responds.  Output from earlier pings (prompts) is
+                # consumed by the next one.
+                self.pings += 1
+                trigger = 'PING_%d_SAGA' % self.pings
+                pty_shell.write (" printf 'PING_%%d_SAGA\\n' %d\n" % self.pings)
+                n, _ = pty_shell.find ([trigger],
+                                       timeout=float(info['ssh_timeout']))
+                if  n is not None :
+                    return True, False
+
+                pty_shell.finalize ()
+
+            info['logger'].info ("reconnect to %s" % info['host_str'])
+            pty_shell.initialize ()
+            self._initialize_pty (pty_shell, info, posix)
+
+            if  not pty_shell.alive (recover=False) :
+                raise rse.NoSuccess ("reconnect failed: %s"
+                                    % pty_shell.autopsy ())
+
+            return True, True
+
+        finally :
+            pty_shell.rlock.release ()
+
+
     # --------------------------------------------------------------------------
     #
     def _which(self, cmd):
@@ -483,240 +781,238 @@ class PTYShellFactory (object, metaclass=ru.Singleton) :
         # FIXME: cache 'which' results, etc
         # FIXME: check 'which' results
 
-        with self.rlock :
+        info = {'posix' : posix}
+
+        # get and evaluate session config
+        if  not session :
+            session = Session (default=True)
+
+        info['ssh_copy_mode']  = cfg['ssh_copy_mode']
+        info['ssh_share_mode'] = cfg['ssh_share_mode']
+        info['ssh_timeout']    = cfg['ssh_timeout']
+
+        logger.info ("ssh copy  mode set to '%s'" % info['ssh_copy_mode' ])
+        logger.info ("ssh share mode set to '%s'" % info['ssh_share_mode'])
+        logger.info ("ssh timeout    set to '%s'" % info['ssh_timeout'])
+
+
+        # fill the info dict with details for this master channel, and all
+        # related future slave channels
+        info['schema']    = url.schema.lower ()
+        info['host_str']  = url.host
+        info['prompt']    = prompt
+        info['logger']    = logger
+        info['url']       = url
+        info['pass']      = ""
+        info['key_pass']  = {}
+        info['scripts']   = _SCRIPTS
+
+        if  not info['schema'] :
+            info['schema'] = 'local'
+
+
+        # find out what type of shell we have to deal with
+        if  info['schema'] in _SCHEMAS_SSH :
+            info['shell_type'] = "ssh"
+            info['copy_mode']  = info['ssh_copy_mode']
+            info['share_mode'] = info['ssh_share_mode']
+            info['ssh_exe']    = self._which ("ssh")
+            info['scp_exe']    = self._which ("scp")
+            info['sftp_exe']   = self._which ("sftp")
+
+        elif info['schema'] in _SCHEMAS_GSI :
+            info['shell_type'] = "ssh"
+            info['copy_mode']  = info['ssh_copy_mode']
+            info['share_mode'] = info['ssh_share_mode']
+            info['ssh_exe']    = self._which ("gsissh")
+            info['scp_exe']    = self._which ("gsiscp")
+            info['sftp_exe']   = self._which ("gsisftp")
+
+        elif info['schema'] in _SCHEMAS_SH :
+            info['shell_type'] = "sh"
+            info['copy_mode']  = "sh"
+            info['share_mode'] = "auto"
+            info['sh_env']     = "/usr/bin/env TERM=vt100 PROMPT_COMMAND='' PS1='PROMPT-$?->'"
+            info['cp_env']     = "/usr/bin/env TERM=vt100 PROMPT_COMMAND='' PS1='PROMPT-$?->'"
+            info['scp_root']   = "/"
+
+            if interactive: info['sh_args'] = "-i"
+            else          : info['sh_args'] = ""
+
+            if  "SHELL" in os.environ :
+                info['sh_exe'] =  self._which (os.environ["SHELL"])
+                info['cp_exe'] =  self._which ("cp")
+            else :
+                info['sh_exe'] =  self._which ("sh")
+                info['cp_exe'] =  self._which ("cp")
+
+        else :
+            raise rse.BadParameter._log (self.logger,
+                      "cannot handle schema '%s://'" % url.schema)
+
+
+        # If an SSH timeout has been specified set up the ConnectTimeout
+        # string
+        if info['ssh_timeout']:
+            info['ssh_connect_timeout'] = ('-o ConnectTimeout=%s'
+                % int(float(info['ssh_timeout'])))
+        else:
+            info['ssh_connect_timeout'] = ''
+
+        # depending on type, create command line (args, env etc)
+        #
+        # We always set term=vt100 to avoid ansi-escape sequences in the
+        # prompt and elsewhere.  Also, we have to make sure that the shell
+        # is an interactive login shell, so that it interprets the users
+        # startup files, and reacts on commands.
 
-            info = {'posix' : posix}
-
-            # get and evaluate session config
-            if  not session :
-                session = Session (default=True)
-
-            info['ssh_copy_mode']  = cfg['ssh_copy_mode']
-            info['ssh_share_mode'] = cfg['ssh_share_mode']
-            info['ssh_timeout']    = cfg['ssh_timeout']
-
-            logger.info ("ssh copy  mode set to '%s'" % info['ssh_copy_mode' ])
-            logger.info ("ssh share mode set to '%s'" % info['ssh_share_mode'])
-            logger.info ("ssh timeout    set to '%s'" % info['ssh_timeout'])
-
-
-            # fill the info dict with details for this master channel, and all
-            # related future slave channels
-            info['schema']    = url.schema.lower ()
-            info['host_str']  = url.host
-            info['prompt']    = prompt
-            info['logger']    = logger
-            info['url']       = url
-            info['pass']      = ""
-            info['key_pass']  = {}
-            info['scripts']   = _SCRIPTS
-
-            if  not info['schema'] :
-                info['schema'] = 'local'
-
-
-            # find out what type of shell we have to deal with
-            if  info['schema'] in _SCHEMAS_SSH :
-                info['shell_type'] = "ssh"
-                info['copy_mode']  = info['ssh_copy_mode']
-                info['share_mode'] = info['ssh_share_mode']
-                info['ssh_exe']    = self._which ("ssh")
-                info['scp_exe']    = self._which ("scp")
-                info['sftp_exe']   = self._which ("sftp")
-
-            elif info['schema'] in _SCHEMAS_GSI :
-                info['shell_type'] = "ssh"
-                info['copy_mode']  = info['ssh_copy_mode']
-                info['share_mode'] = info['ssh_share_mode']
-                info['ssh_exe']    = self._which ("gsissh")
-                info['scp_exe']    = self._which ("gsiscp")
-                info['sftp_exe']   = self._which ("gsisftp")
-
-            elif info['schema'] in _SCHEMAS_SH :
-                info['shell_type'] = "sh"
-                info['copy_mode']  = "sh"
-                info['share_mode'] = "auto"
-                info['sh_env']     = "/usr/bin/env TERM=vt100 PROMPT_COMMAND='' PS1='PROMPT-$?->'"
-                info['cp_env']     = "/usr/bin/env TERM=vt100 PROMPT_COMMAND='' PS1='PROMPT-$?->'"
-                info['scp_root']   = "/"
-
-                if interactive: info['sh_args'] = "-i"
-                else          : info['sh_args'] = ""
-
-                if  "SHELL" in os.environ :
-                    info['sh_exe'] =  self._which (os.environ["SHELL"])
-                    info['cp_exe'] =  self._which ("cp")
-                else :
-                    info['sh_exe'] =  self._which ("sh")
-                    info['cp_exe'] =  self._which ("cp")
+        try :
+            info['latency'] = sumisc.get_host_latency (url)
 
+            # FIXME: note that get_host_latency is considered broken (see
+            # saga/utils/misc.py line 73), and will return a constant 250ms.
+
+        except Exception as e :
+            info['latency'] = 1.0  # generic value assuming slow link
+            info['logger'].warning("Could not contact host '%s': %s"
+                                  % (url, e))
+
+        if  info['shell_type'] == "sh" :
+
+            info['sh_env'] = "/usr/bin/env TERM=vt100 "  # avoid ansi escapes
+
+          # if not sumisc.host_is_local (url.host) :
+          #     raise rse.BadParameter._log (self.logger,
+          #             "expect local host for '%s://', not '%s'"
+          #             % (url.schema, url.host))
+
+            if  'user' in info and info['user'] :
+                pass
             else :
-                raise rse.BadParameter._log (self.logger,
-                          "cannot handle schema '%s://'" % url.schema)
+                info['user'] = getpass.getuser ()
 
+        else :
+            # avoid ansi escapes
+            info['ssh_env']   = "/usr/bin/env TERM=vt100 "
+            info['scp_env']   = "/usr/bin/env TERM=vt100 "
+            info['sftp_env']  = "/usr/bin/env TERM=vt100 "
+            info['ssh_args']  = "-t "  # force pty
+            info['scp_args']  = _SCP_FLAGS
+            info['sftp_args'] = _SFTP_FLAGS
 
-            # If an SSH timeout has been specified set up the ConnectTimeout
-            # string
-            if info['ssh_timeout']:
-                info['ssh_connect_timeout'] = ('-o ConnectTimeout=%s'
-                    % int(float(info['ssh_timeout'])))
-            else:
-                info['ssh_connect_timeout'] = ''
+            if  session :
 
-            # depending on type, create command line (args, env etc)
-            #
-            # We always set term=vt100 to avoid ansi-escape sequences in the
-            # prompt and elsewhere.  Also, we have to make sure that the shell
-            # is an interactive login shell, so that it interprets the users
-            # startup files, and reacts on commands.
+                for context in session.contexts :
 
-            try :
-                info['latency'] = sumisc.get_host_latency (url)
+                    # ssh can also handle UserPass contexts, and ssh type
+                    # contexts.  gsissh can handle the same, but also X509
+                    # contexts.
 
-                # FIXME: note that get_host_latency is considered broken (see
-                # saga/utils/misc.py line 73), and will return a constant 250ms.
+                    if  context.type.lower () == "ssh" :
+                        if  info['schema'] in _SCHEMAS_SSH + _SCHEMAS_GSI :
 
-            except Exception as e :
-                info['latency'] = 1.0  # generic value assuming slow link
-                info['logger'].warning("Could not contact host '%s': %s"
-                                      % (url, e))
+                            if  context.attribute_exists ("user_id") and \
+                                context.user_id :
+                                info['user']  = context.user_id
+
+                            if  context.attribute_exists ("user_key") and \
+                                context.user_key  :
+                                info['ssh_args']  += "-o IdentityFile=%s " % context.user_key
+                                info['scp_args']  += "-o IdentityFile=%s " % context.user_key
+                                info['sftp_args'] += "-o IdentityFile=%s " % context.user_key
+
+                                if  context.attribute_exists("user_pass") \
+                                    and context.user_pass:
+                                    info['key_pass'][context.user_key] = context.user_pass
 
-            if  info['shell_type'] == "sh" :
+                    if  context.type.lower () == "userpass" :
+                        if  info['schema'] in _SCHEMAS_SSH + _SCHEMAS_GSI :
+                            if  context.attribute_exists ("user_id") and \
+                                context.user_id :
+                                info['user'] = context.user_id
+                            if  context.attribute_exists ("user_pass") and \
+                                context.user_pass :
+                                info['pass'] = context.user_pass
 
-                info['sh_env'] = "/usr/bin/env TERM=vt100 "  # avoid ansi escapes
+                    if  context.type.lower () == "x509" :
+                        if  info['schema'] in _SCHEMAS_GSI :
 
-              # if not sumisc.host_is_local (url.host) :
-              #     raise rse.BadParameter._log (self.logger,
-              #             "expect local host for '%s://', not '%s'"
-              #             % (url.schema, url.host))
+                            if  context.attribute_exists ("user_proxy")  and   context.user_proxy :
+                                info['ssh_env']   += "X509_USER_PROXY='%s' " % context.user_proxy
+                                info['scp_env']   += "X509_USER_PROXY='%s' " % context.user_proxy
+                                info['sftp_env']  += "X509_USER_PROXY='%s' " % context.user_proxy
 
-                if  'user' in info and info['user'] :
-                    pass
-                else :
-                    info['user'] = getpass.getuser ()
+                            if  context.attribute_exists ("user_cert")   and  context.user_cert :
+                                info['ssh_env']   += "X509_USER_CERT='%s' " % context.user_cert
+                                info['scp_env']   += "X509_USER_CERT='%s' " % context.user_cert
+                                info['sftp_env']  += "X509_USER_CERT='%s' " % context.user_cert
 
+                            if  context.attribute_exists ("user_key")    and  context.user_key :
+                                info['ssh_env']   += "X509_USER_key='%s' "  % context.user_key
+                                info['scp_env']   += "X509_USER_key='%s' "  % context.user_key
+                                info['sftp_env']  += "X509_USER_key='%s' "  % context.user_key
+
+                            if  context.attribute_exists ("cert_repository") and context.cert_repository :
+                                info['ssh_env']   += "X509_CERT_DIR='%s' "  % context.cert_repository
+                                info['scp_env']   += "X509_CERT_DIR='%s' "  % context.cert_repository
+                                info['sftp_env']  += "X509_CERT_DIR='%s' "  % context.cert_repository
+
+            if url.port and url.port != -1 :
+                info['ssh_args']  += "-o Port=%d " % int(url.port)
+                info['scp_args']  += "-o Port=%d " % int(url.port)
+                info['sftp_args'] += "-o Port=%d " % int(url.port)
+
+
+            # all ssh based shells allow for user_id and user_pass from
+            # contexts -- but the data given in the URL take precedence
+
+            if url.username   :  info['user'] = url.username
+            if url.password   :  info['pass'] = url.password
+
+            ctrl_user = pwd.getpwuid (os.getuid ()).pw_name
+            ctrl_base = "/tmp/saga_ssh_%s" % ctrl_user
+
+
+            if  'user' in info and info['user'] :
+                info['host_str'] = "%s@%s"              % (info['user'], info['host_str'])
+                info['ctrl']     = "%s_%%h_%%p.%s.ctrl" % (ctrl_base, info['user'])
             else :
-                # avoid ansi escapes
-                info['ssh_env']   = "/usr/bin/env TERM=vt100 "
-                info['scp_env']   = "/usr/bin/env TERM=vt100 "
-                info['sftp_env']  = "/usr/bin/env TERM=vt100 "
-                info['ssh_args']  = "-t "  # force pty
-                info['scp_args']  = _SCP_FLAGS
-                info['sftp_args'] = _SFTP_FLAGS
-
-                if  session :
-
-                    for context in session.contexts :
-
-                        # ssh can also handle UserPass contexts, and ssh type
-                        # contexts.  gsissh can handle the same, but also X509
-                        # contexts.
-
-                        if  context.type.lower () == "ssh" :
-                            if  info['schema'] in _SCHEMAS_SSH + _SCHEMAS_GSI :
-
-                                if  context.attribute_exists ("user_id") and \
-                                    context.user_id :
-                                    info['user']  = context.user_id
-
-                                if  context.attribute_exists ("user_key") and \
-                                    context.user_key  :
-                                    info['ssh_args']  += "-o IdentityFile=%s " % context.user_key
-                                    info['scp_args']  += "-o IdentityFile=%s " % context.user_key
-                                    info['sftp_args'] += "-o IdentityFile=%s " % context.user_key
-
-                                    if  context.attribute_exists("user_pass") \
-                                        and context.user_pass:
-                                        info['key_pass'][context.user_key] = context.user_pass
-
-                        if  context.type.lower () == "userpass" :
-                            if  info['schema'] in _SCHEMAS_SSH + _SCHEMAS_GSI :
-                                if  context.attribute_exists ("user_id") and \
-                                    context.user_id :
-                                    info['user'] = context.user_id
-                                if  context.attribute_exists ("user_pass") and \
-                                    context.user_pass :
-                                    info['pass'] = context.user_pass
-
-                        if  context.type.lower () == "x509" :
-                            if  info['schema'] in _SCHEMAS_GSI :
-
-                                if  context.attribute_exists ("user_proxy")  and   context.user_proxy :
-                                    info['ssh_env']   += "X509_USER_PROXY='%s' " % context.user_proxy
-                                    info['scp_env']   += "X509_USER_PROXY='%s' " % context.user_proxy
-                                    info['sftp_env']  += "X509_USER_PROXY='%s' " % context.user_proxy
-
-                                if  context.attribute_exists ("user_cert")   and  context.user_cert :
-                                    info['ssh_env']   += "X509_USER_CERT='%s' " % context.user_cert
-                                    info['scp_env']   += "X509_USER_CERT='%s' " % context.user_cert
-                                    info['sftp_env']  += "X509_USER_CERT='%s' " % context.user_cert
-
-                                if  context.attribute_exists ("user_key")    and  context.user_key :
-                                    info['ssh_env']   += "X509_USER_key='%s' "  % context.user_key
-                                    info['scp_env']   += "X509_USER_key='%s' "  % context.user_key
-                                    info['sftp_env']  += "X509_USER_key='%s' "  % context.user_key
-
-                                if  context.attribute_exists ("cert_repository") and context.cert_repository :
-                                    info['ssh_env']   += "X509_CERT_DIR='%s' "  % context.cert_repository
-                                    info['scp_env']   += "X509_CERT_DIR='%s' "  % context.cert_repository
-                                    info['sftp_env']  += "X509_CERT_DIR='%s' "  % context.cert_repository
-
-                if url.port and url.port != -1 :
-                    info['ssh_args']  += "-o Port=%d " % int(url.port)
-                    info['scp_args']  += "-o Port=%d " % int(url.port)
-                    info['sftp_args'] += "-o Port=%d " % int(url.port)
-
-
-                # all ssh based shells allow for user_id and user_pass from
-                # contexts -- but the data given in the URL take precedence
-
-                if url.username   :  info['user'] = url.username
-                if url.password   :  info['pass'] = url.password
-
-                ctrl_user = pwd.getpwuid (os.getuid ()).pw_name
-                ctrl_base = "/tmp/saga_ssh_%s" % ctrl_user
-
-
-                if  'user' in info and info['user'] :
-                    info['host_str'] = "%s@%s"              % (info['user'], info['host_str'])
-                    info['ctrl']     = "%s_%%h_%%p.%s.ctrl" % (ctrl_base, info['user'])
-                else :
-                    info['user'] = getpass.getuser ()
-                    info['ctrl'] = "%s_%%h_%%p.ctrl" % (ctrl_base)
-
-                info['m_flags']  = _SSH_FLAGS_MASTER % ({'share_mode' : info['share_mode'],
-                                                         'ctrl'       : info['ctrl'],
-                                                         'connect_timeout': info['ssh_connect_timeout']})
-                info['s_flags']  = _SSH_FLAGS_SLAVE  % ({'share_mode' : info['share_mode'],
-                                                         'ctrl'       : info['ctrl'],
-                                                         'connect_timeout': info['ssh_connect_timeout']})
-
-                logger.debug('SSH Connection M_FLAGS: %s' % info['m_flags'])
-                logger.debug('SSH Connection S_FLAGS: %s' % info['s_flags'])
-
-                # we want the userauth and hostname parts of the URL, to get the
-                # scp-scope fs root.
-                info['scp_root']  = ""
-                has_auth          = False
-                if  url.username :
-                    info['scp_root'] += url.username
-                    has_auth          = True
-                if  url.password :
-                    info['scp_root'] += ":"
-                    info['scp_root'] += url.password
-                    has_auth          = True
-                if  has_auth :
-                    info['scp_root'] += "@"
-                info['scp_root']     += "%s:" % url.host
-
-                # FIXME: port needs to be handled as parameter
-              # if  url.port :
-              #     info['scp_root'] += ":%d" % url.port
-
-
-            # keep all collected info in the master dict, and return it for
-            # registration
-            return info
+                info['user'] = getpass.getuser ()
+                info['ctrl'] = "%s_%%h_%%p.ctrl" % (ctrl_base)
+
+            info['m_flags']  = _SSH_FLAGS_MASTER % ({'share_mode' : info['share_mode'],
+                                                     'ctrl'       : info['ctrl'],
+                                                     'connect_timeout': info['ssh_connect_timeout']})
+            info['s_flags']  = _SSH_FLAGS_SLAVE  % ({'share_mode' : info['share_mode'],
+                                                     'ctrl'       : info['ctrl'],
+                                                     'connect_timeout': info['ssh_connect_timeout']})
+
+            logger.debug('SSH Connection M_FLAGS: %s' % info['m_flags'])
+            logger.debug('SSH Connection S_FLAGS: %s' % info['s_flags'])
+
+            # we want the userauth and hostname parts of the URL, to get the
+            # scp-scope fs root.
+            info['scp_root']  = ""
+            has_auth          = False
+            if  url.username :
+                info['scp_root'] += url.username
+                has_auth          = True
+            if  url.password :
+                info['scp_root'] += ":"
+                info['scp_root'] += url.password
+                has_auth          = True
+            if  has_auth :
+                info['scp_root'] += "@"
+            info['scp_root']     += "%s:" % url.host
+
+            # FIXME: port needs to be handled as parameter
+          # if  url.port :
+          #     info['scp_root'] += ":%d" % url.port
+
+
+        # keep all collected info in the master dict, and return it for
+        # registration
+        return info
 
 
 # ------------------------------------------------------------------------------
@@ -0,0 +1,368 @@
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+import time
+import contextlib
+import collections
+
+import threading as mt
+
+import radical.utils as ru
+
+from .. import exceptions as rse
+
+
+# ------------------------------------------------------------------------------
+#
+class PTYShellPool (object) :
+    """
+    A bounded pool of shell channels to one resource.
+
+    Code which would otherwise funnel all operations through a single
+    :class:`PTYShell` (and a lock around it) can instead lease a channel per
+    operation::
+
+        pool = PTYShellPool (creator=lambda : PTYShell (url, session))
+
+        with pool.lease () as shell :
+            ret, out, _ = shell.run_sync (' date')
+
+    Channels are created on demand by calling `creator()`, up to `size`
+    channels.  If all channels are in use, `lease()` blocks until one gets
+    released -- waiting leases are served in FIFO order, so that no thread can
+    starve.  If no channel becomes available within `wait` seconds,
+    a `saga.Timeout` is raised.  Channels which were idle for more than `ttl`
+    seconds, or which died, are removed from the pool and passed to
+    `closer(shell)` (if given).
+
+    `size`, `ttl` and `wait` default to the `connection_pool_size`,
+    `connection_pool_ttl` and `connection_pool_wait` settings in the `pty`
+    section of the session config.  Statistics on pool usage and lease wait
+    times are available via :func:`get_stats`.
+    """
+
+    # --------------------------------------------------------------------------
+    #
+    def __init__ (self, creator, closer=None, size=None, ttl=None, wait=None,
+                  logger=None) :
+
+        cfg = ru.Config ('radical.saga.session').pty
+
+        if  size is None : size = cfg.get ('connection_pool_size', 10)
+        if  ttl  is None : ttl  = cfg.get ('connection_pool_ttl',  600)
+        if  wait is None : wait = cfg.get ('connection_pool_wait', 600)
+
+        self._creator = creator
+        self._closer  = closer
+        self._size    = int(size)
+        self._ttl     = float(ttl)
+        self._wait    = float(wait)
+        self._log     = logger or ru.Logger ('radical.saga.pty')
+
+        if  self._size < 1 :
+            raise rse.BadParameter ("pool size must be positive (%s)" % size)
+
+        self._lock    = mt.Lock ()
+        self._idle    = collections.deque ()  # [shell, released], oldest first
+        self._queue   = collections.deque ()  # waiting leases, in FIFO order
+        self._count   = 0                     # number of channels (or slots)
+        self._closed  = False
+
+        self._stats   = {'leases'    : 0,     # number of leases handed out
+                         'waits'     : 0,     # number of leases which waited
+                         'wait_time' : 0.0,   # accumulated lease wait time
+                         'wait_max'  : 0.0,   # longest lease wait time
+                         'timeouts'  : 0,     # number of failed leases
+                         'created'   : 0,     # number of created channels
+                         'evicted'   : 0}     # number of closed channels
+
+
+    # --------------------------------------------------------------------------
+    #
+    @contextlib.contextmanager
+    def lease (self, create=True) :
+        """
+        Context manager which leases a channel for the duration of the context
+        (see :func:`acquire`).
+        """
+
+        shell = self.acquire (create)
+        try :
+            yield shell
+
+        finally :
+            if  shell :
+                self.release (shell)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def acquire (self, create=True) :
+        """
+        Lease a channel.  The channel must be returned via :func:`release`.
+
+        If `create` is `False`, only an idle channel is returned, and `None` if
+        there is none -- the call will then neither wait nor create a channel.
+        """
+
+        start  = time.time ()
+        waiter = None
+        shell  = None
+
+        with self._lock :
+
+            if  self._closed :
+                raise rse.IncorrectState ("shell pool is closed")
+
+            evicted = self._evict ()
+
+            # only use free channels or slots if nobody else is waiting for them
+            if  not self._queue :
+
+                if  self._idle :
+                    shell = self._idle.pop ()[0]
+
+                elif not create :
+                    pass
+
+                elif self._count < self._size :
+                    self._count += 1
+
+                else :
+                    waiter = {'event' : mt.Event (),
+                              'shell' : None}
+                    self._queue.append (waiter)
+
+            elif create :
+                waiter = {'event' : mt.Event (),
+                          'shell' : None}
+                self._queue.append (waiter)
+
+        self._close (evicted)
+
+        if  not create and not shell :
+            return None
+
+        if  waiter :
+
+            if  not waiter['event'].wait (self._wait) :
+
+                with self._lock :
+
+                    # make sure we did not get served in the meantime
+                    if  not waiter['event'].is_set () :
+                        self._queue.remove (waiter)
+                        self._stats['timeouts'] += 1
+                        raise rse.Timeout ("no shell available after %.1fs"
+                                          % self._wait)
+
+            # we either got a channel, or a free slot to create one -- unless
+            # the pool got closed
+            shell = waiter['shell']
+
+            if  not shell and self._closed :
+                raise rse.IncorrectState ("shell pool is closed")
+
+        if  not shell :
+            shell = self._create ()
+
+        waited = time.time () - start
+
+        with self._lock :
+
+            self._stats['leases'] += 1
+
+            if  waiter :
+                self._stats['waits']     += 1
+                self._stats['wait_time'] += waited
+                self._stats['wait_max']   = max (self._stats['wait_max'], waited)
+
+        return shell
+
+
+    # --------------------------------------------------------------------------
+    #
+    def release (self, shell) :
+        """
+        Return a leased channel to the pool.  Channels which died are closed,
+        and their slot is passed on.
+        """
+
+        evicted = list()
+
+        with self._lock :
+
+            if  self._closed or not shell.alive () :
+
+                self._count -= 1
+                self._stats['evicted'] += 1
+                evicted.append (shell)
+
+                # a waiting lease can use the free slot
+                self._serve (None)
+
+            elif self._queue :
+                self._serve (shell)
+
+            else :
+                self._idle.append ([shell, time.time ()])
+
+            evicted += self._evict ()
+
+        self._close (evicted)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def add (self, shell) :
+        """
+        Add an existing channel to the pool.  The pool takes ownership, i.e. it
+        will close the channel eventually.
+        """
+
+        with self._lock :
+
+            if  self._closed or self._count >= self._size :
+                raise rse.IncorrectState ("cannot add shell to pool")
+
+            self._count += 1
+
+            if  self._queue : self._serve (shell)
+            else            : self._idle.append ([shell, time.time ()])
+
+
+    # --------------------------------------------------------------------------
+    #
+    def close (self) :
+        """
+        Close all idle channels.  Leased channels are closed on release.
+        """
+
+        with self._lock :
+
+            self._closed = True
+            evicted      = [shell for shell, _ in self._idle]
+
+            self._count -= len(self._idle)
+            self._stats['evicted'] += len(self._idle)
+            self._idle.clear ()
+
+            while self._queue :
+                self._queue.popleft ()['event'].set ()
+
+        self._close (evicted)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def get_stats (self) :
+        """
+        Return a dict with the current pool state and with lease statistics
+        (number of leases, waits, timeouts, accumulated and maximum wait time,
+        number of created and evicted channels).
+        """
+
+        with self._lock :
+
+            ret = dict(self._stats)
+            ret['size']   = self._size
+            ret['active'] = self._count - len(self._idle)
+            ret['idle']   = len(self._idle)
+            ret['queued'] = len(self._queue)
+
+            return ret
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _create (self) :
+        """
+        Create a new channel for a slot which is already accounted for.
+        """
+
+        try :
+            shell = self._creator ()
+
+        except Exception :
+
+            with self._lock :
+
+                # free the slot -- a waiting lease will try again
+                self._count -= 1
+                self._serve (None)
+
+            raise
+
+        with self._lock :
+            self._stats['created'] += 1
+
+        return shell
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _serve (self, shell) :
+        """
+        Pass a channel (or, if `shell` is `None`, a free slot) on to the next
+        waiting lease.  Must be called under `self._lock`.
+        """
+
+        if  not self._queue :
+            return
+
+        if  shell is None :
+            self._count += 1
+
+        waiter = self._queue.popleft ()
+        waiter['shell'] = shell
+        waiter['event'].set ()
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _evict (self) :
+        """
+        Remove channels from the pool which were idle for more than `ttl`
+        seconds.  Returns those channels, which should then be passed to
+        `self._close()` outside of `self._lock`.
+        """
+
+        evicted = list()
+        now     = time.time ()
+
+        while self._idle and now - self._idle[0][1] > self._ttl :
+
+            evicted.append (self._idle.popleft ()[0])
+            self._count -= 1
+            self._stats['evicted'] += 1
+
+        # freed slots can be used by waiting leases
+        for _ in evicted :
+            self._serve (None)
+
+        return evicted
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _close (self, shells) :
+
+        for shell in shells :
+
+            self._log.debug ("close pooled shell %s" % shell)
+
+            if  not self._closer :
+                continue
+
+            try :
+                self._closer (shell)
+
+            except Exception as e :
+                self._log.warning ("could not close pooled shell: %s" % e)
+
+
+# ------------------------------------------------------------------------------
+
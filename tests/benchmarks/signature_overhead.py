@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+'''
+Measure the call stack overhead of the signature checks
+(`radical.utils.signatures`) on some API hot paths, by running the same load
+with `RADICAL_SAGA_CHECK_SIGNATURES=1` and `RADICAL_SAGA_CHECK_SIGNATURES=0`:
+
+    python signature_overhead.py [iterations]
+
+The checks are off by default.  If the installed radical.utils cannot enable
+them, the `on` run falls back to unchecked calls, which is shown in the last
+column.
+'''
+
+import os
+import sys
+import time
+import subprocess
+
+
+# ------------------------------------------------------------------------------
+#
+def load(n):
+
+    import radical.saga            as rs
+    import radical.utils.signatures as rus
+
+    start = time.time()
+    for i in range(n):
+        jd = rs.job.Description()
+        jd.executable = '/bin/sleep'
+        jd.arguments  = [str(i)]
+        jd.environment = {'ITER': str(i)}
+        _ = jd.executable
+    t_jd = time.time() - start
+
+    start = time.time()
+    for i in range(n):
+        u = rs.Url('ssh://user@host.net:22/tmp/data.%d' % i)
+        _ = u.host
+        _ = u.path
+    t_url = time.time() - start
+
+    print('%8.3fs  %8.3fs  %s' % (t_jd, t_url,
+                                  'unchecked' if rus.no_check else 'checked'))
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    if 'RADICAL_SAGA_BENCH_LOAD' in os.environ:
+        load(n)
+        sys.exit(0)
+
+    print('iterations: %d' % n)
+    print('checks      descr        url  mode')
+    for check in ['1', '0']:
+        env = dict(os.environ)
+        env['RADICAL_SAGA_BENCH_LOAD']       = '1'
+        env['RADICAL_SAGA_CHECK_SIGNATURES'] = check
+        sys.stdout.write('%-8s' % {'1': 'on', '0': 'off'}[check])
+        sys.stdout.flush()
+        subprocess.check_call([sys.executable, __file__, str(n)], env=env,
+                              stderr=subprocess.DEVNULL)
+
+
+# ------------------------------------------------------------------------------
+
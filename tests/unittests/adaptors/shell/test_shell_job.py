@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+__author__    = "Andre Merzky"
+__copyright__ = "Copyright 2013, The SAGA Project"
+__license__   = "MIT"
+
+
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+
+import radical.saga.adaptors.shell.shell_job     as sj
+import radical.saga.adaptors.shell.shell_wrapper as sw
+
+
+# ------------------------------------------------------------------------------
+#
+class _Shell (object) :
+    """ a channel which returns a canned reply to `run_sync` """
+
+    def __init__ (self, out) :
+        self.out  = out
+        self.cmds = list()
+
+    def __enter__ (self)        : return self
+    def __exit__  (self, *args) : pass
+
+    def lease (self) :
+        return self
+
+    def run_sync (self, cmd) :
+        self.cmds.append (cmd)
+        return 0, self.out, ''
+
+
+class _Service (object) :
+    """ just enough of a ShellJobService to call its wrapper query methods """
+
+    def __init__ (self, out) :
+        self.channels = _Shell (out)
+        self._adaptor = sj.Adaptor ()
+
+
+# ------------------------------------------------------------------------------
+#
+def _wrapper (base, cmds) :
+    """ run the wrapper script on `base` with the given commands, return the
+        reply lines (after 'OK') of each command """
+
+    script = os.path.join (base, 'wrapper.sh')
+    with open (script, 'w') as fout :
+        fout.write (sw._WRAPPER_SCRIPT.replace ('%(PURGE_ON_START)s', 'False'))
+
+    # background job monitors inherit the fds -- use files, not pipes
+    with tempfile.TemporaryFile ('w+') as fin, \
+         tempfile.TemporaryFile ('w+') as fout :
+
+        fin.write ('\n'.join (cmds + ['QUIT']) + '\n')
+        fin.seek  (0)
+        subprocess.call (['/bin/sh', script, base], stdin=fin, stdout=fout,
+                         stderr=subprocess.STDOUT, timeout=60)
+        fout.seek (0)
+        out = fout.read ()
+
+    ret = list()
+    for reply in out.split ('PROMPT-0->\n')[1:-1] :
+        lines = [_f for _f in reply.split ('\n') if _f]
+        assert ('OK' in lines), reply
+        ret.append (lines[lines.index ('OK') + 1:])
+
+    return ret
+
+
+def _wait_final (base, pids) :
+
+    for _ in range (100) :
+        states = [open ('%s/%s/state' % (base, pid)).read ().split ()[-1]
+                  for pid in pids]
+        if not [s for s in states if s not in ['DONE', 'FAILED']] :
+            return
+        time.sleep (0.1)
+
+    assert False, 'jobs did not finish'
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_wrapper_states () :
+    """ Test the wrapper's job state index (STATES, since-marks, PURGE) """
+
+    base = tempfile.mkdtemp ()
+
+    try :
+        # two jobs, run to completion
+        ret  = _wrapper (base, ['RUN sleep 1', 'RUN sleep 1; false',
+                               'STATES -s'])
+        pids = [ret[0][0], ret[1][0]]
+        mark = ret[2][0]
+
+        _wait_final (base, pids)
+
+        # only the changes since the mark are reported
+        ret   = _wrapper (base, ['STATES -s %s' % mark, 'STATES -s'])
+        delta = ret[0][1:]
+        full  = ret[1][1:]
+        mark  = ret[0][0]
+
+        assert ('%s:DONE'   % pids[0] in delta)
+        assert ('%s:FAILED' % pids[1] in delta)
+        assert ('%s:DONE'   % pids[0] in full)
+
+        ret = _wrapper (base, ['STATES -s %s' % mark, 'STATES %s x' % pids[0],
+                               'STATUS %s' % pids[1], 'LIST'])
+
+        assert (ret[0] == [mark])
+        assert (ret[1] == ['%s:DONE' % pids[0], 'x:UNKNOWN'])
+        assert (ret[2][0].startswith ('%s:FAILED:1:' % pids[1]))
+        assert (sorted (ret[3]) == sorted (pids))
+
+        # nothing to purge: the index is not compacted, the mark stays valid
+        gen = open ('%s/index.gen' % base).read ()
+        ret = _wrapper (base, ['PURGE', 'STATES -s %s' % mark])
+
+        assert (open ('%s/index.gen' % base).read () == gen)
+        assert (ret[1] == [mark])
+
+        # purge an old job: it is removed from the compacted index
+        old = time.time () - 3 * 24 * 3600
+        for fname in os.listdir ('%s/%s' % (base, pids[0])) :
+            os.utime ('%s/%s/%s' % (base, pids[0], fname), (old, old))
+
+        ret = _wrapper (base, ['PURGE', 'STATES -s %s' % mark, 'LIST'])
+
+        assert (not os.path.exists ('%s/%s' % (base, pids[0])))
+        assert (open ('%s/index.gen' % base).read () != gen)
+        assert (open ('%s/index.base' % base).read ()
+                == '%s:FAILED\n' % pids[1])
+        assert (ret[1][1:] == ['%s:FAILED' % pids[1]])
+        assert (ret[2] == [pids[1]])
+
+        # a compaction left unfinished by a dead process is redone
+        dead = subprocess.Popen (['true'])
+        dead.wait ()
+
+        os.mkdir ('%s/index.lock' % base)
+        with open ('%s/index.lock/owner' % base, 'w') as fout :
+            fout.write ('%d %s\n' % (dead.pid, os.uname ()[1]))
+        with open ('%s/index.gen' % base, 'w') as fout :
+            fout.write ('5\n')
+        with open ('%s/index.tmp' % base, 'w') as fout :
+            fout.write ('%s:FAILED\n' % pids[1])
+
+        start = time.time ()
+        ret   = _wrapper (base, ['LIST', 'STATES -s 5.0'])
+
+        assert (time.time () - start < 5)
+        assert (ret[0] == [pids[1]])
+        assert (ret[1] == ['6.0', '%s:FAILED' % pids[1]])
+        assert (not os.path.exists ('%s/index.lock' % base))
+
+    finally :
+        shutil.rmtree (base)
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_shell_job_wrapper_states ()
+
+
+# ------------------------------------------------------------------------------
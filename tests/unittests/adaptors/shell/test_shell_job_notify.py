@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+__author__    = "Andre Merzky"
+__copyright__ = "Copyright 2013, The SAGA Project"
+__license__   = "MIT"
+
+
+import time
+import threading as mt
+
+import radical.saga                         as rs
+import radical.saga.adaptors.shell.shell_job as sj
+
+
+# ------------------------------------------------------------------------------
+#
+class _API (object) :
+    """ just enough of a saga.job.Job to report state changes to """
+
+    _UP = True
+
+    def __init__ (self) :
+        self.states = list()
+
+    def _attributes_i_set (self, key, val, flow) :
+        self.states.append (val)
+
+
+class _Monitor (object) :
+
+    def is_alive (self) :
+        return True
+
+
+class _JobService (object) :
+    """ a job service which records all calls to the wrapper """
+
+    def __init__ (self, state, notifications=True) :
+
+        self.notifications = notifications
+        self.state_ttl     = 30.0
+        self.monitor       = _Monitor ()
+        self.jobs          = dict()
+        self.state         = state
+        self.calls         = list()
+
+    def _job_get_status (self, id) :
+        self.calls.append ('STATUS %s' % id)
+        return {'pid': id, 'state': self.state}
+
+    def _job_get_output (self, id, stream, offset=0, length=None) :
+        self.calls.append ('OUTPUT %s %s' % (id, stream))
+        return b'oops\n'
+
+
+def _job (js) :
+
+    api = _API ()
+    job = sj.ShellJob (api, sj.Adaptor ())
+    job.init_instance ({'job_id'     : '[fork://localhost]-[1.0]',
+                        'job_service': js})
+    js.jobs[job._id] = job
+
+    # the api object is only weakly referenced by the job
+    return api, job
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_notify_get_state () :
+    """ Test that get_state() is served from the monitor's states """
+
+    js       = _JobService ('RUNNING')
+    api, job = _job (js)
+
+    # the first call polls the wrapper, the monitor keeps the state then
+    assert (job.get_state () == rs.job.RUNNING)
+    assert (len (js.calls) == 1)
+
+    for _ in range (1000) :
+        assert (job.get_state () == rs.job.RUNNING)
+    assert (len (js.calls) == 1)
+
+    # no calls on (non-final) state changes reported by the monitor
+    job._set_state (rs.job.SUSPENDED)
+    assert (job.get_state () == rs.job.SUSPENDED)
+    assert (len (js.calls) == 1)
+
+    # outdated states are polled again
+    job._state_time -= js.state_ttl
+    assert (job.get_state () == rs.job.RUNNING)
+    assert (len (js.calls) == 2)
+
+    # final states are polled once (for stats and stderr), then cached
+    js.state = 'FAILED'
+    job._set_state (rs.job.FAILED)
+    assert (job.get_state () == rs.job.FAILED)
+    assert (js.calls[2:] == ['STATUS %s'     % job._id,
+                             'OUTPUT %s err' % job._id])
+
+    for _ in range (1000) :
+        assert (job.get_state () == rs.job.FAILED)
+    assert (len (js.calls) == 4)
+
+    assert (api.states == [rs.job.RUNNING, rs.job.SUSPENDED,
+                           rs.job.RUNNING, rs.job.FAILED])
+
+    # without notifications, each call polls the wrapper
+    js       = _JobService ('RUNNING', notifications=False)
+    api, job = _job (js)
+
+    for _ in range (10) :
+        assert (job.get_state () == rs.job.RUNNING)
+    assert (len (js.calls) == 10)
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_notify_wait () :
+    """ Test that wait() blocks on the monitor's final state event """
+
+    js       = _JobService ('RUNNING')
+    api, job = _job (js)
+
+    assert (job.get_state () == rs.job.RUNNING)
+
+    # no calls while waiting for notifications
+    start = time.time ()
+    assert (not job.wait (0.5))
+    assert (time.time () - start >= 0.5)
+    assert (len (js.calls) == 1)
+
+    ret    = list()
+    waiter = mt.Thread (target=lambda : ret.append (job.wait (10.0)))
+    waiter.start ()
+
+    time.sleep (0.5)
+    assert (len (js.calls) == 1)
+
+    # wake up on the final state, which is polled once
+    js.state = 'FAILED'
+    start    = time.time ()
+    job._set_state (rs.job.FAILED)
+    waiter.join ()
+
+    assert (time.time () - start < 1.0)
+    assert (ret == [True])
+    assert (js.calls[1:] == ['STATUS %s'     % job._id,
+                             'OUTPUT %s err' % job._id])
+
+    # without notifications, the poll delay grows
+    js       = _JobService ('RUNNING', notifications=False)
+    api, job = _job (js)
+
+    assert (not job.wait (1.0))
+    assert (2 < len (js.calls) < 8), js.calls
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_shell_job_notify_get_state ()
+    test_shell_job_notify_wait ()
+
+
+# ------------------------------------------------------------------------------
+
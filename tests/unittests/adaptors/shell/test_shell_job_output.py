@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+__author__    = "Andre Merzky"
+__copyright__ = "Copyright 2013, The SAGA Project"
+__license__   = "MIT"
+
+
+import gzip
+import base64
+import shutil
+import tempfile
+
+import radical.saga                         as rs
+import radical.saga.adaptors.shell.shell_job as sj
+
+from .test_shell_job import _wrapper, _wait_final
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_decode () :
+    """ Test decoding of job output transferred by the wrapper """
+
+    data = b'out\x00put \xe2\x82\xac\n'
+
+    assert (sj._decode (data.hex ())                       == data)
+    assert (sj._decode (data.hex (), 'hex')                == data)
+    assert (sj._decode (base64.b64encode (data), 'base64') == data)
+    assert (sj._decode (base64.b64encode (gzip.compress (data)), 'gzip')
+            == data)
+    assert (sj._decode ('', 'gzip') == b'')
+
+    for enc, bad in [('hex',    'xyz'),
+                     ('base64', 'a'),
+                     ('gzip',   base64.b64encode (b'not gzipped'))] :
+        try :
+            sj._decode (bad, enc)
+            assert False, 'expected BadParameter for %s' % enc
+        except rs.BadParameter :
+            pass
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_wrapper_output () :
+    """ Test transfer of job output via the wrapper's OUTPUT command """
+
+    base = tempfile.mkdtemp ()
+
+    try :
+        pid = _wrapper (base, ['RUN echo hello world'])[0][0]
+        _wait_final (base, [pid])
+
+        ret = _wrapper (base, ['OUTPUT %s out gzip'       % pid,
+                               'OUTPUT %s out hex -6'     % pid,
+                               'OUTPUT %s out base64 2 3' % pid])
+
+        # the wrapper falls back to hex if it lacks gzip / base64
+        out = [sj._decode (''.join (r[1:]), r[0]) for r in ret]
+
+        assert (out == [b'hello world\n', b'world\n', b'llo'])
+
+    finally :
+        shutil.rmtree (base)
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_shell_job_decode ()
+    test_shell_job_wrapper_output ()
+
+
+# ------------------------------------------------------------------------------
+
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+__author__    = "Andre Merzky"
+__copyright__ = "Copyright 2013, The SAGA Project"
+__license__   = "MIT"
+
+
+import radical.saga                         as rs
+import radical.saga.adaptors.shell.shell_job as sj
+
+from .test_shell_job import _Service
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_get_states () :
+    """ Test parsing of STATES replies """
+
+    svc    = _Service ('OK\n1.0:DONE\n2.0:RUNNING\n3.0:UNKNOWN\n')
+    states = sj.ShellJobService._job_get_states (svc, ['1.0', '2.0', '3.0'])
+
+    assert (svc.channels.cmds == ['STATES 1.0 2.0 3.0\n'])
+    assert (states == {'1.0': 'DONE', '2.0': 'RUNNING', '3.0': 'UNKNOWN'})
+
+    # the first reply line of `STATES -s` is the new mark
+    svc    = _Service ('OK\n4.12\n1.0:FAILED\n')
+    states = sj.ShellJobService._job_get_states (svc, since=True)
+
+    assert (svc.channels.cmds == ['STATES -s \n'])
+    assert (states == {None: '4.12', '1.0': 'FAILED'})
+
+    svc    = _Service ('OK\n4.13\n')
+    states = sj.ShellJobService._job_get_states (svc, since='4.12')
+
+    assert (svc.channels.cmds == ['STATES -s 4.12\n'])
+    assert (states == {None: '4.13'})
+
+    for out in ['', 'ERROR\nno such job\n', 'OK\n'] :
+        try :
+            sj.ShellJobService._job_get_states (_Service (out), since=True)
+            assert False, 'expected NoSuccess for %s' % out
+        except rs.NoSuccess :
+            pass
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_container_get_states () :
+    """ Test that bulk state queries don't touch the job objects otherwise """
+
+    class _JobCPI (object) :
+        def __init__ (self) : self.states = list()
+        def _poll_update (self, state) : self.states.append (state)
+
+    class _Job (object) :
+        def __init__ (self, pid) :
+            self.id       = '[fork://localhost]-[%s]' % pid
+            self._adaptor = _JobCPI ()
+
+        # the repr of api jobs queries their state
+        def __repr__ (self) :
+            assert False, 'job repr called'
+
+    svc = _Service ('OK\n1.0:DONE\n2.0:RUNNING\n')
+    svc._logger          = sj.Adaptor ()._logger
+    svc._job_get_states  = lambda pids : \
+                           sj.ShellJobService._job_get_states (svc, pids)
+
+    jobs   = [_Job ('1.0'), _Job ('2.0'), _Job ('3.0')]
+    states = sj.ShellJobService.container_get_states (svc, jobs)
+
+    assert (svc.channels.cmds == ['STATES 1.0 2.0 3.0\n'])
+    assert (states == [rs.job.DONE, rs.job.RUNNING, rs.job.UNKNOWN])
+    assert ([j._adaptor.states for j in jobs] ==
+            [[rs.job.DONE], [rs.job.RUNNING], [rs.job.UNKNOWN]])
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_shell_job_get_states ()
+    test_shell_job_container_get_states ()
+
+
+# ------------------------------------------------------------------------------
+
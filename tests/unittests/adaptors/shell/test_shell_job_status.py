@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+__author__    = "Andre Merzky"
+__copyright__ = "Copyright 2013, The SAGA Project"
+__license__   = "MIT"
+
+
+import radical.saga                         as rs
+import radical.saga.adaptors.shell.shell_job as sj
+
+from .test_shell_job import _Service
+
+
+# ------------------------------------------------------------------------------
+#
+def test_shell_job_get_status () :
+    """ Test parsing of STATUS replies """
+
+    svc  = _Service ('OK\n1.0:FAILED:3:1600000000:1600000002\n')
+    stat = sj.ShellJobService._job_get_status (svc, '[fork://localhost]-[1.0]')
+
+    assert (svc.channels.cmds == ['STATUS 1.0\n'])
+    assert (stat == {'pid'  : '1.0', 'state': 'FAILED', 'ecode': '3',
+                     'start': '1600000000', 'stop': '1600000002'})
+
+    # unknown values are not set
+    svc  = _Service ('OK\n1.0:RUNNING::1600000000:\n')
+    stat = sj.ShellJobService._job_get_status (svc, '[fork://localhost]-[1.0]')
+
+    assert (stat == {'pid': '1.0', 'state': 'RUNNING', 'start': '1600000000'})
+
+    try :
+        sj.ShellJobService._job_get_status (_Service ('OK\n1.0:DONE\n'),
+                                            '[fork://localhost]-[1.0]')
+        assert False, 'expected NoSuccess'
+    except rs.NoSuccess :
+        pass
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_shell_job_get_status ()
+
+
+# ------------------------------------------------------------------------------
+
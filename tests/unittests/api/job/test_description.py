@@ -57,6 +57,31 @@ def test_environment ():
         assert (False), "expected BadParameter exception, got %s" % se
 
 
+def test_shared_schema ():
+    """ Test that descriptions sharing a schema do not share state """
+
+    jd1 = rs.job.Description ()
+    jd2 = rs.job.Description ()
+
+    assert (jd1.list_attributes () == jd2.list_attributes ())
+
+    jd1.executable = '/bin/date'
+    jd1.system_architecture['arch'] = 'x86_64'
+    jd1.extended_key = 'ext'
+    assert (jd2.executable          is None)
+    assert (jd2.system_architecture == {})
+    assert (not jd2.attribute_exists ('extended_key'))
+    assert ('extended_key' in jd1.list_attributes ())
+
+    # enum checks still apply
+    jd1.spmd_variation = 'MPI'
+    try :
+        jd2.spmd_variation = 'Foo'
+        assert (False), "expected BadParameter exception, got none"
+    except rs.BadParameter :
+        pass
+
+
 # ------------------------------------------------------------------------------
 #
 if __name__ == '__main__':
@@ -65,6 +90,7 @@ if __name__ == '__main__':
     test_environment_list()
     test_environment_dict()
     test_environment()
+    test_shared_schema()
 
 
 # ------------------------------------------------------------------------------
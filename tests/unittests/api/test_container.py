@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+""" Unit tests for saga.task.Container
+"""
+
+import time
+
+import radical.saga as rs
+
+
+# ------------------------------------------------------------------------------
+#
+class _Adaptor(object):
+    """ tasks wrapping a call don't need any adaptor support """
+    _container = None
+
+
+def _sleep(t):
+    time.sleep(t)
+    return t
+
+
+def _container(*durations):
+
+    container = rs.task.Container()
+    for t in durations:
+        ctx = {'_call'  : _sleep,
+               '_args'  : (t,),
+               '_kwargs': {}}
+        container.add(rs.Task(_Adaptor(), 'sleep', ctx, rs.ASYNC))
+    return container
+
+
+# ------------------------------------------------------------------------------
+#
+def test_wait_any():
+    """ Test that wait(ANY) returns the first finished task right away
+    """
+    container = _container(1.0, 0.1, 2.0)
+
+    start = time.time()
+    task  = container.wait(rs.ANY)
+    assert time.time() - start < 0.9
+    assert task.state  == rs.DONE
+    assert task.result == 0.1
+
+
+def test_wait_all():
+    """ Test that wait(ALL) returns once all tasks are done
+    """
+    container = _container(0.1, 0.3, 0.2)
+
+    task = container.wait(rs.ALL)
+    assert task.result == 0.3
+    assert container.get_states() == [rs.DONE, rs.DONE, rs.DONE]
+
+
+def test_wait_timeout():
+    """ Test that the timeout applies to the wait as a whole
+    """
+    container = _container(0.5, 0.5, 0.5, 0.5)
+
+    start = time.time()
+    assert container.wait(rs.ALL, 0.2) is None
+    assert time.time() - start < 0.4
+
+    assert container.wait(rs.ALL, 10.0) is not None
+
+
+def test_wait_callbacks():
+    """ Test that waits don't leave state callbacks behind
+    """
+    container = _container(0.5)
+    task      = container.tasks[0]
+
+    for _ in range(10):
+        assert container.wait(rs.ALL, 0.01) is None
+
+    cbs = task._attributes_t_init('state')['attributes']['state']['callbacks']
+    assert not [cb for cb in cbs if cb], cbs
+
+    assert container.wait(rs.ALL, 10.0) is task
+
+
+def test_wait_driver():
+    """ Test that tasks without a future are waited for in bounded steps, and
+        only until the wait is over
+    """
+    waits = list()
+
+    class _Waiter(object):
+        _container = None
+
+        def task_run(self, task):
+            task._set_state(rs.RUNNING)
+
+        def task_wait(self, task, timeout):
+            waits.append(timeout)
+            time.sleep(timeout)
+
+    container = rs.task.Container()
+    container.add(rs.Task(_Waiter(), 'wait', dict(), rs.ASYNC))
+
+    start = time.time()
+    assert container.wait(rs.ALL, 0.5) is None
+    assert time.time() - start < 0.7
+
+    assert waits
+    assert all([0 <= t <= 1.0 for t in waits]), waits
+
+    time.sleep(0.3)
+    n_waits = len(waits)
+    time.sleep(0.3)
+    assert len(waits) == n_waits
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_wait_any()
+    test_wait_all()
+    test_wait_timeout()
+    test_wait_driver()
+
+
+# ------------------------------------------------------------------------------
+
@@ -56,5 +56,30 @@ def test_IncorrectURL():
         assert 'IncorrectURL' in e.get_message(), str(e)
         assert 'IncorrectURL' in str(e)         , str(e)
 
+def test_exception_stack():
+    e = se.NoSuccess('NoSuccess')
+    e._add_exception(se.BadParameter('BadParameter'))
+    try:
+        raise e._get_exception_stack()
+    except    se.BadParameter as e:
+        assert 'BadParameter' in e.get_message(), str(e)
+        assert len(e.get_all_messages()) == 2
+        assert 'NoSuccess' in e.get_all_messages()[1]
 
+def test_traceback():
+    def _raise():
+        raise se.IncorrectState('IncorrectState')
+    try:
+        _raise()
+    except    se.IncorrectState as e:
+        assert '_raise' in e.traceback, e.traceback
+        assert '_raise' in e.get_message(), str(e)
 
+    try:
+        try:
+            _raise()
+        except se.IncorrectState as e:
+            raise se.NoSuccess('NoSuccess', parent=e)
+    except    se.NoSuccess as e:
+        assert '_raise'         in e.traceback, e.traceback
+        assert 'IncorrectState' in e.get_message(), str(e)
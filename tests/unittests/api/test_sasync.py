@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+""" Unit tests for the asyncio interface in saga.sasync
+"""
+
+import time
+import asyncio
+
+import radical.saga        as rs
+import radical.saga.sasync as rsa
+
+
+# ------------------------------------------------------------------------------
+#
+class _Adaptor(object):
+    """ tasks wrapping a call don't need any adaptor support """
+    _container = None
+
+
+class _Worker(rsa.Async):
+
+    def double(self, x, ttype=None):
+
+        if ttype:
+            ctx = {'_call'  : self.double,
+                   '_args'  : (x,),
+                   '_kwargs': {}}
+            return rs.Task(_Adaptor(), 'double', ctx, ttype)
+
+        time.sleep(0.1)
+        if x < 0:
+            raise rs.BadParameter('negative')
+        return 2 * x
+
+    def _private(self, ttype=None):
+        pass
+
+
+# ------------------------------------------------------------------------------
+#
+def test_async_methods():
+    """ Test that methods with ttype get a coroutine version
+    """
+    assert     hasattr(_Worker, 'double_async')
+    assert not hasattr(_Worker, '_private_async')
+    assert     hasattr(rs.job.Service,        'create_job_async')
+    assert     hasattr(rs.job.Job,            'wait_async')
+    assert     hasattr(rs.filesystem.File,    'copy_async')
+
+
+def test_async_gather():
+    """ Test that coroutines run concurrently and return the call results
+    """
+    worker = _Worker()
+    loop   = asyncio.new_event_loop()
+
+    try:
+        async def _gather():
+            return await asyncio.gather(*[worker.double_async(i)
+                                          for i in range(20)])
+
+        start  = time.time()
+        result = loop.run_until_complete(_gather())
+
+        assert result == [2 * i for i in range(20)]
+        assert time.time() - start < 1.0
+
+    finally:
+        loop.close()
+
+
+def test_async_exception():
+    """ Test that coroutines raise the call's exception
+    """
+    worker = _Worker()
+    loop   = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(worker.double_async(-1))
+        assert False, 'expected BadParameter'
+
+    except rs.BadParameter:
+        pass
+
+    finally:
+        loop.close()
+
+
+def test_async_cancel():
+    """ Test that cancelled coroutines don't leave state callbacks behind
+    """
+    ctx  = {'_call'  : lambda t: time.sleep(t),
+            '_args'  : (0.5,),
+            '_kwargs': {}}
+    task = rs.Task(_Adaptor(), 'sleep', ctx, rs.TASK)
+    loop = asyncio.new_event_loop()
+
+    try:
+        for _ in range(5):
+            try:
+                loop.run_until_complete(
+                        asyncio.wait_for(rsa.wait_task(task), 0.01))
+                assert False, 'expected TimeoutError'
+            except asyncio.TimeoutError:
+                pass
+
+        cbs = task._attributes_t_init('state')['attributes']['state']\
+                  ['callbacks']
+        assert not [cb for cb in cbs if cb], cbs
+
+        loop.run_until_complete(rsa.wait_task(task))
+        assert task.state == rs.DONE
+
+    finally:
+        loop.close()
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_async_methods()
+    test_async_gather()
+    test_async_exception()
+    test_async_cancel()
+
+
+# ------------------------------------------------------------------------------
+
@@ -11,6 +11,9 @@ __license__   = "MIT"
 import os
 import sys
 import pprint
+import tempfile
+
+import radical.saga                as rs
 
 from   radical.saga.engine.engine import Engine
 
@@ -116,6 +119,189 @@ def test_load_broken_adaptor():
     sys.path = old_sys_path
 
 
+def test_lazy_load_adaptor():
+    """ Test that lazily loaded adaptors are instantiated on first use
+    """
+    # store old sys.path
+    old_sys_path = sys.path
+    path = os.path.split(os.path.abspath(__file__))[0]
+    sys.path.append(path)
+
+    Engine()._cfg['lazy_adaptors'] = True
+    try:
+        Engine()._load_adaptors(["mockadaptor_enabled"])
+        cpis  = Engine().loaded_adaptors()
+        mocks = cpis['radical.saga.job.Job']['mock']
+        assert len(mocks) == 1
+        assert mocks[0]['adaptor_instance'] is None
+
+        adaptor = Engine().get_adaptor('radical.saga.adaptors.mock')
+        assert adaptor is not None
+        assert mocks[0]['adaptor_instance'] is adaptor
+
+    finally:
+        Engine()._cfg['lazy_adaptors'] = False
+
+    # restore sys.path
+    sys.path = old_sys_path
+
+
+def test_registry_snapshot():
+    """ Test that the adaptor registry can be stored and restored
+    """
+    # store old sys.path
+    old_sys_path = sys.path
+    path = os.path.split(os.path.abspath(__file__))[0]
+    sys.path.append(path)
+
+    tmpdir = tempfile.mkdtemp()
+    Engine()._cfg['registry_snapshot'] = '%s/registry.json' % tmpdir
+    try:
+        Engine()._load_adaptors(["mockadaptor_enabled"])
+        Engine()._save_snapshot()
+
+        Engine()._adaptor_registry = dict()
+        assert Engine()._load_snapshot()
+
+        cpis  = Engine().loaded_adaptors()
+        mocks = cpis['radical.saga.job.Job']['mock']
+        assert len(mocks) == 1
+        assert mocks[0]['cpi_class']        is None
+        assert mocks[0]['adaptor_instance'] is None
+
+        # adaptors from the snapshot are activated on first use
+        adaptor = Engine().get_adaptor('radical.saga.adaptors.mock')
+        assert mocks[0]['adaptor_instance'] is adaptor
+        assert mocks[0]['cpi_class'].__name__ == 'MockJob'
+
+        # a changed configuration invalidates the snapshot
+        Engine()._cfg['load_beta_adaptors'] = True
+        assert not Engine()._load_snapshot()
+
+    finally:
+        Engine()._cfg['registry_snapshot']  = None
+        Engine()._cfg['load_beta_adaptors'] = False
+
+    # restore sys.path
+    sys.path = old_sys_path
+
+
+def test_registry_snapshot_sanity():
+    """ Test that the registry snapshot does not depend on the sanity checks
+        of the process which stored it
+    """
+    # store old sys.path
+    old_sys_path = sys.path
+    path = os.path.split(os.path.abspath(__file__))[0]
+    sys.path.append(path)
+
+    import mockadaptor_enabled
+
+    def _sanity_check(self):
+        raise Exception('not in this environment')
+
+    sanity_check = mockadaptor_enabled.Adaptor.sanity_check
+    mockadaptor_enabled.Adaptor.sanity_check = _sanity_check
+
+    tmpdir = tempfile.mkdtemp()
+    Engine()._cfg['registry_snapshot'] = '%s/registry.json' % tmpdir
+    try:
+        # the sanity check of the adaptor fails in this process ...
+        Engine()._load_adaptors(["mockadaptor_enabled"])
+        assert Engine().loaded_adaptors() == {}
+        Engine()._save_snapshot()
+
+        # ... but it is stored, and checked again when activated
+        assert Engine()._load_snapshot()
+        mocks = Engine().loaded_adaptors()['radical.saga.job.Job']['mock']
+        assert len(mocks) == 1
+
+        try:
+            Engine().get_adaptor('radical.saga.adaptors.mock')
+            assert False
+        except rs.NoSuccess:
+            pass
+        assert mocks == []
+
+        # where the check passes, the adaptor is used
+        mockadaptor_enabled.Adaptor.sanity_check = sanity_check
+        assert Engine()._load_snapshot()
+        assert Engine().get_adaptor('radical.saga.adaptors.mock')
+
+    finally:
+        mockadaptor_enabled.Adaptor.sanity_check = sanity_check
+        Engine()._cfg['registry_snapshot'] = None
+
+    # restore sys.path
+    sys.path = old_sys_path
+
+
+def test_bind_cache():
+    """ Test that permanent bind failures are remembered
+    """
+    # store old sys.path
+    old_sys_path = sys.path
+    path = os.path.split(os.path.abspath(__file__))[0]
+    sys.path.append(path)
+
+    class _API(object):
+        pass
+
+    calls = list()
+
+    class _FailingJob(object):
+        def __init__(self, api, adaptor):
+            calls.append(api)
+            raise rs.NotImplemented('not supported')
+
+    Engine()._load_adaptors(["mockadaptor_enabled"])
+    info = Engine().loaded_adaptors()['radical.saga.job.Job']['mock'][0]
+    mock_class        = info['cpi_class']
+    info['cpi_class'] = _FailingJob
+
+    for _ in range(3):
+        try:
+            Engine().bind_adaptor(_API(), 'radical.saga.job.Job', 'mock', None)
+            assert False
+        except rs.NotImplemented:
+            pass
+
+    # the failing adaptor is only tried once
+    assert len(calls) == 1
+
+    # but again after a reset
+    Engine().reset_bind_cache()
+    info['cpi_class'] = mock_class
+    api = _API()
+    cpi = Engine().bind_adaptor(api, 'radical.saga.job.Job', 'mock', None)
+    assert cpi.get_api() is api
+
+    # adaptors which fail to initialize are remembered, too
+    Engine().record_bind_result(cpi, rs.NotImplemented('not supported'))
+    try:
+        Engine().bind_adaptor(_API(), 'radical.saga.job.Job', 'mock', None)
+        assert False
+    except rs.NotImplemented:
+        pass
+
+    # ... but only for the same session
+    session = rs.Session(default=False)
+    cpi = Engine().bind_adaptor(api, 'radical.saga.job.Job', 'mock', None,
+                                session)
+    assert cpi.get_api() is api
+
+    # failures which may depend on the URL are not remembered
+    Engine().record_bind_result(cpi, rs.IncorrectURL('not supported'))
+    cpi = Engine().bind_adaptor(api, 'radical.saga.job.Job', 'mock', None,
+                                session)
+    assert cpi.get_api() is api
+
+    Engine().reset_bind_cache()
+
+    # restore sys.path
+    sys.path = old_sys_path
+
+
 # ------------------------------------------------------------------------------
 #
 if __name__ == '__main__':
@@ -128,6 +314,10 @@ if __name__ == '__main__':
     test_load_adaptor()
     test_load_adaptor_twice()
     test_load_broken_adaptor()
+    test_lazy_load_adaptor()
+    test_registry_snapshot()
+    test_registry_snapshot_sanity()
+    test_bind_cache()
 
 
 # ------------------------------------------------------------------------------
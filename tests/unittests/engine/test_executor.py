@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+""" Unit tests for saga.engine.executor.py
+"""
+
+import time
+
+import threading as mt
+
+import radical.saga as rs
+
+from   radical.saga.engine.executor import Executor
+
+
+def test_executor_result():
+    """ Test that results and exceptions are reported by futures
+    """
+    executor = Executor(workers=2, queue_size=4)
+
+    def _double(x):
+        return 2 * x
+
+    def _fail():
+        raise rs.NoSuccess('oops')
+
+    f1 = executor.run(_double, 21)
+    f2 = executor.run(_fail)
+
+    assert f1.wait(10.0)
+    assert f2.wait(10.0)
+
+    assert f1.state  == rs.DONE
+    assert f1.result == 42
+    assert f2.state  == rs.FAILED
+    assert isinstance(f2.exception, rs.NoSuccess)
+
+
+def test_executor_bounded():
+    """ Test that the number of worker threads is bounded
+    """
+    executor = Executor(workers=4, queue_size=0)
+    running  = list()
+    peak     = list()
+    lock     = mt.Lock()
+
+    def _work():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+
+    futures = [executor.run(_work) for _ in range(100)]
+    for f in futures:
+        f.wait()
+
+    assert executor.workers <= 4
+    assert max(peak)        <= 4
+    assert all([f.state == rs.DONE for f in futures])
+
+
+def test_executor_inline_wait():
+    """ Test that waiting on a queued future executes it, so that waiting
+        workers cannot deadlock the pool
+    """
+    executor = Executor(workers=1, queue_size=1)
+
+    def _inner():
+        return 'inner'
+
+    def _outer():
+        # the only worker is busy with us -- the inner future can only
+        # complete because we execute it on wait
+        f = executor.run(_inner)
+        f.wait()
+        return f.result
+
+    f = executor.run(_outer)
+    assert f.wait(10.0)
+    assert f.result == 'inner'
+
+
+def test_executor_cancel():
+    """ Test that futures which did not start yet can be canceled
+    """
+    executor = Executor(workers=1, queue_size=2)
+    event    = mt.Event()
+
+    f1 = executor.run(event.wait)
+    f2 = executor.run(time.time)
+    f2.cancel()
+    event.set()
+
+    assert f1.wait(10.0)
+    assert f2.wait(10.0)
+    assert f2.state  == rs.CANCELED
+    assert f2.result is None
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_executor_result()
+    test_executor_bounded()
+    test_executor_inline_wait()
+    test_executor_cancel()
+
+
+# ------------------------------------------------------------------------------
+
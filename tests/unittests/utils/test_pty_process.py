@@ -6,6 +6,7 @@ __license__   = "MIT"
 
 
 import os
+import sys
 import time
 import signal
 import radical.saga.utils.pty_process as supp
@@ -118,6 +119,25 @@ def test_ptyprocess_find () :
            (out ,  (0, '______1_____2'))
 
 
+# ------------------------------------------------------------------------------
+#
+def test_ptyprocess_find_large () :
+    """ Test pty_process selecting from large, escaped stdout messages"""
+    script = "import sys; " \
+             "sys.stdout.write(50000 * 'x' * 99 + chr(10)); " \
+             "sys.stdout.write(chr(27) + '[01;32mEND' + chr(27) + '[0m!rest')"
+    pty = supp.PTYProcess ([sys.executable, '-c', script])
+
+    start    = time.time ()
+    ret, out = pty.find (['END!'], timeout=60)
+    assert (time.time () - start < 5)
+
+    assert (ret == 0)
+    assert (len(out) == 50000 * 99 + 5)
+    assert (out.endswith ('x\nEND!'))
+    assert (pty.find (['rest'], timeout=10) == (0, 'rest'))
+
+
 # ------------------------------------------------------------------------------
 #
 def test_ptyprocess_restart () :
@@ -135,6 +155,79 @@ def test_ptyprocess_restart () :
     assert (not pty.alive ())
 
 
+# ------------------------------------------------------------------------------
+#
+def test_ptyprocess_reactor () :
+    """ Test pty_process I/O via the reactor thread"""
+    cfg  = {'pty' : {'reactor' : 1}}
+    ptys = [supp.PTYProcess ("cat", cfg=cfg) for _ in range (10)]
+
+    for pty in ptys :
+        assert (pty.reactor)
+        pty.write ("%s\n" % pty.parent_out)
+
+    for pty in ptys :
+        n, out = pty.find (['\n'], timeout=10)
+        assert (n == 0)
+        assert (out.strip () == str(pty.parent_out))
+
+    # nothing to read: block for the timeout, w/o spinning
+    start = time.time ()
+    cpu   = time.process_time ()
+    assert (ptys[0].find (['x'], timeout=2) == (None, ''))
+    assert (time.time ()         - start >  1.9)
+    assert (time.process_time () - cpu   <  0.2)
+
+    for pty in ptys :
+        pty.finalize ()
+        assert (not pty.alive ())
+
+    pty = supp.PTYProcess ("printf 'done'", cfg=cfg)
+    assert (pty.find (['done'], timeout=10) == (0, 'done'))
+
+    # the reactor does not keep dropped processes alive
+    pty = supp.PTYProcess ("cat", cfg=cfg)
+    pid = pty.child
+    fd  = pty.parent_out
+    del (pty)
+
+    assert (fd not in supp._Reactor ()._procs)
+    for _ in range (100) :
+        try :
+            os.kill (pid, 0)
+        except OSError :
+            break
+        time.sleep (0.1)
+    else :
+        assert False, 'process %d not finalized' % pid
+
+
+# ------------------------------------------------------------------------------
+#
+def test_ptyprocess_utf8 () :
+    """ Test pty_process reading multi-byte chars split over reads"""
+
+    assert (supp._decode ('aä'.encode ('utf-8')[:-1]) == ('a', b'\xc3'))
+
+    txt = 'ä€𝄞' * 3
+    pty = supp.PTYProcess ("printf '%s\r\n'" % txt)
+
+    # odd read sizes cut into the multi-byte sequences
+    out = ''
+    while len(out) < len(txt) + 1 :
+        tmp = pty.read (size=3, timeout=1.0)
+        assert (tmp)
+        out += tmp
+
+    assert (out == txt + '\n'), "'%s' == '%s'" % (out, txt + '\n')
+
+    # a cut at a chunk boundary within a multi-byte sequence
+    pty._cache_put (b'\xf0\x9d\x84')
+    pty._cache_put (b'\x9e!')
+    assert (pty._cache_get (3) == '\U0001d11e')
+    assert (pty._cache_get (3) == '!')
+
+
 # ------------------------------------------------------------------------------
 #
 if __name__ == '__main__':
@@ -148,7 +241,10 @@ if __name__ == '__main__':
     test_ptyprocess_stderr()
     test_ptyprocess_write()
     test_ptyprocess_find()
+    test_ptyprocess_find_large()
     test_ptyprocess_restart()
+    test_ptyprocess_reactor()
+    test_ptyprocess_utf8()
 
 
 # ------------------------------------------------------------------------------
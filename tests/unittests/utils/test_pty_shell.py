@@ -103,6 +103,58 @@ def test_ptyshell_prompt () :
     assert (not shell.alive ())
 
 
+# ------------------------------------------------------------------------------
+#
+def test_ptyshell_stderr () :
+    """ Test pty_shell which captures stderr """
+    conf  = config()
+    shell = sups.PTYShell (saga.Url(conf.job_service_url), conf.session)
+
+    cmd = "printf \"1\" ; sh -c 'printf \"2\" 1>&2 ; exit 3'"
+
+    ret, out, err = shell.run_sync (cmd, iomode=sups.SEPARATE)
+    assert ((ret, out, err) == (3, "1", "2")), (ret, out, err)
+
+    ret, out, err = shell.run_sync (cmd, iomode=sups.STDERR)
+    assert ((ret, out, err) == (3, None, "2")), (ret, out, err)
+
+    ret, out, err = shell.run_sync (cmd, iomode=sups.STDOUT)
+    assert ((ret, out, err) == (3, "1", None)), (ret, out, err)
+
+    # no stderr files are left behind
+    ret, out, _ = shell.run_sync ("ls /tmp/radical.saga.stderr.$$.* 2>/dev/null")
+    assert (out == ""), out
+
+    assert (shell.alive ())
+    shell.finalize (True)
+    assert (not shell.alive ())
+
+
+# ------------------------------------------------------------------------------
+#
+def test_ptyshell_many () :
+    """ Test pty_shell which runs several commands at once """
+    conf  = config()
+    shell = sups.PTYShell (saga.Url(conf.job_service_url), conf.session)
+
+    rets = shell.run_many (["printf \"1\"",
+                            "printf \"2\n\" ; false",
+                            "echo  \"3\" ; sh -c 'echo 4 1>&2'"],
+                           iomode=sups.SEPARATE)
+    assert (rets == [(0, "1", ""), (1, "2\n", ""), (0, "3\n", "4\n")]), rets
+
+    rets = shell.run_many (["printf \"1\"", "printf \"2\" 1>&2"])
+    assert (rets == [(0, "1", None), (0, "2", None)]), rets
+
+    ret, out, _ = shell.run_sync ("printf \"3\"")
+    assert (ret == 0)    , "%s"       % (repr(ret))
+    assert (out == "3")  , "%s == %s" % (repr(out), repr("3"))
+
+    assert (shell.alive ())
+    shell.finalize (True)
+    assert (not shell.alive ())
+
+
 # ------------------------------------------------------------------------------
 #
 def test_ptyshell_file_stage () :
@@ -121,6 +173,33 @@ def test_ptyshell_file_stage () :
     assert (out == "")   , "%s == ''" % (repr(out))
 
 
+# ------------------------------------------------------------------------------
+#
+def test_ptyshell_file_stream () :
+    """ Test pty_shell file staging through the shell, and via copy """
+    conf  = config()
+    shell = sups.PTYShell (saga.Url(conf.job_service_url), conf.session)
+
+    # the remote base64 tool is detected
+    assert (shell._get_base64 ())
+
+    # streamed: long lines, control chars, no trailing newline
+    txt = "_____1\x03\x04\r\n" + 10000 * "_" + "\n\x1b[0m $ 2"
+    assert (len(txt) < shell.stream_max)
+    shell.write_to_remote   (txt, "/tmp/saga-test-streaming")
+    out = shell.read_from_remote ("/tmp/saga-test-streaming")
+    assert (txt == out)  , "%s == %s" % (repr(out[:20]), repr(txt[:20]))
+
+    # written via staging, read via streaming
+    txt = (shell.stream_max + 1) * "_"
+    shell.write_to_remote   (txt, "/tmp/saga-test-streaming")
+    out = shell.read_from_remote ("/tmp/saga-test-streaming")
+    assert (txt == out)  , "%s == %s" % (len(out), len(txt))
+
+    ret, out, _ = shell.run_sync ("rm /tmp/saga-test-streaming")
+    assert (ret == 0)    , "%s"       % (repr(ret))
+
+
 # ------------------------------------------------------------------------------
 #
 if __name__ == '__main__':
@@ -129,7 +208,10 @@ if __name__ == '__main__':
   # test_ptyshell_nok()
   # test_ptyshell_async()
   # test_ptyshell_prompt()
+  # test_ptyshell_stderr()
+  # test_ptyshell_many()
   # test_ptyshell_file_stage()
+  # test_ptyshell_file_stream()
 
 
 # ------------------------------------------------------------------------------
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+""" Unit tests for saga.utils.pty_shell_factory
+"""
+
+import os
+import signal
+
+import threading as mt
+
+import radical.saga                         as rs
+import radical.saga.utils.pty_shell         as sups
+import radical.saga.utils.pty_shell_factory as supsf
+
+
+# ------------------------------------------------------------------------------
+#
+def test_prewarm () :
+    """ Test that prewarm creates masters and reports failures """
+
+    factory = supsf.PTYShellFactory ()
+    ret     = factory.prewarm (['fork://localhost', 'xyz://localhost'])
+
+    assert (ret['fork://localhost'] is None), ret
+    assert (isinstance (ret['xyz://localhost'], rs.BadParameter)), ret
+
+    # the master got registered, and is reused
+    info = factory.initialize ('fork://localhost')
+    assert (info['pty'].alive ())
+    assert (factory.initialize ('fork://localhost') is info)
+
+
+def test_health () :
+    """ Test that the health check reconnects dead masters """
+
+    factory = supsf.PTYShellFactory ()
+    info    = factory.initialize ('fork://localhost')
+    user    = list(factory.get_health ()['localhost'].keys ())[0]
+    health  = factory.get_health ()['localhost'][user]['sh']
+    before  = health['reconnects']
+
+    assert (health['state'] == 'connected'), health
+
+    # a healthy master is pinged, but not reconnected
+    factory.check_health ()
+    health = factory.get_health ()['localhost'][user]['sh']
+    assert (health['state']      == 'connected'), health
+    assert (health['reconnects'] == before),      health
+
+    # a dead master is reconnected
+    os.kill (info['pty'].child, signal.SIGKILL)
+    info['pty'].finalize ()
+    assert (not info['pty'].alive ())
+
+    factory.check_health ()
+    health = factory.get_health ()['localhost'][user]['sh']
+    assert (health['state']      == 'connected'), health
+    assert (health['reconnects'] == before + 1),  health
+    assert (info['pty'].alive ())
+
+
+def test_health_busy () :
+    """ Test that the health check leaves copy channels alone while they
+        are in use
+    """
+
+    shell = sups.PTYShell ('fork://localhost')
+    shell.run_copy_from ('/etc/hostname', '/tmp/saga-test-health')
+    slave = shell.cp_slave
+
+    os.kill (slave.child, signal.SIGKILL)
+    slave.finalize ()
+    assert (not slave.alive ())
+
+    # the shell holds its lock while using the copy channel
+    busy = mt.Event ()
+    done = mt.Event ()
+
+    def _use () :
+        with shell.pty_shell.rlock :
+            busy.set ()
+            done.wait ()
+
+    thread = mt.Thread (target=_use)
+    thread.start ()
+    busy.wait ()
+
+    shell.factory.check_health ()
+    assert (not slave.alive ())
+
+    done.set ()
+    thread.join ()
+
+    shell.factory.check_health ()
+    assert (slave.alive ())
+
+    shell.finalize (True)
+    os.unlink ('/tmp/saga-test-health')
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_prewarm()
+    test_health()
+    test_health_busy()
+
+
+# ------------------------------------------------------------------------------
+
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+__author__    = "RADICAL-SAGA Development Team"
+__copyright__ = "Copyright 2020, RADICAL"
+__license__   = "MIT"
+
+
+""" Unit tests for saga.utils.pty_shell_pool
+"""
+
+import time
+
+import threading as mt
+
+import radical.saga                      as rs
+import radical.saga.utils.pty_shell      as sups
+import radical.saga.utils.pty_shell_pool as supsp
+
+
+# ------------------------------------------------------------------------------
+#
+class _Channel(object):
+    """ pooled objects only need to report liveness """
+
+    def __init__(self):
+        self.closed = False
+
+    def alive(self):
+        return not self.closed
+
+
+def _close(channel):
+    channel.closed = True
+
+
+# ------------------------------------------------------------------------------
+#
+def test_pool_bounded () :
+    """ Test that the pool reuses channels, and blocks when exhausted """
+
+    pool = supsp.PTYShellPool (_Channel, _close, size=2, ttl=100, wait=0.2)
+
+    # no idle channel yet, and we don't want to create one
+    assert (pool.acquire (create=False) is None)
+
+    with pool.lease () as c1 :
+        with pool.lease () as c2 :
+            assert (c1 is not c2)
+
+            start = time.time ()
+            try :
+                pool.acquire ()
+                assert (False), 'expected Timeout'
+            except rs.Timeout :
+                assert (time.time () - start >= 0.2)
+
+    with pool.lease () as c3 :
+        assert (c3 in [c1, c2])
+
+    with pool.lease (create=False) as c4 :
+        assert (c4 in [c1, c2])
+
+    stats = pool.get_stats ()
+    assert (stats['created']  == 2), stats
+    assert (stats['leases']   == 4), stats
+    assert (stats['timeouts'] == 1), stats
+    assert (stats['idle']     == 2), stats
+    assert (stats['active']   == 0), stats
+
+
+# ------------------------------------------------------------------------------
+#
+def test_pool_fair () :
+    """ Test that waiting leases are served in order, and that released
+        channels are not grabbed by newcomers
+    """
+
+    pool    = supsp.PTYShellPool (_Channel, _close, size=1, ttl=100, wait=10)
+    order   = list()
+    threads = list()
+    channel = pool.acquire ()
+
+    def _lease (i) :
+        with pool.lease () :
+            order.append (i)
+            time.sleep (0.01)
+
+    for i in range (5) :
+        thread = mt.Thread (target=_lease, args=[i])
+        thread.start ()
+        threads.append (thread)
+
+        # make sure the threads queue up in order
+        while pool.get_stats ()['queued'] <= i :
+            time.sleep (0.01)
+
+    pool.release (channel)
+
+    for thread in threads :
+        thread.join ()
+
+    assert (order == list(range (5))), order
+
+    stats = pool.get_stats ()
+    assert (stats['created'] == 1), stats
+    assert (stats['waits']   == 5), stats
+    assert (stats['wait_max'] > 0), stats
+
+
+# ------------------------------------------------------------------------------
+#
+def test_pool_evict () :
+    """ Test that idle and dead channels get closed """
+
+    pool = supsp.PTYShellPool (_Channel, _close, size=2, ttl=0.1, wait=10)
+
+    with pool.lease () as c1 :
+        pass
+
+    time.sleep (0.2)
+
+    with pool.lease () as c2 :
+        assert (c1.closed)
+        assert (c2 is not c1)
+
+        # a dead channel is not returned to the pool
+        c2.closed = True
+
+    stats = pool.get_stats ()
+    assert (stats['evicted'] == 2), stats
+    assert (stats['idle']    == 0), stats
+
+    # existing channels can be added
+    c3 = _Channel ()
+    pool.add (c3)
+    with pool.lease () as c4 :
+        assert (c4 is c3)
+
+    pool.close ()
+    assert (c3.closed)
+
+    try :
+        pool.acquire ()
+        assert (False), 'expected IncorrectState'
+    except rs.IncorrectState :
+        pass
+
+
+# ------------------------------------------------------------------------------
+#
+def test_pool_shells () :
+    """ Test that concurrent threads get separate shells """
+
+    # --------------------------------------------------------------------------
+    def _create () :
+        return sups.PTYShell ('fork://localhost')
+    # --------------------------------------------------------------------------
+
+    pool    = supsp.PTYShellPool (_create, lambda s : s.finalize (True),
+                                  size=2, ttl=100, wait=60)
+    results = list()
+    threads = list()
+
+    def _run (i) :
+        with pool.lease () as shell :
+            results.append (shell.run_sync (' echo %d' % i))
+
+    for i in range (4) :
+        thread = mt.Thread (target=_run, args=[i])
+        thread.start ()
+        threads.append (thread)
+
+    for thread in threads :
+        thread.join ()
+
+    assert (sorted ([r[1].strip () for r in results]) == ['0', '1', '2', '3'])
+    assert (pool.get_stats ()['created'] <= 2)
+
+    pool.close ()
+
+
+# ------------------------------------------------------------------------------
+#
+if __name__ == '__main__':
+
+    test_pool_bounded()
+    test_pool_fair()
+    test_pool_evict()
+    test_pool_shells()
+
+
+# ------------------------------------------------------------------------------
+